@@ -90,6 +90,7 @@ def filter_for_bots_by_user_type(entry):
     return user_type.lower() != 'bot'
 
 
+DEY_BOTS_PATH = BASE_PATH + "bot_data/dey_2020_bots.json"
 DEY_BOTS_NAMES = None
 DEY_BOTS_EMAILS = None
 
@@ -104,8 +105,7 @@ def filter_bots_dey_2020(entry):
 
     # HACK: make-shift init function for the filter.
     if DEY_BOTS_EMAILS is None or DEY_BOTS_EMAILS is None:
-        filter_path = BASE_PATH + "bot_data/dey_2020_bots.json"
-        with open(filter_path, "r", encoding='utf-8') as input_file:
+        with open(DEY_BOTS_PATH, "r", encoding='utf-8') as input_file:
             j_data = json.loads(input_file.read())
             DEY_BOTS_EMAILS = set()
             DEY_BOTS_NAMES = set()
@@ -123,6 +123,7 @@ def filter_bots_dey_2020(entry):
     return True
 
 
+GOLZADEH_BOTS_PATH = BASE_PATH + "bot_data/golzadeh_2021_bots.csv"
 GOLZADEH_BOTS_NAMES = None
 
 
@@ -136,8 +137,7 @@ def filter_bots_golzadeh_2021(entry):
 
     # HACK: make-shift init function.
     if GOLZADEH_BOTS_NAMES is None:
-        filter_path = BASE_PATH + "bot_data/golzadeh_2021_bots.csv"
-        with open(filter_path, "r", encoding='utf-8') as filter_file:
+        with open(GOLZADEH_BOTS_PATH, "r", encoding='utf-8') as filter_file:
             filter_reader = reader(filter_file, quotechar='"')
             _ = next(filter_reader)  # Skips header
             GOLZADEH_BOTS_NAMES = {entry[0].lower() for entry in filter_reader}
@@ -0,0 +1,43 @@
+"""
+Converts sorted (chronological) JSON-lines datasets into columnar
+event stores (see ``python_proj.utils.event_store``), which can be
+read considerably faster by the sliding window algorithm.
+"""
+
+from python_proj.utils.arg_utils import safe_get_argv
+from python_proj.utils.event_store import convert_to_event_store, get_event_store_path
+import python_proj.utils.exp_utils as exp_utils
+
+
+def create_event_stores(dataset_names: list[str], data_sources: list[str]):
+    """Creates an event store for each of the given chronological datasets."""
+    for dataset_name, data_source in zip(dataset_names, data_sources):
+        input_path = exp_utils.CHRONOLOGICAL_DATASET_PATH(
+            file_name=dataset_name, data_type=data_source)
+        output_path = get_event_store_path(input_path)
+        convert_to_event_store(input_path, output_path)
+
+
+def cmd_create_event_store():
+    """
+    Cmd params:
+    -pd: comma-separated pull request dataset names.
+    -id: comma-separated issue dataset names.
+    """
+
+    exp_utils.load_paths_for_eco()
+
+    pr_dataset_names = [entry for entry in safe_get_argv(key="-pd", default="").split(",")
+                        if entry != ""]
+    issue_dataset_names = [entry for entry in safe_get_argv(key="-id", default="").split(",")
+                           if entry != ""]
+
+    dataset_names = [*issue_dataset_names, *pr_dataset_names]
+    data_sources = ["issues"] * len(issue_dataset_names)
+    data_sources.extend(["pull-requests"] * len(pr_dataset_names))
+
+    create_event_stores(dataset_names, data_sources)
+
+
+if __name__ == "__main__":
+    cmd_create_event_store()
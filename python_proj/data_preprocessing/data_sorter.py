@@ -14,6 +14,7 @@ import json
 from os import path, makedirs, remove
 
 from python_proj.utils import *
+from python_proj.utils.time_index import build_time_index
 
 
 def _iterate_and_split(filter_path: str,
@@ -55,6 +56,9 @@ def _iterate_and_split(filter_path: str,
                         # data to its owner/repo tuple.
                         entry['__source_path'] = entries_path
 
+                        # Stores epoch timestamps so later stages don't have to parse them.
+                        exp_utils.add_timestamp_fields(entry)
+
                         # Loads used timestamp, which is used to create a data bucket.
                         dt_event_timestamp = datetime.strptime(
                             event_timestamp, "%Y-%m-%dT%H:%M:%SZ")
@@ -129,6 +133,11 @@ def sort_data(filter_path: str,
     _write_sorted_buckets(ymds, output_path,
                           temp_storage_path)
 
+    # The sliding window algorithm chunks the data by closing date.
+    if datetime_key == ["closed_at"]:
+        print("Creating time index.")
+        build_time_index(output_path)
+
     print("Done!")
 
 
@@ -135,7 +135,7 @@ def generate_dataset(pr_dataset_names: list[str],
                      else ISSUE
                      for i in range(len(dataset_names))]
     dataset_iterator = exp_utils.iterate_through_multiple_chronological_datasets(
-        dataset_names, dataset_types, dataset_types)
+        dataset_names, dataset_types, dataset_types, add_project_ids=True)
 
     def __get_closed_by(entry: dict) -> datetime:
         closed_by = entry["closed_at"]
@@ -8,116 +8,131 @@ the method at the bottom of this script for the relevant command line
 parameters.
 """
 
+from bisect import bisect_left, bisect_right
 from collections import deque
 import csv
 from datetime import datetime, timedelta
 import itertools
 import json
 import os
+import shutil
 from typing import Tuple, Iterator, Callable
 from wmutils.collections.safe_dict import SafeDict
 from wmutils.collections.dict_access import subtract_dict, add_dict
-from wmutils.iterators import limit
 
+from python_proj.data_filters.post_sort_filters import DEY_BOTS_PATH, GOLZADEH_BOTS_PATH
 import python_proj.data_preprocessing.sliding_window_features as swf
+from python_proj.data_preprocessing.sliding_window_features.dependency_ecosystem_experience.dependency_graph import (
+    get_dependency_graph_path,
+)
+from python_proj.data_preprocessing.sliding_window_features.dependency_ecosystem_experience.dependency_loading import (
+    QL_DEPENDENCY_FILE_NAME,
+)
 from python_proj.utils.arg_utils import safe_get_argv, get_argv, get_argv_flag
 import python_proj.utils.exp_utils as exp_utils
+from python_proj.utils.time_index import (
+    DatasetRange,
+    create_data_ranges,
+    get_chunk_starts,
+    iterate_through_dataset_range,
+)
 from python_proj.data_preprocessing.sliding_window_features import (
     SlidingWindowFeature,
     Feature,
     Closes,
 )
+from python_proj.data_preprocessing.sliding_window_features.profiling import (
+    FeatureProfiler,
+    write_profile_report,
+)
 from python_proj.utils.mt_utils import parallelize_tasks
+from python_proj.utils.run_manifest import (
+    get_run_key,
+    load_completed_tasks,
+    record_completed_task,
+)
 from python_proj.utils.util import (
-    Counter,
     tuple_chain,
-    chain_with_intermediary_callback,
     safe_makedirs,
     flatten,
+    build_projection,
+    apply_projection,
+    OpenMany,
 )
 from functools import partial
 
+# The features of one window; i.e., issue SW features, PR SW features and PR features.
+FeatureSet = Tuple[list[SlidingWindowFeature], list[SlidingWindowFeature], list[Feature]]
+# A window's entries by timestamp, and the order in which timestamps were added.
+Window = Tuple[dict[int, list[dict]], deque[int]]
+# How a smaller window is warmed up in a chunk (see ``__create_window_plans``): its
+# previous chunk, the part of its current chunk before the chunk, and the starts of
+# its chunks that start in the chunk.
+WindowPlan = Tuple[list[DatasetRange] | None, list[DatasetRange], list[int]]
 
-def __create_data_chunk_stream(
-    issue_file_names: list[str],
-    pr_file_names: list[str],
-    window_size: timedelta,
-    base_path: str,
-) -> Iterator[str]:
-    chunk_counter = Counter(start_value=0)
-
-    def __make_next_chunk_file():
-        chunk_file_path = base_path + str(chunk_counter.get_next())
-        return open(chunk_file_path, "w+", encoding="utf-8")
 
-    current_chunk_file = __make_next_chunk_file()
-
-    data_iterator = exp_utils.iterate_through_multiple_chronological_issue_pr_datasets(
-        issue_file_names, pr_file_names
+def __iterate_through_chunk(
+    chunk: list[DatasetRange], dataset_types: list[str], projection: dict | None
+) -> Iterator[dict]:
+    """
+    Iterates chronologically through the entries of a data chunk; i.e., a range
+    in each of the input datasets, which are read in place. Entries are given a
+    project id here, as these are local to the worker process.
+    """
+    dataset_iterators = [
+        (
+            apply_projection(entry, projection)
+            for entry in iterate_through_dataset_range(*dataset_range)
+        )
+        for dataset_range in chunk
+    ]
+    return exp_utils.iterate_through_chronological_iterators(
+        dataset_iterators, dataset_types, add_project_ids=True
     )
 
-    chunk_start_timestamp: datetime = None
-    dt_format = "%Y-%m-%dT%H:%M:%SZ"
-
-    for entry in data_iterator:
-        timestamp = datetime.strptime(entry["closed_at"], dt_format)
-
-        if chunk_start_timestamp is None:
-            chunk_start_timestamp = timestamp
-
-        chunk_delta = timestamp - chunk_start_timestamp
-        if chunk_delta > window_size:
-            chunk_start_timestamp = timestamp
-            current_chunk_file.close()
-            current_chunk_name = current_chunk_file.name
-            print(f'Finished creating chunk "{current_chunk_name}".')
-            yield current_chunk_name
-            current_chunk_file = __make_next_chunk_file()
-
-        line = f"{json.dumps(entry)}\n"
-        current_chunk_file.write(line)
 
-    print(f'Finished creating last chunk "{current_chunk_name}".')
-    current_chunk_name = current_chunk_file.name
-
-    current_chunk_file.close()
-
-    yield current_chunk_name
-
-
-def __create_window_from_file(
-    input_file_path: str | None,
-    issue_sw_features: list[SlidingWindowFeature],
-    pr_sw_features: list[SlidingWindowFeature],
-) -> Tuple[dict[datetime, list[dict]], deque[datetime]]:
+def __create_window_from_chunk(
+    chunk: list[DatasetRange] | None,
+    dataset_types: list[str],
+    projection: dict | None,
+    feature_sets: list[FeatureSet],
+) -> list[Window]:
     """
-    Fills the sliding window features with all entries in the input file.
-    Assumes that the input file spans the size of the analysis time window.
+    Fills the sliding window features of each window with all entries in the chunk.
+    Assumes that the chunk spans the size of the largest analysis time window.
     """
 
-    # Creates window
-    window: dict[datetime, list[dict]] = {}
-    window_keys = deque()
+    if chunk is None:
+        return [({}, deque()) for _ in feature_sets]
+    entries = __iterate_through_chunk(chunk, dataset_types, projection)
+    return __create_window(entries, feature_sets)
+
+
+def __create_window(
+    entries: Iterator[dict], feature_sets: list[FeatureSet]
+) -> list[Window]:
+    """Fills the sliding window features of each window with all of the entries."""
 
-    if input_file_path is None:
-        return window, window_keys
+    # Creates windows
+    windows: list[Window] = [({}, deque()) for _ in feature_sets]
 
-    # Adds the entire previous chunk, and constructs the initial window.
-    with open(input_file_path, "r", encoding="utf-8") as input_file:
-        for line in input_file:
-            new_entry = json.loads(line)
+    # Adds all entries, and constructs the initial windows.
+    for new_entry in entries:
+        for (issue_sw_features, pr_sw_features, _), (window, window_keys) in zip(
+            feature_sets, windows
+        ):
             __add_entry(
                 new_entry, window_keys, window, pr_sw_features, issue_sw_features
             )
 
-    return window, window_keys
+    return windows
 
 
 def __prune_entries(
-    new_entry: datetime,
+    new_entry: dict,
     time_window: timedelta,
     window_keys: deque,
-    window: dict[datetime, list[dict]],
+    window: dict[int, list[dict]],
     issue_sw_features: list[SlidingWindowFeature],
     pr_sw_features: list[SlidingWindowFeature],
 ):
@@ -126,14 +141,11 @@ def __prune_entries(
     as well as the sliding window features.
     """
 
-    # Parses the entry's timestamp.
-    new_entry_date = datetime.strptime(
-        new_entry["closed_at"], exp_utils.DATETIME_FORMAT
-    )
+    new_entry_date = new_entry[exp_utils.TS_CLOSED_AT_KEY]
 
     # Collects to-be-pruned entries.
     pruned_entries = []
-    new_window_start = new_entry_date - time_window
+    new_window_start = new_entry_date - time_window.total_seconds()
     broke_loop = False
     while len(window_keys) > 0:
         potential_pruned_key = window_keys.popleft()
@@ -167,17 +179,11 @@ def __prune_entries(
 def __add_entry(
     new_entry: dict,
     window_keys: deque,
-    window: dict[datetime, list[dict]],
+    window: dict[int, list[dict]],
     pr_sw_features: list[SlidingWindowFeature],
     issue_sw_features: list[SlidingWindowFeature],
 ):
-    # Parses the entry's timestamp.
-    new_entry_date = datetime.strptime(
-        new_entry["closed_at"], exp_utils.DATETIME_FORMAT
-    )
-    # Sets parsed timestamp so that underlying systems don't have to do that separately.
-    # TODO: Use this in all of the SW features.
-    new_entry["__dt_closed_at"] = new_entry_date
+    new_entry_date = new_entry[exp_utils.TS_CLOSED_AT_KEY]
 
     # Adds new entry.
     is_pr = new_entry["__data_type"] == "pull-requests"
@@ -192,24 +198,24 @@ def __add_entry(
 
 
 def __get_preamble(entry: dict) -> list:
-    (owner, repo) = exp_utils.get_owner_and_repo_from_source_path(
-        entry["__source_path"]
-    )
-    project = f"{owner}/{repo}"
+    project = exp_utils.get_project_name(entry[exp_utils.PROJECT_ID_KEY])
     submitter_id = entry["user_data"]["id"]
     closed_at = entry["closed_at"]
     return [entry["id"], project, submitter_id, entry["number"], closed_at]
 
 
 def __output_row(
-    new_entry: dict, csv_writer: csv.writer, output_features: list[Feature]
+    new_entry: dict, csv_writer: "csv.writer | None", output_features: list[Feature]
 ):
     """
-    Outputs row to the csv writer.
+    Outputs row to the csv writer. Without a writer, the features are still
+    calculated, as that can change their state (e.g., ``SubmitterIsFirstTimeContributor``).
     """
 
     meta_data = __get_preamble(new_entry)
     predictors = [feature.get_feature(new_entry) for feature in output_features]
+    if csv_writer is None:
+        return
     predictors = flatten(predictors)
     data_point = itertools.chain(meta_data, predictors)
     csv_writer.writerow(data_point)
@@ -219,11 +225,11 @@ def __handle_new_entry(
     new_entry: dict,
     time_window: timedelta,
     window_keys: deque,
-    window: dict[datetime, list[dict]],
+    window: dict[int, list[dict]],
     issue_sw_features: list[SlidingWindowFeature],
     pr_sw_features: list[SlidingWindowFeature],
     output_features: list[Feature],
-    csv_writer: csv.writer,
+    csv_writer: "csv.writer | None",
 ):
 
     __prune_entries(
@@ -250,6 +256,44 @@ def __get_output_features(
     return list(output_features), all_features
 
 
+def __get_all_features(feature_sets: list[FeatureSet]) -> list[Feature]:
+    """Returns the features of all windows as one list."""
+    all_features = []
+    for issue_sw_features, pr_sw_features, pr_features in feature_sets:
+        _, window_all_features = __get_output_features(
+            pr_features, pr_sw_features, issue_sw_features
+        )
+        all_features.extend(window_all_features)
+    return all_features
+
+
+def __get_chunk_output_name(chunk_name: str, window_size_in_days: int) -> str:
+    return f"{chunk_name}_{window_size_in_days}_days"
+
+
+def __build_projection(all_features: list[Feature]) -> dict | None:
+    """
+    Combines the fields required by all features, and the fields used by
+    the sliding window itself, into a projection (see ``build_projection``).
+    Returns ``None`` if any of the features doesn't specify its fields.
+    """
+    required_fields = [
+        ["id"],
+        ["number"],
+        ["closed_at"],
+        [exp_utils.TS_CLOSED_AT_KEY],
+        ["user_data", "id"],
+        [exp_utils.SOURCE_PATH_KEY],
+    ]
+    for feature in all_features:
+        feature_fields = feature.get_required_fields()
+        if feature_fields is None:
+            print(f"Not using projection as {feature.get_name()} has no required fields.")
+            return None
+        required_fields.extend(feature_fields)
+    return build_projection(required_fields)
+
+
 def __test_feature_uniqueness(all_features: list[Feature]):
     """
     Tests whether the features are unique and raises an error if they aren't.
@@ -269,55 +313,169 @@ def __test_feature_uniqueness(all_features: list[Feature]):
 
 
 def __handle_chunk(
-    task: Tuple[str | None, str],
-    time_window: timedelta,
+    task: Tuple[Tuple[str, list[DatasetRange]] | None, Tuple[str, list[DatasetRange]]],
+    window_sizes_in_days: list[int],
     task_id: int,
     base_path: str,
-    feature_factory: Callable[
-        [], Tuple[list[SlidingWindowFeature], list[SlidingWindowFeature], list[Feature]]
-    ],
+    feature_factory: Callable[[], FeatureSet],
+    dataset_types: list[str],
+    projection: dict | None,
+    window_plans: dict[str, list[WindowPlan | None]],
+    use_profiler: bool = False,
+    worker_index: int = -1,
     *_,
     **__,
 ):
+    """
+    Calculates the features of the entries in the current chunk, for each of
+    the window sizes, using a separate set of features and pruning frontier
+    per window. The largest window is created by replaying the previous chunk.
+    The smaller windows follow their plans (see
+    ``__create_window_plans``): they replay their previous chunk, handle the part
+    of their current chunk before this one without outputting it, and start over
+    with new features at the start of each of their chunks. When ``use_profiler``
+    is set, the features' hot paths are profiled, which is stored in
+    ``<chunk_name>_profile.json``.
+    """
+
     start_time = datetime.now()
 
-    previous_chunk, current_chunk = task
-    print(f"Task-{task_id}: Starting with chunks: {previous_chunk=}, {current_chunk=}")
+    previous_task_chunk, (chunk_name, current_chunk) = task
+    if previous_task_chunk is None:
+        (previous_chunk_name, previous_chunk) = (None, None)
+    else:
+        (previous_chunk_name, previous_chunk) = previous_task_chunk
+    print(
+        f"Task-{task_id}: Starting with chunks: {previous_chunk_name=}, {chunk_name=}"
+    )
 
-    issue_sw_features, pr_sw_features, pr_features = feature_factory()
+    feature_sets = [feature_factory() for _ in window_sizes_in_days]
+    time_windows = [
+        timedelta(days=window_size_in_days)
+        for window_size_in_days in window_sizes_in_days
+    ]
+    chunk_window_plans = window_plans[chunk_name]
+    largest_window_index = __get_largest_window_index(window_sizes_in_days)
 
-    # output path name.
-    chunk_name = os.path.basename(current_chunk)
-    output_path = base_path + chunk_name
-    edge_count_output_path = f"{base_path}{chunk_name}_edgecount"
+    # output path names.
+    output_names = [
+        __get_chunk_output_name(chunk_name, window_size_in_days)
+        for window_size_in_days in window_sizes_in_days
+    ]
+    output_paths = [base_path + output_name for output_name in output_names]
+    edge_count_output_paths = [
+        f"{output_path}_edgecount" for output_path in output_paths
+    ]
     print(
-        f'Task-{task_id}: Outputting in "{output_path}" and "{edge_count_output_path}".'
+        f'Task-{task_id}: Outputting in "{output_paths}" and "{edge_count_output_paths}".'
     )
 
     # Selects output features
-    output_features, all_features = __get_output_features(
-        pr_features, pr_sw_features, issue_sw_features
-    )
+    window_features = [
+        __get_output_features(pr_features, pr_sw_features, issue_sw_features)
+        for issue_sw_features, pr_sw_features, pr_features in feature_sets
+    ]
 
-    # Creates initial window.
-    window, window_keys = __create_window_from_file(
-        previous_chunk, issue_sw_features, pr_sw_features
+    if use_profiler:
+        profiler = FeatureProfiler()
+        profiler.profile_features(__get_all_features(feature_sets))
+
+    # Creates initial windows.
+    windows: list[Window] = [None] * len(feature_sets)
+    [windows[largest_window_index]] = __create_window_from_chunk(
+        previous_chunk, dataset_types, projection, [feature_sets[largest_window_index]]
     )
 
-    edge_count_previous_chunk = swf.get_total_count_from_sna_features(all_features)
+    # The entries of the smaller windows' current chunks, which are replayed when they
+    # start over, and the starts of their chunks that start in this chunk.
+    window_chunk_entries: list[list[dict] | None] = [None] * len(feature_sets)
+    later_window_chunk_starts: list[deque[int]] = [deque() for _ in feature_sets]
+    for window_index, window_plan in enumerate(chunk_window_plans):
+        if window_plan is None:
+            continue
+        previous_window_chunk, lead_in_range, window_chunk_starts = window_plan
+        [windows[window_index]] = __create_window_from_chunk(
+            previous_window_chunk, dataset_types, projection, [feature_sets[window_index]]
+        )
+        window_chunk_entries[window_index] = []
+        later_window_chunk_starts[window_index].extend(window_chunk_starts)
+        issue_sw_features, pr_sw_features, _ = feature_sets[window_index]
+        output_features, _ = window_features[window_index]
+        window, window_keys = windows[window_index]
+        for new_entry in __iterate_through_chunk(lead_in_range, dataset_types, projection):
+            __handle_new_entry(
+                new_entry,
+                time_windows[window_index],
+                window_keys,
+                window,
+                issue_sw_features,
+                pr_sw_features,
+                output_features,
+                None,
+            )
+            window_chunk_entries[window_index].append(new_entry)
+
+    # The edge counts of the windows' features that were replaced, and the current
+    # features' edge counts when they started (or when this chunk started).
+    edge_counts: list[dict | None] = [None] * len(feature_sets)
+    edge_counts_previous_chunk = [
+        swf.get_total_count_from_sna_features(window_all_features)
+        for _, window_all_features in window_features
+    ]
+
+    def __start_over(window_index: int):
+        """Replaces the window's features with new ones, filled with its last chunk."""
+        _, window_all_features = window_features[window_index]
+        edge_count = swf.get_total_count_from_sna_features(window_all_features)
+        edge_count = subtract_dict(edge_count, edge_counts_previous_chunk[window_index])
+        if edge_counts[window_index] is not None:
+            edge_count = add_dict(edge_counts[window_index], edge_count)
+        edge_counts[window_index] = edge_count
+        for feature in window_all_features:
+            if isinstance(feature, Closes):
+                feature.close()
+
+        feature_set = feature_factory()
+        issue_sw_features, pr_sw_features, pr_features = feature_set
+        feature_sets[window_index] = feature_set
+        window_features[window_index] = __get_output_features(
+            pr_features, pr_sw_features, issue_sw_features
+        )
+        if use_profiler:
+            profiler.profile_features(window_features[window_index][1])
+        [windows[window_index]] = __create_window(
+            window_chunk_entries[window_index], [feature_set]
+        )
+        window_chunk_entries[window_index] = []
+        edge_counts_previous_chunk[window_index] = swf.get_total_count_from_sna_features(
+            window_features[window_index][1]
+        )
 
-    print(f'Task-{task_id}: Loaded previous chunk: "{previous_chunk}".')
+    print(f'Task-{task_id}: Loaded previous chunk: "{previous_chunk_name}".')
 
     # Iterates through the current chunks entries.
-    with open(output_path, "w+", encoding="utf-8") as output_file:
-        csv_writer = csv.writer(output_file)
-        with open(current_chunk, "r", encoding="utf-8") as input_file:
-            # Iterates through all entries and handles those.
-            for line in input_file:
-                new_entry = json.loads(line)
+    # The outputs are written to temporary files first, so a crashed
+    # worker never leaves behind outputs that look complete.
+    temp_output_paths = [output_path + ".tmp" for output_path in output_paths]
+    with OpenMany(temp_output_paths, "w+", encoding="utf-8") as output_files:
+        csv_writers = [csv.writer(output_file) for output_file in output_files]
+        # Iterates through all entries and handles those in each window.
+        for new_entry in __iterate_through_chunk(
+            current_chunk, dataset_types, projection
+        ):
+            new_entry_date = new_entry[exp_utils.TS_CLOSED_AT_KEY]
+            for window_index, csv_writer in enumerate(csv_writers):
+                window_chunk_starts = later_window_chunk_starts[window_index]
+                if len(window_chunk_starts) > 0 and new_entry_date >= window_chunk_starts[0]:
+                    window_chunk_starts.popleft()
+                    __start_over(window_index)
+
+                issue_sw_features, pr_sw_features, _ = feature_sets[window_index]
+                output_features, _ = window_features[window_index]
+                window, window_keys = windows[window_index]
                 __handle_new_entry(
                     new_entry,
-                    time_window,
+                    time_windows[window_index],
                     window_keys,
                     window,
                     issue_sw_features,
@@ -325,21 +483,42 @@ def __handle_chunk(
                     output_features,
                     csv_writer,
                 )
+                if window_chunk_entries[window_index] is not None:
+                    window_chunk_entries[window_index].append(new_entry)
 
-    # Stores the edge count.
-    edge_count = swf.get_total_count_from_sna_features(all_features)
-    edge_count = subtract_dict(edge_count, edge_count_previous_chunk)
-    with open(edge_count_output_path, "w+", encoding="utf-8") as output_file:
-        output_file.write(json.dumps(edge_count))
+    # Stores the edge counts.
+    for (_, window_all_features), window_edge_counts, edge_count_previous_chunk, edge_count_output_path in zip(
+        window_features, edge_counts, edge_counts_previous_chunk, edge_count_output_paths
+    ):
+        edge_count = swf.get_total_count_from_sna_features(window_all_features)
+        edge_count = subtract_dict(edge_count, edge_count_previous_chunk)
+        if window_edge_counts is not None:
+            edge_count = add_dict(window_edge_counts, edge_count)
+        with open(edge_count_output_path + ".tmp", "w+", encoding="utf-8") as output_file:
+            output_file.write(json.dumps(edge_count))
 
     # Calls the features' close function if there is one.
-    for feature in all_features:
+    for feature in __get_all_features(feature_sets):
         if isinstance(feature, Closes):
             feature.close()
 
+    if use_profiler:
+        profile = {"worker_index": worker_index, "features": profiler.to_dict()}
+        profile_path = f"{base_path}{chunk_name}_profile.json"
+        with open(profile_path, "w+", encoding="utf-8") as output_file:
+            output_file.write(json.dumps(profile))
+
+    # Marks the chunk as complete in the run manifest.
+    output_file_names = []
+    for output_name, output_path in zip(output_names, output_paths):
+        os.replace(output_path + ".tmp", output_path)
+        os.replace(f"{output_path}_edgecount.tmp", f"{output_path}_edgecount")
+        output_file_names.extend([output_name, f"{output_name}_edgecount"])
+    record_completed_task(base_path, chunk_name, output_file_names)
+
     delta_time = datetime.now() - start_time
     print(
-        f"Task-{task_id}: Finished processing chunk in {delta_time}: {previous_chunk=}, {current_chunk=}"
+        f"Task-{task_id}: Finished processing chunk in {delta_time}: {previous_chunk_name=}, {chunk_name=}"
     )
 
 
@@ -359,14 +538,12 @@ def __create_header(features: list[Feature]) -> Iterator[str]:
 
 def __merge_chunk_results(
     output_path: str,
-    chunk_file_names: Iterator[str],
+    chunk_names: Iterator[str],
     chunk_output_base_path: str,
     output_features: list[Feature],
-    delete_chunk: bool = True,
 ):
-    # Combines the output of each file to the final output file
-    # and removes the chunk output file.
-    with open(output_path, "w+", encoding="utf-8") as output_file:
+    # Combines the output of each file to the final output file.
+    with open(output_path + ".tmp", "w+", encoding="utf-8") as output_file:
         csv_writer = csv.writer(output_file)
         header = __create_header(output_features)
         csv_writer.writerow(header)
@@ -374,15 +551,12 @@ def __merge_chunk_results(
         total_edge_counts: "dict | None" = None
 
         # Merge entries.
-        for chunk_file in chunk_file_names:
-            file_name = os.path.basename(chunk_file)
-            chunk_output_path = chunk_output_base_path + file_name
+        for chunk_name in chunk_names:
+            chunk_output_path = chunk_output_base_path + chunk_name
             print(f'Merging "{chunk_output_path}".')
             # Merges chunk
             with open(chunk_output_path, "r", encoding="utf-8") as input_file:
                 output_file.writelines(input_file)
-            if delete_chunk:
-                os.remove(chunk_output_path)
             # Merges edge count chunk
             chunk_count_output_path = f"{chunk_output_path}_edgecount"
             with open(chunk_count_output_path, "r", encoding="utf-8") as input_file:
@@ -392,52 +566,166 @@ def __merge_chunk_results(
                 else:
                     total_edge_counts = add_dict(total_edge_counts, edge_counts)
 
+    os.replace(output_path + ".tmp", output_path)
+
     print(f'Output path: "{output_path}".')
     print(f"Total SNAFeature edge counts:\n{json.dumps(total_edge_counts,indent=2)}")
+    if total_edge_counts is not None:
+        for feature_name, hit_rate in swf.get_cache_hit_rates(total_edge_counts).items():
+            print(f"{feature_name} cache hit rate: {hit_rate:.1%}.")
+        for feature_name, error_bound in swf.get_error_bounds(total_edge_counts).items():
+            print(
+                f"{feature_name} error bound: at most {error_bound:.2%} of the outputs might differ from the exact ones."
+            )
+
+
+def __merge_profiles(output_path: str, chunk_names: list[str], run_path: str):
+    """Merges the profiles of all chunks into a report next to the output."""
+
+    def __load_profiles() -> Iterator[Tuple[int, dict]]:
+        for chunk_name in chunk_names:
+            profile_path = f"{run_path}{chunk_name}_profile.json"
+            # Chunks that were completed in an earlier attempt have no profile.
+            if not os.path.exists(profile_path):
+                continue
+            with open(profile_path, "r", encoding="utf-8") as input_file:
+                profile = json.loads(input_file.read())
+            yield profile["worker_index"], profile["features"]
+
+    report_base_path, _ = os.path.splitext(output_path)
+    write_profile_report(__load_profiles(), f"{report_base_path}_profile")
+
+
+def __get_largest_window_index(window_sizes_in_days: list[int]) -> int:
+    """Returns the index of the window that the data is chunked by."""
+    return window_sizes_in_days.index(max(window_sizes_in_days))
+
+
+def __create_window_plans(
+    dataset_paths: list[str],
+    chunk_names: list[str],
+    chunk_starts: list[int],
+    window_sizes_in_days: list[int],
+) -> dict[str, list[WindowPlan | None]]:
+    """
+    Creates the plans of the smaller windows for each chunk, such that their outputs
+    are identical to a run with only that window size. The data is chunked by the
+    largest window, but a separate run would've chunked it by the smaller one, and
+    each of its chunks starts with new features that are filled with the previous
+    chunk. Those chunks don't align with the larger ones, so the smaller windows
+    are reset at the starts of their own chunks within a chunk (see ``__handle_chunk``).
+    The largest window doesn't need a plan, as its chunks are the chunks.
+    """
+
+    largest_window_index = __get_largest_window_index(window_sizes_in_days)
+    window_plans = {chunk_name: [None] * len(window_sizes_in_days) for chunk_name in chunk_names}
+    for window_index, window_size_in_days in enumerate(window_sizes_in_days):
+        if window_index == largest_window_index:
+            continue
+        window_chunk_starts = get_chunk_starts(
+            dataset_paths, timedelta(days=window_size_in_days).total_seconds()
+        )
+        window_chunks = create_data_ranges(dataset_paths, window_chunk_starts)
+        for chunk_index, chunk_name in enumerate(chunk_names):
+            chunk_start = chunk_starts[chunk_index]
+            # The window's chunk that contains the start of the chunk.
+            window_chunk_index = bisect_right(window_chunk_starts, chunk_start) - 1
+            previous_window_chunk = (
+                window_chunks[window_chunk_index - 1] if window_chunk_index > 0 else None
+            )
+            lead_in_range, _ = create_data_ranges(
+                dataset_paths, [window_chunk_starts[window_chunk_index], chunk_start]
+            )
+            next_window_chunk_index = (
+                bisect_left(window_chunk_starts, chunk_starts[chunk_index + 1])
+                if chunk_index + 1 < len(chunk_starts)
+                else len(window_chunk_starts)
+            )
+            later_window_chunk_starts = window_chunk_starts[
+                window_chunk_index + 1 : next_window_chunk_index
+            ]
+            window_plans[chunk_name][window_index] = (
+                previous_window_chunk,
+                lead_in_range,
+                later_window_chunk_starts,
+            )
+    return window_plans
+
+
+def get_window_output_path(
+    output_path: str, window_size_in_days: int, window_count: int
+) -> str:
+    """
+    Returns the output path of a window. When multiple windows are calculated,
+    the window size is added to the file name; e.g., ``dataset_90_days.csv``.
+    """
+    if window_count == 1:
+        return output_path
+    base_path, ext = os.path.splitext(output_path)
+    return f"{base_path}_{window_size_in_days}_days{ext}"
 
 
 def create_sliding_window_dataset(
     output_path: str,
-    chunk_base_path: str,
     chunk_output_base_path: str,
     input_issue_dataset_names: list[str],
     input_pr_dataset_names: list[str],
-    feature_factory: Callable[
-        [], Tuple[list[SlidingWindowFeature], list[SlidingWindowFeature], list[Feature]]
-    ],
-    window_size_in_days: int,
+    feature_factory: Callable[[], FeatureSet],
+    window_size_in_days: int | list[int],
     thread_count: int,
     chunk_count: int = -1,
+    use_event_store: bool = False,
+    use_profiler: bool = False,
 ):
     """
     Creates sliding window dataset using a multithreaded solution.
+    The datasets are split into chunks using their time indices (see ``time_index``),
+    which the workers read in place. When ``use_event_store`` is set, the input
+    datasets are read from their event stores.
+
+    The run is resumable: the chunk outputs are stored in a run directory whose
+    name is a hash of the inputs (i.e., the datasets, the dependency data, and the
+    bot lists), window size and features (see ``run_manifest``).
+    Rerunning it with the same arguments only processes the incomplete chunks.
+
+    When multiple window sizes are given, all of them are calculated in one pass
+    through the data, each with its own set of features, and each is output to
+    a separate file (see ``get_window_output_path``); so, the (positive) window
+    sizes must be unique. Each output is identical
+    to that of a run with only that window size (see ``__create_window_plans``).
+
+    When ``use_profiler`` is set, the hot paths of the features are profiled,
+    which is reported in ``<output_path>_profile.json`` and ``.csv``.
     """
 
-    print(f'Using output path "{output_path}".')
-    print(f'Using chunk base path: "{chunk_base_path}".')
+    window_sizes_in_days = (
+        [window_size_in_days]
+        if isinstance(window_size_in_days, int)
+        else list(window_size_in_days)
+    )
+    # Each window is output to its own file, so the sizes have to be unique.
+    if len(window_sizes_in_days) == 0:
+        raise ValueError("No window size is given.")
+    if len(set(window_sizes_in_days)) != len(window_sizes_in_days):
+        raise ValueError(f"Window sizes are given more than once: {window_sizes_in_days}.")
+    if min(window_sizes_in_days) <= 0:
+        raise ValueError(f"Window sizes must be positive: {window_sizes_in_days}.")
+
+    output_paths = [
+        get_window_output_path(output_path, window_size, len(window_sizes_in_days))
+        for window_size in window_sizes_in_days
+    ]
+
+    print(f'Using output paths "{output_paths}".')
     print(f'Using chunk output base path: "{chunk_output_base_path}".')
 
-    window_delta = timedelta(days=window_size_in_days)
+    # The chunks span the largest window, so they contain the smaller ones too.
+    window_delta = timedelta(days=max(window_sizes_in_days))
 
     # Creates relevant directories.
     safe_makedirs(os.path.dirname(output_path))
-    safe_makedirs(chunk_base_path)
     safe_makedirs(chunk_output_base_path)
 
-    # Creates data iterator.
-    chunk_generator = __create_data_chunk_stream(
-        input_issue_dataset_names, input_pr_dataset_names, window_delta, chunk_base_path
-    )
-    chunk_file_names = []
-    chunk_generator = chain_with_intermediary_callback(
-        chunk_generator, chunk_file_names.append
-    )
-    chunk_generator = tuple_chain(chunk_generator, yield_first=True)
-
-    if chunk_count > 0:
-        print(f"Only processing first {chunk_count} chunks. This is for testing.")
-        chunk_generator = limit(chunk_generator, chunk_count)
-
     # Selects output features
     # NOTE: they're loaded before the parallelization so that the
     # threads don't have to load the global vars separately.
@@ -455,49 +743,142 @@ def create_sliding_window_dataset(
 
     __test_feature_uniqueness(all_features)
 
+    # Strips all fields the features don't use when loading the data.
+    projection = __build_projection(all_features)
+
+    # Splits the datasets into chunks.
+    dataset_names = [*input_issue_dataset_names, *input_pr_dataset_names]
+    dataset_types = ["issues"] * len(input_issue_dataset_names)
+    dataset_types.extend(["pull-requests"] * len(input_pr_dataset_names))
+    dataset_paths = exp_utils.get_chronological_dataset_paths(
+        dataset_names, dataset_types, use_event_store
+    )
+    chunk_starts = get_chunk_starts(dataset_paths, window_delta.total_seconds())
+    chunks = create_data_ranges(dataset_paths, chunk_starts)
+    print(f"Created {len(chunks)} data chunks.")
+
+    if chunk_count > 0:
+        print(f"Only processing first {chunk_count} chunks. This is for testing.")
+        chunks = chunks[:chunk_count]
+
+    chunk_names = [str(index) for index in range(len(chunks))]
+    window_plans = __create_window_plans(
+        dataset_paths, chunk_names, chunk_starts, window_sizes_in_days
+    )
+
+    # Loads the chunks that were completed by a previous attempt of this run.
+    run_parameters = {
+        "window_sizes_in_days": window_sizes_in_days,
+        "chunk_count": chunk_count,
+        "features": [feature.__class__.__name__ for feature in all_features],
+        "header": list(__create_header(output_features)),
+        # Settings that change the outputs, but not the features (e.g., the centrality mode).
+        "feature_factory_parameters": getattr(feature_factory, "keywords", {}),
+    }
+    # The features read some files besides the datasets (e.g., the dependency
+    # graph, which was created when loading the features if it didn't exist).
+    feature_input_paths = [
+        exp_utils.TRAIN_DATASET_PATH(file_name=QL_DEPENDENCY_FILE_NAME),
+        get_dependency_graph_path(),
+        DEY_BOTS_PATH,
+        GOLZADEH_BOTS_PATH,
+    ]
+    run_key = get_run_key([*dataset_paths, *feature_input_paths], run_parameters)
+    run_path = f"{chunk_output_base_path}{run_key}/"
+    completed_chunk_names = load_completed_tasks(run_path, run_key, run_parameters)
+    print(f'Using run directory: "{run_path}".')
+    if len(completed_chunk_names) > 0:
+        print(
+            f"Resuming run: skipping {len(completed_chunk_names)}/{len(chunks)} completed chunks."
+        )
+
+    chunk_generator = tuple_chain(zip(chunk_names, chunks), yield_first=True)
+    chunk_generator = (
+        task for task in chunk_generator if task[1][0] not in completed_chunk_names
+    )
+
     # Runs all tasks.
     parallelize_tasks(
         chunk_generator,
         __handle_chunk,
         thread_count,
         # kwargs:
-        time_window=window_delta,
-        base_path=chunk_output_base_path,
+        window_sizes_in_days=window_sizes_in_days,
+        base_path=run_path,
         feature_factory=feature_factory,
+        dataset_types=dataset_types,
+        projection=projection,
+        window_plans=window_plans,
+        use_profiler=use_profiler,
     )
 
-    # Prunes all chunk data files.
-    for file in chunk_file_names:
-        os.remove(file)
+    completed_chunk_names = load_completed_tasks(run_path, run_key, run_parameters)
+    incomplete_chunk_count = len(chunks) - len(completed_chunk_names)
+    if incomplete_chunk_count > 0:
+        raise ValueError(
+            f"{incomplete_chunk_count} chunks weren't completed. Rerun with the same arguments to resume."
+        )
 
-    __merge_chunk_results(
-        output_path, chunk_file_names, chunk_output_base_path, output_features
-    )
+    for window_size, window_output_path in zip(window_sizes_in_days, output_paths):
+        window_chunk_names = [
+            __get_chunk_output_name(chunk_name, window_size)
+            for chunk_name in chunk_names
+        ]
+        __merge_chunk_results(
+            window_output_path, window_chunk_names, run_path, output_features
+        )
+
+    if use_profiler:
+        __merge_profiles(output_path, chunk_names, run_path)
+
+    shutil.rmtree(run_path)
 
     print("Done!")
 
+    return output_paths
+
 
 def all_features_factory(
     use_sna: bool,
+    centrality_mode: str = "exact",
+    fan_out_threshold: int = swf.DEFAULT_FAN_OUT_THRESHOLD,
+    use_global_centrality: bool = False,
+    use_betweenness: bool = False,
+    betweenness_radius: int = swf.DEFAULT_EGO_RADIUS,
+    betweenness_max_sources: int | None = swf.DEFAULT_MAX_SOURCES,
 ) -> Tuple[list[SlidingWindowFeature], list[SlidingWindowFeature], list[Feature]]:
     """
-    Standard factory method for all features.
+    Standard factory method for all features. The centrality mode, fan-out threshold,
+    and the global centrality and betweenness parameters configure the SNA centrality
+    features (see ``build_intra_eco_centrality_features``).
     """
 
+    # The user-project counters are shared by the experience features.
+    pr_ledger, issue_ledger = swf.build_experience_ledgers()
+
     other_pr = swf.build_other_features()
     control_sw, control = swf.build_control_variables()
-    ip_issue, ip_pr = swf.build_intra_project_features()
+    ip_issue, ip_pr = swf.build_intra_project_features(pr_ledger, issue_ledger)
     intra_se_pr, intra_se_issue = swf.build_intra_se_features()
     eco_se_pr, eco_se_issue = swf.build_eco_se_features()
-    eco_pr, eco_issue = swf.build_eco_experience()
-    deco_pr, deco_issue, ideco_pr, ideco_issue = swf.build_deco_features()
+    eco_pr, eco_issue = swf.build_eco_experience(pr_ledger, issue_ledger)
+    deco_pr, deco_issue, ideco_pr, ideco_issue = swf.build_deco_features(
+        pr_ledger, issue_ledger
+    )
 
     if use_sna:
         (
             sna_pr_graph,
             sna_issue_graph,
             local_centrality_measures,
-        ) = swf.build_intra_eco_centrality_features()
+        ) = swf.build_intra_eco_centrality_features(
+            centrality_mode,
+            fan_out_threshold,
+            use_global_centrality,
+            use_betweenness,
+            betweenness_radius,
+            betweenness_max_sources,
+        )
     else:
         print("Skipping SNA features.")
         (
@@ -507,6 +888,7 @@ def all_features_factory(
         ) = ([], [], [])
 
     issue_sw_features = [
+        issue_ledger,
         *ip_issue,
         *intra_se_issue,
         *eco_se_issue,
@@ -517,6 +899,7 @@ def all_features_factory(
     ]
 
     pr_sw_features = [
+        pr_ledger,
         *control_sw,
         *ip_pr,
         *intra_se_pr,
@@ -531,9 +914,8 @@ def all_features_factory(
         *other_pr,
         *control,
         *local_centrality_measures,
-        # NOTE: Centrality features are ignored as
-        # they take too long to compute.
-        # *centrality_features,
+        # NOTE: The global centrality features (e.g., PageRank) are
+        # calculated incrementally, and only included with ``--global-centrality``.
     ]
 
     return issue_sw_features, pr_sw_features, pr_features
@@ -561,13 +943,13 @@ def cmd_create_sliding_window_dataset():
     output_file_name = get_argv(key="-o")
     output_path = exp_utils.TRAIN_DATASET_PATH(file_name=output_file_name)
 
-    window_size_in_days = safe_get_argv(key="-w", default=None, data_type=int)
+    # Multiple (comma-separated) window sizes are calculated in one pass.
+    window_sizes_in_days = [
+        int(entry) for entry in get_argv(key="-w").split(",") if entry != ""
+    ]
     thread_count = safe_get_argv(key="-t", default=1, data_type=int)
 
     chunk_tempfile_modifier = safe_get_argv("--temp-mod", default="")
-    chunk_base_path = (
-        exp_utils.BASE_PATH + "/temp/sna_chunks/" + chunk_tempfile_modifier
-    )
     chunk_output_base_path = (
         exp_utils.BASE_PATH + "/temp/sna_output/" + chunk_tempfile_modifier
     )
@@ -575,28 +957,55 @@ def cmd_create_sliding_window_dataset():
     start = datetime.now()
 
     use_sna = not get_argv_flag("--no-sna")
+    use_event_store = get_argv_flag("--event-store")
+    use_profiler = get_argv_flag("--profile")
+    centrality_mode = safe_get_argv(key="--centrality-mode", default="exact")
+    fan_out_threshold = safe_get_argv(
+        key="--centrality-fan-out", default=swf.DEFAULT_FAN_OUT_THRESHOLD, data_type=int
+    )
+    use_global_centrality = get_argv_flag("--global-centrality")
+    use_betweenness = get_argv_flag("--betweenness")
+    betweenness_radius = safe_get_argv(
+        key="--betweenness-radius", default=swf.DEFAULT_EGO_RADIUS, data_type=int
+    )
+    # A non-positive number of sources calculates the exact betweenness.
+    betweenness_max_sources = safe_get_argv(
+        key="--betweenness-sources", default=swf.DEFAULT_MAX_SOURCES, data_type=int
+    )
+    if betweenness_max_sources <= 0:
+        betweenness_max_sources = None
 
     # This is a debug setting.
     test_chunk_count = safe_get_argv(
         key="--test-chunk-count", default=-1, data_type=int
     )
 
-    create_sliding_window_dataset(
+    output_paths = create_sliding_window_dataset(
         output_path,
-        chunk_base_path,
         chunk_output_base_path,
         input_issue_dataset_names,
         input_pr_dataset_names,
-        partial(all_features_factory, use_sna=use_sna),
-        window_size_in_days,
+        partial(
+            all_features_factory,
+            use_sna=use_sna,
+            centrality_mode=centrality_mode,
+            fan_out_threshold=fan_out_threshold,
+            use_global_centrality=use_global_centrality,
+            use_betweenness=use_betweenness,
+            betweenness_radius=betweenness_radius,
+            betweenness_max_sources=betweenness_max_sources,
+        ),
+        window_sizes_in_days,
         thread_count,
         test_chunk_count,
+        use_event_store,
+        use_profiler,
     )
 
     deltatime = datetime.now() - start
     print(f"Runtime: {deltatime}.")
 
-    return output_path
+    return output_paths
 
 
 if __name__ == "__main__":
@@ -5,6 +5,9 @@ from python_proj.data_preprocessing.sliding_window_features.base import (
     Closes,
 )
 
+from python_proj.data_preprocessing.sliding_window_features.experience_ledger import (
+    build_experience_ledgers,
+)
 from python_proj.data_preprocessing.sliding_window_features.control_variables import (
     build_control_variables,
 )
@@ -28,7 +31,14 @@ from python_proj.data_preprocessing.sliding_window_features.collaboration_experi
 )
 from python_proj.data_preprocessing.sliding_window_features.collaboration_experience.intra_eco_centrality import (
     build_intra_eco_centrality_features,
+    DEFAULT_FAN_OUT_THRESHOLD,
+)
+from python_proj.data_preprocessing.sliding_window_features.collaboration_experience.temporal_betweenness import (
+    DEFAULT_EGO_RADIUS,
+    DEFAULT_MAX_SOURCES,
 )
 from python_proj.data_preprocessing.sliding_window_features.collaboration_experience.centrality_features import (
     get_total_count_from_sna_features,
+    get_cache_hit_rates,
+    get_error_bounds,
 )
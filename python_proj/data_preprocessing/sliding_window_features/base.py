@@ -21,6 +21,13 @@ class Feature:
         # TODO: This should be deprecated since macro-scale SNA isn't used.
         return True
 
+    def get_required_fields(self) -> "list[list[str]] | None":
+        """
+        Returns the fields (as nested keys) this feature reads from entries.
+        Returns ``None`` when it's unknown, in which case no fields are stripped.
+        """
+        return None
+
 
 class SlidingWindowFeature(Feature):
     def add_entry(self, entry: dict):
@@ -36,6 +43,9 @@ class PullRequestIsMerged(Feature):
     def get_feature(self, entry: dict) -> bool:
         return entry["merged"]
 
+    def get_required_fields(self) -> list[list[str]]:
+        return [["merged"]]
+
 
 class PostRunFeature:
     def late_init(self):
@@ -61,3 +71,9 @@ class PullRequestSuccess:
             return 0.0
         else:
             return self.merged / total
+
+    def __add__(self, other: "PullRequestSuccess") -> "PullRequestSuccess":
+        return PullRequestSuccess(self.merged + other.merged, self.unmerged + other.unmerged)
+
+    def __sub__(self, other: "PullRequestSuccess") -> "PullRequestSuccess":
+        return PullRequestSuccess(self.merged - other.merged, self.unmerged - other.unmerged)
@@ -1,5 +1,7 @@
 """
 A little test to implement time-respecting betweenness centrality.
+
+NOTE: This prototype is superseded by ``collaboration_experience.temporal_betweenness``.
 """
 
 import matplotlib.pyplot as plt
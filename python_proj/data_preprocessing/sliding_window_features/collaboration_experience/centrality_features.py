@@ -3,32 +3,91 @@ Implements global centrality features for the collaboration network.
 It counts both intra-project and ecosystem-wide experience.
 """
 
+from bisect import bisect_left
+from collections import OrderedDict
 from warnings import warn
 
 import itertools
 from itertools import product
 
-from collections import deque
-import datetime as dt
-from typing import Any, Dict, Tuple, Callable, Iterator
-import networkx as nx
+from typing import Any, Dict, Hashable, Tuple, Callable, Iterator, Sequence
+
+import numpy
 
 import python_proj.utils.exp_utils as exp_utils
 from python_proj.data_preprocessing.sliding_window_features import (
     SlidingWindowFeature,
     Feature,
 )
+from python_proj.data_preprocessing.sliding_window_features.collaboration_experience.global_centrality import (
+    build_global_centrality_features,
+    IncrementalGlobalCentrality,
+)
+from python_proj.data_preprocessing.sliding_window_features.collaboration_experience.temporal_graph import (
+    NO_PROJECT_ID,
+    TemporalMultiGraph,
+)
 from python_proj.utils.util import (
     better_get_nested_many,
     resolve_callables_in_list,
-    stepped_enumerate,
 )
 
+# The number of connecting edges from which ``count_preceding_edges`` uses ``numpy``;
+# below it, the overhead of creating the arrays outweighs the gains.
+NUMPY_COUNTING_THRESHOLD = 64
+
+# The maximum number of outputs each centrality feature caches.
+CENTRALITY_CACHE_SIZE = 4096
+
+
+def count_preceding_edges(
+    connecting_timestamps: Sequence[int], experience_timestamps: Sequence[int]
+) -> int:
+    """
+    Counts the experience edges that precede each of the connecting edges,
+    weighted by the number of connecting edges from that one on; i.e., the first
+    connecting edge weighs ``len(connecting_timestamps)``, and the last 1.
+    Both timestamp sequences should be chronological, so the counts can be found
+    with binary search, and, as they don't decrease, each search starts where the
+    previous one ended; i.e., O(a log b) instead of O(a * b).
+    """
+
+    connecting_edge_count = len(connecting_timestamps)
+    experience_edge_count = len(experience_timestamps)
+    if connecting_edge_count == 0 or experience_edge_count == 0:
+        return 0
+    # All experience edges are newer, so none are counted.
+    if experience_timestamps[0] >= connecting_timestamps[-1]:
+        return 0
+    # All experience edges precede all connecting edges, so all are counted.
+    if experience_timestamps[-1] < connecting_timestamps[0]:
+        return experience_edge_count * connecting_edge_count * (connecting_edge_count + 1) // 2
+
+    if connecting_edge_count >= NUMPY_COUNTING_THRESHOLD:
+        preceding_counts = numpy.searchsorted(
+            numpy.asarray(experience_timestamps, dtype=numpy.int64),
+            numpy.asarray(connecting_timestamps, dtype=numpy.int64),
+            side="left",
+        )
+        weights = numpy.arange(connecting_edge_count, 0, -1, dtype=numpy.int64)
+        return int(numpy.dot(preceding_counts, weights))
+
+    degree = 0
+    preceding_count = 0
+    weight = connecting_edge_count
+    for connecting_edge_timestamp in connecting_timestamps:
+        preceding_count = bisect_left(
+            experience_timestamps, connecting_edge_timestamp, preceding_count
+        )
+        degree += weight * preceding_count
+        weight -= 1
+    return degree
+
 
 class SNAFeature(SlidingWindowFeature):
     def __init__(
         self,
-        graph: nx.DiGraph,
+        graph: TemporalMultiGraph,
         nested_source_keys: list[str | Callable[[dict], str]],
         nested_target_keys: list[str | Callable[[dict], str]],
     ) -> None:
@@ -43,69 +102,50 @@ class SNAFeature(SlidingWindowFeature):
         # Bookkeeping variable.
         self.total_edge_count = 0
 
-    def _add_nodes(self, nodes: int | list[int]):
-        if isinstance(nodes, int):
-            nodes = [nodes]
-        for node in nodes:
-            if not self._graph.has_node(node):
-                self._graph.add_node(node)
-
     def _add_remove_edge(
-        self, source_node: int, target_node: int, edge_timestamp: float, add_entry: bool
+        self,
+        source_node: int,
+        target_node: int,
+        edge_timestamp: int,
+        add_entry: bool,
+        project_id: int = NO_PROJECT_ID,
     ):
         """Adds a single edge, ignoring self-loops."""
         if source_node == target_node:
             return
 
-        # Grabs all edge data.
-        edge_data = self._graph.get_edge_data(source_node, target_node, default={})
-
-        # Adds queue if not existing yet.
-        if self.edge_label not in edge_data:
-            edge_data[self.edge_label] = deque()
-
-        edge_timestamps: deque = edge_data[self.edge_label]
         if add_entry:
-            edge_timestamps.append(edge_timestamp)
+            self._graph.add_edge(
+                source_node, target_node, self.edge_label, edge_timestamp, project_id
+            )
             self.total_edge_count += 1
         else:
-            if len(edge_timestamps) == 1:
-                # Deletes it to preserve some memory.
-                del edge_data[self.edge_label]
-            else:
-                # Entries are always removed chronologically,
-                # So if something has to be popped, it's always
-                # the right one.
-                edge_timestamps.popleft()
-
-        if len(edge_data) > 0:
-            # Updates edge.
-            self._graph.add_edge(source_node, target_node, **edge_data)
-        else:
-            # removes edge when it's dead to preserve some memory.
-            self._graph.remove_edge(source_node, target_node)
-
-        # Removes singular nodes to preserve some memory.
-        if nx.is_isolate(self._graph, source_node):
-            self._graph.remove_node(source_node)
-        if nx.is_isolate(self._graph, target_node):
-            self._graph.remove_node(target_node)
+            # Entries are always removed chronologically,
+            # So if something has to be popped, it's always
+            # the right one. Dead edges and nodes are removed by the graph.
+            self._graph.remove_edge(source_node, target_node, self.edge_label)
 
     def _add_remove_edges(
         self,
         sources: int | list[int],
         targets: int | list[int],
-        edge_timestamp: float,
+        edge_timestamp: int,
         add_entries: bool,
+        project_id: int = NO_PROJECT_ID,
     ):
         """Adds multiple edges, pairwise."""
         if isinstance(sources, int):
             sources = [sources]
         if isinstance(targets, int):
             targets = [targets]
-        self._add_nodes(itertools.chain(sources, targets))
         for source, target in product(sources, targets):
-            self._add_remove_edge(source, target, edge_timestamp, add_entries)
+            self._add_remove_edge(
+                source, target, edge_timestamp, add_entries, project_id
+            )
+
+    def _get_project_id(self, entry: dict) -> int:
+        """Returns the project id stored with the entry's edges."""
+        return NO_PROJECT_ID
 
     def _get_us_and_vs(self, entry: dict) -> Tuple[list[int], list[int]]:
         def __get_nodes(nested_key: list[str | Callable[[dict], str]]) -> list[int]:
@@ -121,13 +161,15 @@ class SNAFeature(SlidingWindowFeature):
 
     def add_entry(self, entry: dict):
         sources, targets = self._get_us_and_vs(entry)
-        edge_timestamp: dt.datetime = entry["__dt_closed_at"]
-        self._add_remove_edges(sources, targets, edge_timestamp.timestamp(), True)
+        edge_timestamp: int = entry[exp_utils.TS_CLOSED_AT_KEY]
+        project_id = self._get_project_id(entry)
+        self._add_remove_edges(sources, targets, edge_timestamp, True, project_id)
 
     def remove_entry(self, entry: dict):
         sources, targets = self._get_us_and_vs(entry)
-        edge_timestamp: dt.datetime = entry["__dt_closed_at"]
-        self._add_remove_edges(sources, targets, edge_timestamp.timestamp(), False)
+        edge_timestamp: int = entry[exp_utils.TS_CLOSED_AT_KEY]
+        project_id = self._get_project_id(entry)
+        self._add_remove_edges(sources, targets, edge_timestamp, False, project_id)
 
     def is_output_feature(self) -> bool:
         return False
@@ -135,16 +177,24 @@ class SNAFeature(SlidingWindowFeature):
     def get_feature(self, entry: dict) -> None:
         return
 
+    def get_required_fields(self) -> list[list[str]]:
+        return [
+            [exp_utils.TS_CLOSED_AT_KEY],
+            ["comments"],
+            *exp_utils.get_fields_of_nested_key(self.__nested_source_keys),
+            *exp_utils.get_fields_of_nested_key(self.__nested_target_keys),
+        ]
+
 
 class PRIntegratorToSubmitter(SNAFeature):
-    def __init__(self, graph: nx.DiGraph) -> None:
+    def __init__(self, graph: TemporalMultiGraph) -> None:
         super().__init__(
             graph, [exp_utils.get_integrator_key, "id"], ["user_data", "id"]
         )
 
 
 class PRCommenterToSubmitter(SNAFeature):
-    def __init__(self, graph: nx.DiGraph) -> None:
+    def __init__(self, graph: TemporalMultiGraph) -> None:
         super().__init__(
             graph, ["comments_data", "user_data", "id"], ["user_data", "id"]
         )
@@ -161,7 +211,7 @@ class PRCommenterToSubmitter(SNAFeature):
 
 
 class PRCommenterToCommenter(SNAFeature):
-    def __init__(self, graph: nx.DiGraph) -> None:
+    def __init__(self, graph: TemporalMultiGraph) -> None:
         super().__init__(
             graph,
             ["comments_data", "user_data", "id"],
@@ -189,15 +239,57 @@ class IssueCommenterToCommenter(PRCommenterToCommenter):
 
 class SNACentralityFeature(Feature):
     """
-    Base class for centrality features.
+    Base class for centrality features, which are calculated with ``_calculate_feature``.
+    They only depend on the submitter's two-hop in-neighbourhood (unless they override
+    ``_get_neighbourhood_version``), so the outputs are cached per submitter (see
+    ``_get_cache_key``) together with the version of that neighbourhood, and only
+    recalculated when edges in it have changed; e.g., this is
+    the case for the consecutive PRs of bots or bulk-closed PRs. Only the most recently
+    used outputs are kept (see ``CENTRALITY_CACHE_SIZE``).
     """
 
-    def __init__(self, graph: nx.DiGraph) -> None:
+    def __init__(self, graph: TemporalMultiGraph) -> None:
         self._graph = graph
+        self._cache: OrderedDict[Hashable, Tuple[Hashable, Any]] = OrderedDict()
 
-    def get_feature(self, entry: dict) -> Any:
+        # Bookkeeping variables. Approximate features count the
+        # calculated outputs that might differ from the exact ones.
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.calculated_outputs = 0
+        self.uncertain_outputs = 0
+
+    def _get_cache_key(self, entry: dict) -> Hashable:
+        """Returns the key of the entry's output; it should identify everything it depends on, besides the graph."""
+        return entry["user_data"]["id"]
+
+    def _get_neighbourhood_version(self, entry: dict) -> Hashable:
+        """Returns a version that changes whenever anything the output depends on in the graph changes."""
+        return self._graph.get_neighbourhood_version(entry["user_data"]["id"])
+
+    def _calculate_feature(self, entry: dict) -> Any:
         raise NotImplementedError()
 
+    def get_feature(self, entry: dict) -> Any:
+        neighbourhood_version = self._get_neighbourhood_version(entry)
+        cache_key = self._get_cache_key(entry)
+        cached = self._cache.get(cache_key)
+        if cached is not None and cached[0] == neighbourhood_version:
+            self._cache.move_to_end(cache_key)
+            self.cache_hits += 1
+            return cached[1]
+
+        self.cache_misses += 1
+        output = self._calculate_feature(entry)
+        self._cache[cache_key] = (neighbourhood_version, output)
+        self._cache.move_to_end(cache_key)
+        if len(self._cache) > CENTRALITY_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return output
+
+    def get_required_fields(self) -> list[list[str]]:
+        return [["user_data", "id"]]
+
 
 class FirstOrderDegreeCentralityV2(SNACentralityFeature):
     """
@@ -209,14 +301,14 @@ class FirstOrderDegreeCentralityV2(SNACentralityFeature):
     """
 
     def __init__(
-        self, graph: nx.DiGraph, edge_types: list[SNAFeature], count_in_degree: bool
+        self, graph: TemporalMultiGraph, edge_types: list[SNAFeature], count_in_degree: bool
     ) -> None:
         super().__init__(graph)
 
         # Determines whether the in- or out-degree is used.
         self._count_in_degree = count_in_degree
-        self._get_exp_edge_data = (
-            self._graph.in_edges if count_in_degree else self._graph.out_edges
+        self._get_exp_neighbours = (
+            self._graph.predecessors if count_in_degree else self._graph.successors
         )
 
         # Creates an enumerated dict to track edge types.
@@ -232,61 +324,31 @@ class FirstOrderDegreeCentralityV2(SNACentralityFeature):
             for experience_edge in self._edges.keys():
                 yield f"{base_name}({connecting_edge}.{experience_edge}-{in_out})"
 
-    def is_ignored_connecting_edge(
-        self, source_id: int, target_id: int, timestamp: float, edge_type: str
-    ) -> bool:
-        """Returns true if the edge should be ignored."""
-        # HACK: This is only here to get the intra vs. ecosystem experience subclasses to work.
-        return False
-
-    def get_feature(self, entry: dict) -> list[int]:
+    def _calculate_feature(self, entry: dict) -> list[int]:
         submitter_id = entry["user_data"]["id"]
 
         # Allocates the output vector.
         total_degree = [0] * (len(self._edges) ** 2)
 
         # Iterates through all incoming edges.
-        in_edges = self._graph.in_edges(nbunch=[submitter_id])
-        for neighbour_id, _ in in_edges:
-            edge_data = self._graph.get_edge_data(
-                neighbour_id, submitter_id, default={}
-            )
-
+        in_edges = self._graph.predecessors(submitter_id)
+        for neighbour_id, edge_data in in_edges.items():
             # Iterates through all of the edge types with the current neighbor.
             for connecting_edge_type, timestamped_connecting_edges in edge_data.items():
-
-                # HACK: This is only here to get the intra vs. ecosystem experience subclasses to work.
-                # If the connecting edge type is ignored, it's not considered.
-                timestamped_connecting_edges = [
-                    timestamp
-                    for timestamp in timestamped_connecting_edges
-                    if not self.is_ignored_connecting_edge(
-                        neighbour_id, submitter_id, timestamp, connecting_edge_type
-                    )
-                ]
-
                 # If the key is not tracked, it is skipped.
                 if connecting_edge_type not in self._edges:
                     continue
+                timestamped_connecting_edges = timestamped_connecting_edges.values()
                 connecting_edge_index = (
                     len(self._edges) * self._edges[connecting_edge_type]
                 )
-                timestamped_edge_count = len(timestamped_connecting_edges)
-
-                # Creates first-order (fo) edge iterator in which
-                # submitter is not involved.
-                fo_edges = self._get_exp_edge_data(neighbour_id)
-                fo_edges = [
-                    (fo_source, fo_target)
-                    for (fo_source, fo_target) in fo_edges
-                    if fo_source != submitter_id and fo_target != submitter_id
-                ]
-
-                # Iterates through all first-order edges.
-                for fo_source, fo_target in fo_edges:
-                    fo_edge_data = self._graph.get_edge_data(
-                        fo_source, fo_target, default={}
-                    )
+
+                # Iterates through all first-order (fo) edges
+                # in which submitter is not involved.
+                fo_edges = self._get_exp_neighbours(neighbour_id)
+                for fo_neighbour_id, fo_edge_data in fo_edges.items():
+                    if fo_neighbour_id == submitter_id:
+                        continue
 
                     for (
                         experience_edge_type,
@@ -296,32 +358,13 @@ class FirstOrderDegreeCentralityV2(SNACentralityFeature):
                         if experience_edge_type not in self._edges:
                             continue
                         experience_edge_index = self._edges[experience_edge_type]
+                        timestamped_experience_edges = (
+                            timestamped_experience_edges.values()
+                        )
 
-                        # Iterates through all connecting edges to sum the degree.
-                        # As the edges are stored chronologically, only one iteration
-                        # needs to be done as, if the experience edge was counted for the first,
-                        # it will be, by definition, counted for the rest as well, so it's just
-                        # multiplied by the number of relevant edges intead.
-                        degree = 0
-                        for (
-                            remaining_connected_edge_count,
-                            connecting_edge_timestamp,
-                        ) in stepped_enumerate(
-                            timestamped_connecting_edges,
-                            start=timestamped_edge_count,
-                            step=-1,
-                        ):
-                            for (
-                                experience_edge_timestamp
-                            ) in timestamped_experience_edges:
-                                if (
-                                    experience_edge_timestamp
-                                    >= connecting_edge_timestamp
-                                ):
-                                    break
-
-                                # Adds the weight.
-                                degree += remaining_connected_edge_count
+                        degree = count_preceding_edges(
+                            timestamped_connecting_edges, timestamped_experience_edges
+                        )
 
                         # Sets the output.
                         output_index = connecting_edge_index + experience_edge_index
@@ -335,8 +378,7 @@ def build_centrality_features():
 
     warn("This is deprecated", DeprecationWarning, stacklevel=2)
 
-    # TODO: replace this with a ``MultiDiGraph``
-    graph = nx.DiGraph()
+    graph = TemporalMultiGraph()
 
     pr_graph = [
         PRIntegratorToSubmitter(graph),
@@ -346,7 +388,7 @@ def build_centrality_features():
 
     issue_graph = [IssueCommenterToCommenter(graph), IssueCommenterToSubmitter(graph)]
 
-    global_centrality_measures = []
+    global_centrality_measures = build_global_centrality_features(graph)
 
     local_centrality_measures = [
         FirstOrderDegreeCentralityV2(
@@ -368,8 +410,66 @@ def build_centrality_features():
 
 
 def get_total_count_from_sna_features(features: list[Feature]) -> Dict[str, int]:
-    return {
+    """
+    Returns the edge counts of the SNA features, the edges and nodes created in their
+    graphs, the cache hits and misses of the centrality features, and the batches and
+    sweeps of the global ones.
+    """
+    counts = {
         feature.get_name(): feature.total_edge_count
         for feature in features
         if isinstance(feature, SNAFeature)
     }
+    graphs = {
+        id(feature._graph): feature._graph
+        for feature in features
+        if isinstance(feature, SNAFeature)
+    }
+    for graph in graphs.values():
+        counts["TemporalMultiGraph.created_edges"] = (
+            counts.get("TemporalMultiGraph.created_edges", 0) + graph.created_edges
+        )
+        counts["TemporalMultiGraph.created_nodes"] = (
+            counts.get("TemporalMultiGraph.created_nodes", 0) + graph.created_nodes
+        )
+    for feature in features:
+        if isinstance(feature, SNACentralityFeature):
+            feature_name = feature.__class__.__name__
+            counts[f"{feature_name}.cache_hits"] = feature.cache_hits
+            counts[f"{feature_name}.cache_misses"] = feature.cache_misses
+            counts[f"{feature_name}.calculated_outputs"] = feature.calculated_outputs
+            counts[f"{feature_name}.uncertain_outputs"] = feature.uncertain_outputs
+        elif isinstance(feature, IncrementalGlobalCentrality):
+            feature_name = feature.__class__.__name__
+            counts[f"{feature_name}.batches"] = feature.batches
+            counts[f"{feature_name}.sweeps"] = feature.sweeps
+    return counts
+
+
+def get_cache_hit_rates(counts: Dict[str, int]) -> Dict[str, float]:
+    """Returns the cache hit rate per centrality feature from the output of ``get_total_count_from_sna_features``."""
+    hit_rates = {}
+    for key, cache_hits in counts.items():
+        if not key.endswith(".cache_hits"):
+            continue
+        feature_name = key[: -len(".cache_hits")]
+        lookups = cache_hits + counts[f"{feature_name}.cache_misses"]
+        hit_rates[feature_name] = cache_hits / lookups if lookups > 0 else 0.0
+    return hit_rates
+
+
+def get_error_bounds(counts: Dict[str, int]) -> Dict[str, float]:
+    """
+    Returns the error bound per centrality feature from the output of ``get_total_count_from_sna_features``;
+    i.e., the fraction of the calculated outputs that might differ from the exact ones.
+    """
+    error_bounds = {}
+    for key, uncertain_outputs in counts.items():
+        if not key.endswith(".uncertain_outputs"):
+            continue
+        feature_name = key[: -len(".uncertain_outputs")]
+        calculated_outputs = counts[f"{feature_name}.calculated_outputs"]
+        error_bounds[feature_name] = (
+            uncertain_outputs / calculated_outputs if calculated_outputs > 0 else 0.0
+        )
+    return error_bounds
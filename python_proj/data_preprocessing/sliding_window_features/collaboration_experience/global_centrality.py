@@ -0,0 +1,285 @@
+"""
+Implements global centrality measures for the collaboration network; i.e.,
+the standing of the submitter in the whole (windowed) ecosystem, rather than
+in its neighbourhood. Recomputing those from scratch for every PR takes way
+too long, so they're maintained incrementally instead: the changed edges are
+applied to a sparse matrix in batches (see ``CollaborationMatrix``), after
+which a few power-iteration sweeps are performed, starting from the previous
+solution. As the window only changes slightly per batch, the previous solution
+is a very good starting point, and it typically converges within a few sweeps.
+
+NOTE: The outputs are approximations; they lag behind by at most one batch of
+edge changes, and are at most ``DEFAULT_SWEEP_COUNT`` sweeps away from the
+previous solution. Nodes that were added since the last batch have no score yet.
+"""
+
+import numpy
+from scipy import sparse
+
+from python_proj.data_preprocessing.sliding_window_features import Feature
+from python_proj.data_preprocessing.sliding_window_features.collaboration_experience.temporal_graph import (
+    TemporalMultiGraph,
+)
+
+# The number of changed pairs of nodes after which the matrix is updated.
+DEFAULT_BATCH_SIZE = 1000
+# The maximum number of power-iteration sweeps per batch.
+DEFAULT_SWEEP_COUNT = 3
+# The maximum number of sweeps without a previous solution.
+COLD_START_SWEEP_COUNT = 100
+# The L1 norm of the change in scores at which the power iteration stops.
+CONVERGENCE_TOLERANCE = 1e-6
+
+PAGE_RANK_DAMPING = 0.85
+
+
+class CollaborationMatrix:
+    """
+    Weighted adjacency matrix of the collaboration graph, which is shared by the
+    global centrality measures. The weight of an edge is the number of interactions
+    (of any type) from the source to the target in the window. Every user gets a
+    row/column index, which is reused once it's removed from the graph.
+
+    The edges are stored in (coordinate format) arrays, in which every pair of
+    nodes has a fixed slot, so changing an edge is O(1). Once per batch, these are
+    converted into a CSR matrix for the power iteration, which takes O(E) time; i.e.,
+    as long as a sweep does.
+    """
+
+    def __init__(self, graph: TemporalMultiGraph, batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+        self._graph = graph
+        self._graph.track_changed_edges()
+        self._batch_size = batch_size
+
+        self._node_indices: dict[int, int] = {}
+        self._free_node_indices: list[int] = []
+        self._new_node_indices: list[int] = []
+        self._edge_slots: dict[tuple[int, int], int] = {}
+        self._free_edge_slots: list[int] = []
+        self._rows = numpy.zeros(0, dtype=numpy.int64)
+        self._columns = numpy.zeros(0, dtype=numpy.int64)
+        self._weights = numpy.zeros(0, dtype=numpy.float64)
+
+        # The matrix of the last batch; i.e., what the measures iterate on.
+        self.batch = 0
+        self.node_capacity = 0
+        self.transposed_matrix = sparse.csr_matrix((0, 0), dtype=numpy.float64)
+        self.out_weights = numpy.zeros(0, dtype=numpy.float64)
+        self.is_active = numpy.zeros(0, dtype=bool)
+        self.is_new = numpy.zeros(0, dtype=bool)
+        self.active_node_count = 0
+
+    def get_node_index(self, node: int) -> int | None:
+        """Returns the index of the node in the last batch, if it was part of it."""
+        return self._node_indices.get(node)
+
+    def __get_or_add_node_index(self, node: int) -> int:
+        index = self._node_indices.get(node)
+        if index is not None:
+            return index
+        if len(self._free_node_indices) > 0:
+            index = self._free_node_indices.pop()
+        else:
+            index = len(self._node_indices)
+        self._node_indices[node] = index
+        self._new_node_indices.append(index)
+        return index
+
+    def __get_or_add_edge_slot(self, source: int, target: int) -> int:
+        slot = self._edge_slots.get((source, target))
+        if slot is not None:
+            return slot
+        if len(self._free_edge_slots) > 0:
+            slot = self._free_edge_slots.pop()
+        else:
+            slot = len(self._edge_slots)
+            if slot >= len(self._weights):
+                # Doubles the capacity, so appending takes amortized O(1) time.
+                capacity = max(2 * len(self._weights), 1024)
+                self._rows = numpy.resize(self._rows, capacity)
+                self._columns = numpy.resize(self._columns, capacity)
+                self._weights = numpy.resize(self._weights, capacity)
+                self._weights[slot:] = 0
+        self._edge_slots[(source, target)] = slot
+        self._rows[slot] = self.__get_or_add_node_index(source)
+        self._columns[slot] = self.__get_or_add_node_index(target)
+        return slot
+
+    def __apply_changed_edges(self):
+        changed_edges = self._graph.pop_changed_edges()
+        changed_nodes = set()
+        for source, target in changed_edges:
+            weight = self._graph.get_edge_weight(source, target)
+            if weight > 0:
+                slot = self.__get_or_add_edge_slot(source, target)
+                self._weights[slot] = weight
+                continue
+            changed_nodes.add(source)
+            changed_nodes.add(target)
+            slot = self._edge_slots.pop((source, target), None)
+            if slot is not None:
+                self._weights[slot] = 0
+                self._free_edge_slots.append(slot)
+
+        # Frees the indices of the nodes that left the graph; all of
+        # their edges were removed, so no slot with a weight refers to them.
+        for node in changed_nodes:
+            if not self._graph.has_node(node) and node in self._node_indices:
+                self._free_node_indices.append(self._node_indices.pop(node))
+
+    def refresh(self) -> bool:
+        """
+        Applies the changed edges if there are at least a batch of them (or if there
+        is no matrix yet), and returns true if this created a new batch.
+        """
+        changed_edge_count = self._graph.get_changed_edge_count()
+        if changed_edge_count == 0:
+            return False
+        if changed_edge_count < self._batch_size and self.batch > 0:
+            return False
+
+        self.__apply_changed_edges()
+
+        self.node_capacity = len(self._node_indices) + len(self._free_node_indices)
+        edge_count = len(self._edge_slots) + len(self._free_edge_slots)
+        rows = self._rows[:edge_count]
+        columns = self._columns[:edge_count]
+        weights = self._weights[:edge_count]
+        # Freed slots have a weight of 0, so they don't affect the results.
+        self.transposed_matrix = sparse.csr_matrix(
+            (weights, (columns, rows)), shape=(self.node_capacity, self.node_capacity)
+        )
+        self.out_weights = numpy.bincount(rows, weights=weights, minlength=self.node_capacity)
+        self.is_active = numpy.zeros(self.node_capacity, dtype=bool)
+        self.is_active[list(self._node_indices.values())] = True
+        self.is_new = numpy.zeros(self.node_capacity, dtype=bool)
+        self.is_new[self._new_node_indices] = True
+        self._new_node_indices = []
+        self.active_node_count = len(self._node_indices)
+        self.batch += 1
+        return True
+
+
+class IncrementalGlobalCentrality(Feature):
+    """
+    Base class for the global centrality measures, which are calculated with
+    power iteration (see ``_sweep``) on the ``CollaborationMatrix``. The scores
+    sum to 1, but are multiplied by the number of nodes in the output, such that
+    the average node has a score of 1, regardless of the size of the network.
+    """
+
+    def __init__(
+        self, collaboration_matrix: CollaborationMatrix, sweep_count: int = DEFAULT_SWEEP_COUNT
+    ) -> None:
+        self._matrix = collaboration_matrix
+        self._sweep_count = sweep_count
+        self._scores = numpy.zeros(0, dtype=numpy.float64)
+        self._solved_batch = 0
+
+        # Bookkeeping variables.
+        self.batches = 0
+        self.sweeps = 0
+
+    def _sweep(self, scores: numpy.ndarray) -> numpy.ndarray:
+        """Performs one power-iteration sweep; the input and output scores sum to 1."""
+        raise NotImplementedError()
+
+    def __warm_start(self) -> numpy.ndarray:
+        """Returns the previous solution, in which new nodes get the average score."""
+        matrix = self._matrix
+        scores = numpy.zeros(matrix.node_capacity, dtype=numpy.float64)
+        previous_length = min(len(self._scores), matrix.node_capacity)
+        scores[:previous_length] = self._scores[:previous_length]
+        scores[~matrix.is_active] = 0
+        # Indices can be reused, so the new nodes' scores are overwritten.
+        scores[matrix.is_new & matrix.is_active] = 1 / matrix.active_node_count
+        return scores / scores.sum()
+
+    def __solve(self):
+        is_cold_start = self._solved_batch == 0
+        self._solved_batch = self._matrix.batch
+        self.batches += 1
+        if self._matrix.active_node_count == 0:
+            self._scores = numpy.zeros(self._matrix.node_capacity, dtype=numpy.float64)
+            return
+
+        scores = self.__warm_start()
+        sweep_count = COLD_START_SWEEP_COUNT if is_cold_start else self._sweep_count
+        for _ in range(sweep_count):
+            new_scores = self._sweep(scores)
+            self.sweeps += 1
+            change = numpy.abs(new_scores - scores).sum()
+            scores = new_scores
+            if change < CONVERGENCE_TOLERANCE:
+                break
+        self._scores = scores
+
+    def get_feature(self, entry: dict) -> float:
+        self._matrix.refresh()
+        if self._solved_batch != self._matrix.batch:
+            self.__solve()
+
+        index = self._matrix.get_node_index(entry["user_data"]["id"])
+        if index is None or index >= len(self._scores):
+            return 0.0
+        return float(self._scores[index] * self._matrix.active_node_count)
+
+    def get_required_fields(self) -> list[list[str]]:
+        return [["user_data", "id"]]
+
+
+class GlobalPageRankCentrality(IncrementalGlobalCentrality):
+    """
+    Weighted PageRank, in which interactions are edges towards the users that received
+    them (e.g., from the integrator to the submitter). Users without out-edges distribute
+    their score uniformly, like the random jumps (see ``networkx.pagerank``).
+    """
+
+    def __init__(
+        self,
+        collaboration_matrix: CollaborationMatrix,
+        sweep_count: int = DEFAULT_SWEEP_COUNT,
+        damping: float = PAGE_RANK_DAMPING,
+    ) -> None:
+        super().__init__(collaboration_matrix, sweep_count)
+        self._damping = damping
+
+    def _sweep(self, scores: numpy.ndarray) -> numpy.ndarray:
+        matrix = self._matrix
+        has_out_edges = matrix.out_weights > 0
+        transition_scores = numpy.zeros_like(scores)
+        transition_scores[has_out_edges] = scores[has_out_edges] / matrix.out_weights[has_out_edges]
+        new_scores = self._damping * (matrix.transposed_matrix @ transition_scores)
+
+        dangling_score = scores[~has_out_edges].sum()
+        jump_score = self._damping * dangling_score + (1 - self._damping)
+        new_scores[matrix.is_active] += jump_score / matrix.active_node_count
+        return new_scores
+
+
+class GlobalEigenvectorCentrality(IncrementalGlobalCentrality):
+    """
+    Eigenvector centrality of the undirected collaboration network (i.e., interactions
+    count in both directions), as collaboration is mostly mutual and the directed graph
+    has many users without in-edges. Every sweep multiplies with ``I + A + A^T``, which
+    has the same principal eigenvector but converges when the graph is bipartite
+    (see ``networkx.eigenvector_centrality``).
+    """
+
+    def _sweep(self, scores: numpy.ndarray) -> numpy.ndarray:
+        transposed_matrix = self._matrix.transposed_matrix
+        new_scores = scores + transposed_matrix @ scores + transposed_matrix.T @ scores
+        return new_scores / new_scores.sum()
+
+
+def build_global_centrality_features(
+    graph: TemporalMultiGraph,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    sweep_count: int = DEFAULT_SWEEP_COUNT,
+) -> list[IncrementalGlobalCentrality]:
+    """Factory method for the global centrality features, which share one matrix."""
+    collaboration_matrix = CollaborationMatrix(graph, batch_size)
+    return [
+        GlobalPageRankCentrality(collaboration_matrix, sweep_count),
+        GlobalEigenvectorCentrality(collaboration_matrix, sweep_count),
+    ]
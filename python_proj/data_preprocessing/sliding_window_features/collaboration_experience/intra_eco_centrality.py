@@ -1,88 +1,76 @@
 """
-Implements Second-order degree centrality for the collaboration networs. This is 
+Implements Second-order degree centrality for the collaboration networs. This is
 done two-fold: 1) only considering intra-project connecting edges, and 2) only
 considering ecosystem connectin edges.
 
-All of these classes are tightly coupled with the old centrality features,
-overriding only the behaviors necessary to make the additional checks.
+The SNA features are tightly coupled with the old centrality features,
+overriding only the behaviors necessary to track the projects of the edges.
 """
 
-from typing import Callable, Tuple, List
-from networkx import DiGraph
+from itertools import islice
+from typing import Callable, Hashable, Iterator, Tuple, List
 
 from python_proj.data_preprocessing.sliding_window_features.collaboration_experience.centrality_features import (
     SNAFeature,
     SNACentralityFeature,
-    FirstOrderDegreeCentralityV2,
+    count_preceding_edges,
+)
+from python_proj.data_preprocessing.sliding_window_features.collaboration_experience.global_centrality import (
+    build_global_centrality_features,
+    IncrementalGlobalCentrality,
+)
+from python_proj.data_preprocessing.sliding_window_features.collaboration_experience.temporal_betweenness import (
+    DEFAULT_EGO_RADIUS,
+    DEFAULT_MAX_SOURCES,
+    TemporalEgoBetweennessCentrality,
+)
+from python_proj.data_preprocessing.sliding_window_features.collaboration_experience.temporal_graph import (
+    TemporalMultiGraph,
+    TimestampQueue,
 )
 
 from python_proj.utils.exp_utils import (
     get_integrator_key,
     SOURCE_PATH_KEY,
-    get_repository_name_from_source_path,
+    PROJECT_ID_KEY,
 )
 
 
 class SNAFeatureV2(SNAFeature):
     """
     Implements new SNA feature that keeps track of projects in
-    which development activities are performed.
+    which development activities are performed; the project
+    id is stored with each edge's timestamp.
     """
 
     def __init__(
         self,
-        graph: DiGraph,
-        edge_to_project_mapping: dict,
+        graph: TemporalMultiGraph,
         nested_source_keys: list[str | Callable[[dict], str]],
         nested_target_keys: list[str | Callable[[dict], str]],
     ) -> None:
         super().__init__(graph, nested_source_keys, nested_target_keys)
-        self._edge_to_project_mapping: dict = edge_to_project_mapping
-        # HACK: It assumes the right entry is set before the `_add_remove_edge` is called, which will break down when inherited incorrectly.
-        self._current_entry: None | dict = None
-
-    def _build_edge_key(
-        self, source_node: int, target_node: int, timestamp: float
-    ) -> int:
-        return _build_edge_key(source_node, target_node, timestamp, self.edge_label)
-
-    def _add_remove_edge(
-        self, source_node: int, target_node: int, edge_timestamp: float, add_entry: bool
-    ):
-        super()._add_remove_edge(source_node, target_node, edge_timestamp, add_entry)
-        edge_key = self._build_edge_key(source_node, target_node, edge_timestamp)
-        repo_name = get_repository_name_from_source_path(
-            self._current_entry[SOURCE_PATH_KEY]
-        )
-        if add_entry:
-            self._edge_to_project_mapping[edge_key] = repo_name
-        elif edge_key in self._edge_to_project_mapping:
-            del self._edge_to_project_mapping[edge_key]
 
-    def add_entry(self, entry: dict):
-        self._current_entry = entry
-        super().add_entry(entry)
+    def _get_project_id(self, entry: dict) -> int:
+        return entry[PROJECT_ID_KEY]
 
-    def remove_entry(self, entry: dict):
-        self._current_entry = entry
-        super().remove_entry(entry)
+    def get_required_fields(self) -> list[list[str]]:
+        return [[SOURCE_PATH_KEY], *super().get_required_fields()]
 
 
 class PRIntegratorToSubmitterV2(SNAFeatureV2):
-    def __init__(self, graph: DiGraph, edge_to_project_mapping: dict) -> None:
+    def __init__(self, graph: TemporalMultiGraph) -> None:
         super().__init__(
             graph,
-            edge_to_project_mapping,
             [get_integrator_key, "id"],
             ["user_data", "id"],
         )
 
 
 class PRCommenterToSubmitterV2(SNAFeatureV2):
-    def __init__(self, graph: DiGraph, edge_to_project_mapping: dict) -> None:
+    def __init__(self, graph: TemporalMultiGraph) -> None:
         super().__init__(
             graph,
-            edge_to_project_mapping,
             ["comments_data", "user_data", "id"],
             ["user_data", "id"],
         )
@@ -99,10 +87,9 @@ class PRCommenterToSubmitterV2(SNAFeatureV2):
 
 
 class PRCommenterToCommenterV2(SNAFeatureV2):
-    def __init__(self, graph: DiGraph, edge_to_project_mapping: dict) -> None:
+    def __init__(self, graph: TemporalMultiGraph) -> None:
         super().__init__(
             graph,
-            edge_to_project_mapping,
             ["comments_data", "user_data", "id"],
             ["comments_data", "user_data", "id"],
         )
@@ -126,135 +113,283 @@ class IssueCommenterToCommenterV2(PRCommenterToCommenterV2):
     """Only here for the name."""
 
 
-class IntraProjectSecondOrderInDegreeCentrality(FirstOrderDegreeCentralityV2):
-    """
-    Second-order degree centrality feature,
-    only considering intra-project connecting edges.
-    """
-
-    def __init__(
-        self,
-        graph: DiGraph,
-        edge_to_project_mapping: dict,
-        edge_types: List[SNAFeature],
-        count_in_degree: bool = True,
-    ) -> None:
-        super().__init__(graph, edge_types, count_in_degree)
-        self._edge_to_project_mapping = edge_to_project_mapping
-        # HACK: Same problem as in `SNAFeatureV2`.
-        self._current_entry: None | dict = None
-
-    def is_ignored_connecting_edge(
-        self,
-        source_id: int,
-        target_id: int,
-        timestamp: float,
-        edge_type: str,
-    ) -> bool:
-        current_repo = get_repository_name_from_source_path(
-            self._current_entry[SOURCE_PATH_KEY]
-        )
-        edge_key = _build_edge_key(source_id, target_id, timestamp, edge_type)
-        edge_repo = self._edge_to_project_mapping[edge_key]
-        return current_repo != edge_repo
-
-    def get_feature(self, entry: dict) -> List[int]:
-        self._current_entry = entry
-        return super().get_feature(entry)
+# The modes in which the second-order centrality can be calculated (see ``IntraEcoSecondOrderDegreeCentrality``).
+CENTRALITY_MODES = ["exact", "approx"]
 
+# The number of first-order edges per neighbour that are visited in the approximate mode.
+DEFAULT_FAN_OUT_THRESHOLD = 1000
 
-class IntraProjectSecondOrderOutDegreeCentrality(
-    IntraProjectSecondOrderInDegreeCentrality
-):
-    """Here for the name."""
 
-    def __init__(
-        self,
-        graph: DiGraph,
-        edge_to_project_mapping: dict,
-        edge_types: List[SNAFeature],
-        count_in_degree: bool = False,
-    ) -> None:
-        super().__init__(graph, edge_to_project_mapping, edge_types, count_in_degree)
-
-
-class EcosystemSecondOrderInDegreeCentrality(IntraProjectSecondOrderInDegreeCentrality):
+class IntraEcoSecondOrderDegreeCentrality(SNACentralityFeature):
     """
-    Second-order degree centrality feature,
-    only considering ecosystem connecting edges.
+    Second-order degree centrality features, for both in- and out-degree, and
+    only considering either intra-project or ecosystem connecting edges. These
+    used to be four separate features, each traversing the submitter's neighbourhood;
+    as they visit the same edges, they're calculated in a single traversal, and an
+    edge is intra-project when the project id stored with it is the current project.
+
+    The outputs are ordered, and named, like the separate features were:
+    intra-project in- and out-degree, followed by ecosystem in- and out-degree.
+
+    NOTE: The separate features looked up the project of an edge with a
+    "source:target:timestamp:type" key, so edges between the same users that were
+    closed in the same second (e.g., bulk closes by bots) all got the project of
+    the last one. As the project id is stored per edge now, their outputs differ.
+
+    NOTE: Each output is set (not summed) for every combination of neighbour and first-order
+    edge with the connecting and experience edge type, so it's determined by the last one
+    (in iteration order). Therefore, the neighbourhood is traversed in reverse, and the
+    traversal stops as soon as all outputs are found, which gives identical results.
+    When outputs don't occur, it still visits all first-order edges of every neighbour,
+    which is slow for hubs. In the approximate mode (``centrality_mode="approx"``), only
+    the ``fan_out_threshold`` most recent first-order edges per neighbour are visited.
+    Outputs that weren't found before such a cut-off might differ from the exact ones;
+    these are counted in ``uncertain_outputs``, which bounds the error.
     """
 
-    def is_ignored_connecting_edge(
-        self,
-        source_id: int,
-        target_id: int,
-        timestamp: float,
-        edge_type: str,
-    ) -> bool:
-        # Inverts the result from the intra-project filter, as anything that's
-        # not intra-project must be in the rest of the ecosystem.
-        return not super().is_ignored_connecting_edge(
-            source_id, target_id, timestamp, edge_type
-        )
-
-
-class EcosystemSecondOrderOutDegreeCentrality(EcosystemSecondOrderInDegreeCentrality):
-    """Here for the name"""
-
-    # TODO: Because In-/Out Degree is now determined by inheritence, the output name contains "In" / "Out" twice, which is unnecessary.
+    # The name and direction of each output vector, in order.
+    OUTPUT_VECTORS = [
+        ("IntraProjectSecondOrderInDegreeCentrality", "In"),
+        ("IntraProjectSecondOrderOutDegreeCentrality", "Out"),
+        ("EcosystemSecondOrderInDegreeCentrality", "In"),
+        ("EcosystemSecondOrderOutDegreeCentrality", "Out"),
+    ]
 
     def __init__(
         self,
-        graph: DiGraph,
-        edge_to_project_mapping: dict,
+        graph: TemporalMultiGraph,
         edge_types: List[SNAFeature],
-        count_in_degree: bool = False,
+        centrality_mode: str = "exact",
+        fan_out_threshold: int = DEFAULT_FAN_OUT_THRESHOLD,
     ) -> None:
-        super().__init__(graph, edge_to_project_mapping, edge_types, count_in_degree)
+        super().__init__(graph)
+
+        if centrality_mode not in CENTRALITY_MODES:
+            raise ValueError(
+                f"Unknown centrality mode {centrality_mode}; use one of {CENTRALITY_MODES}."
+            )
+        self._fan_out_threshold = (
+            fan_out_threshold if centrality_mode == "approx" else None
+        )
 
+        # Creates an enumerated dict to track edge types.
+        # The index is used to generate the output vectors.
+        self._edges: dict[str, int] = {
+            edge.get_name(): i for i, edge in enumerate(edge_types)
+        }
+
+    def get_name(self) -> Iterator[str]:
+        for base_name, in_out in self.OUTPUT_VECTORS:
+            for connecting_edge in self._edges.keys():
+                for experience_edge in self._edges.keys():
+                    yield f"{base_name}({connecting_edge}.{experience_edge}-{in_out})"
+
+    def _get_cache_key(self, entry: dict) -> Hashable:
+        # The outputs depend on the current project as well.
+        return entry["user_data"]["id"], entry[PROJECT_ID_KEY]
+
+    def _calculate_feature(self, entry: dict) -> List[int]:
+        submitter_id = entry["user_data"]["id"]
+        current_project_id = entry[PROJECT_ID_KEY]
+        edge_type_count = len(self._edges)
+
+        # Allocates the output vectors, which are stored back to back.
+        vector_length = edge_type_count**2
+        total_degree = [0] * (len(self.OUTPUT_VECTORS) * vector_length)
+        intra_in_offset, intra_out_offset, eco_in_offset, eco_out_offset = (
+            index * vector_length for index in range(len(self.OUTPUT_VECTORS))
+        )
+        directions = [
+            (self._graph.predecessors, intra_in_offset, eco_in_offset),
+            (self._graph.successors, intra_out_offset, eco_out_offset),
+        ]
+
+        # Tracks, per direction and connecting edge type, the experience edge
+        # types of which the output hasn't been found yet, and those that
+        # might be inexact because a neighbour's first-order edges were cut off.
+        remaining_outputs = [
+            [set(range(edge_type_count)) for _ in range(edge_type_count)]
+            for _ in directions
+        ]
+        remaining_output_count = len(directions) * vector_length
+        uncertain_outputs = [
+            [set() for _ in range(edge_type_count)] for _ in directions
+        ]
+
+        def __split_connecting_edges(
+            timestamped_connecting_edges: TimestampQueue,
+        ) -> Tuple[List[int], List[int]]:
+            """Splits the connecting edges into intra-project and ecosystem edges."""
+            intra_connecting_edges = []
+            eco_connecting_edges = []
+            for timestamp, project_id in zip(
+                timestamped_connecting_edges.values(),
+                timestamped_connecting_edges.project_ids(),
+            ):
+                if project_id == current_project_id:
+                    intra_connecting_edges.append(timestamp)
+                else:
+                    eco_connecting_edges.append(timestamp)
+            return intra_connecting_edges, eco_connecting_edges
+
+        # Iterates through all incoming edges, starting at the most recent neighbour.
+        in_edges = self._graph.predecessors(submitter_id)
+        for neighbour_id, edge_data in reversed(in_edges.items()):
+            # The tracked edge types with the current neighbour, which are split lazily.
+            connecting_edges = {
+                self._edges[connecting_edge_type]: timestamped_connecting_edges
+                for connecting_edge_type, timestamped_connecting_edges in edge_data.items()
+                if connecting_edge_type in self._edges
+            }
+            split_connecting_edges: dict[int, Tuple[List[int], List[int]]] = {}
+
+            for direction, (get_fo_edges, intra_offset, eco_offset) in enumerate(directions):
+                direction_remaining_outputs = remaining_outputs[direction]
+                active_connecting_edges = [
+                    connecting_edge_index
+                    for connecting_edge_index in connecting_edges
+                    if len(direction_remaining_outputs[connecting_edge_index]) > 0
+                ]
+                if len(active_connecting_edges) == 0:
+                    continue
+
+                # Iterates through the first-order (fo) edges in which
+                # submitter is not involved, starting at the most recent one.
+                fo_edges = get_fo_edges(neighbour_id)
+                fo_edge_iterator = reversed(fo_edges.items())
+                if self._fan_out_threshold is not None:
+                    # Dead edges (which have no edge data) don't count towards the threshold.
+                    fo_edge_iterator = (
+                        fo_edge for fo_edge in fo_edge_iterator if len(fo_edge[1]) > 0
+                    )
+                    remaining_fo_edges = fo_edge_iterator
+                    fo_edge_iterator = islice(remaining_fo_edges, self._fan_out_threshold)
+                for fo_neighbour_id, fo_edge_data in fo_edge_iterator:
+                    if fo_neighbour_id == submitter_id:
+                        continue
+
+                    for (
+                        experience_edge_type,
+                        timestamped_experience_edges,
+                    ) in fo_edge_data.items():
+                        # If it's not tracked, it's skipped.
+                        experience_edge_index = self._edges.get(experience_edge_type)
+                        if experience_edge_index is None:
+                            continue
+                        timestamped_experience_edges = timestamped_experience_edges.values()
+
+                        for connecting_edge_index in active_connecting_edges:
+                            connecting_remaining_outputs = direction_remaining_outputs[
+                                connecting_edge_index
+                            ]
+                            if experience_edge_index not in connecting_remaining_outputs:
+                                continue
+                            connecting_remaining_outputs.remove(experience_edge_index)
+                            remaining_output_count -= 1
+
+                            if connecting_edge_index not in split_connecting_edges:
+                                split_connecting_edges[connecting_edge_index] = (
+                                    __split_connecting_edges(
+                                        connecting_edges[connecting_edge_index]
+                                    )
+                                )
+                            intra_connecting_edges, eco_connecting_edges = (
+                                split_connecting_edges[connecting_edge_index]
+                            )
+
+                            # Sets the outputs.
+                            output_index = (
+                                edge_type_count * connecting_edge_index
+                                + experience_edge_index
+                            )
+                            total_degree[intra_offset + output_index] = count_preceding_edges(
+                                intra_connecting_edges, timestamped_experience_edges
+                            )
+                            total_degree[eco_offset + output_index] = count_preceding_edges(
+                                eco_connecting_edges, timestamped_experience_edges
+                            )
+
+                    active_connecting_edges = [
+                        connecting_edge_index
+                        for connecting_edge_index in active_connecting_edges
+                        if len(direction_remaining_outputs[connecting_edge_index]) > 0
+                    ]
+                    if len(active_connecting_edges) == 0:
+                        break
+
+                # The outputs that weren't found yet might've been in the cut-off edges.
+                is_cut_off = (
+                    self._fan_out_threshold is not None
+                    and next(remaining_fo_edges, None) is not None
+                )
+                if is_cut_off:
+                    for connecting_edge_index in active_connecting_edges:
+                        uncertain_outputs[direction][connecting_edge_index].update(
+                            direction_remaining_outputs[connecting_edge_index]
+                        )
+
+            if remaining_output_count == 0:
+                break
+
+        # Each uncertain output affects both the intra-project and ecosystem vector.
+        self.calculated_outputs += len(total_degree)
+        self.uncertain_outputs += 2 * sum(
+            len(experience_edge_indices)
+            for direction_uncertain_outputs in uncertain_outputs
+            for experience_edge_indices in direction_uncertain_outputs
+        )
 
-def _build_edge_key(
-    source_node: int, target_node: int, timestamp: float, edge_type: str
-) -> int:
-    """Builds a key based on the given variables."""
-    key = f"{source_node}:{target_node}:{timestamp}:{edge_type}"
-    return hash(key)
+        return total_degree
 
+    def get_required_fields(self) -> list[list[str]]:
+        return [[SOURCE_PATH_KEY], *super().get_required_fields()]
 
-def build_intra_eco_centrality_features() -> (
-    Tuple[List[SNAFeature], List[SNAFeature], List[SNACentralityFeature]]
-):
-    """Factory methods for the centrality features V2."""
 
-    edge_to_project_mapping = dict()
-    graph = DiGraph()
+def build_intra_eco_centrality_features(
+    centrality_mode: str = "exact",
+    fan_out_threshold: int = DEFAULT_FAN_OUT_THRESHOLD,
+    use_global_centrality: bool = False,
+    use_betweenness: bool = False,
+    betweenness_radius: int = DEFAULT_EGO_RADIUS,
+    betweenness_max_sources: int | None = DEFAULT_MAX_SOURCES,
+) -> Tuple[
+    List[SNAFeature],
+    List[SNAFeature],
+    List[SNACentralityFeature | IncrementalGlobalCentrality],
+]:
+    """
+    Factory methods for the centrality features V2.
+    See ``IntraEcoSecondOrderDegreeCentrality`` for the centrality mode, and
+    ``global_centrality`` and ``temporal_betweenness`` for the optional features.
+    """
+
+    graph = TemporalMultiGraph()
 
     pr_graph = [
-        PRIntegratorToSubmitterV2(graph, edge_to_project_mapping),
-        PRCommenterToSubmitterV2(graph, edge_to_project_mapping),
-        PRCommenterToCommenterV2(graph, edge_to_project_mapping),
+        PRIntegratorToSubmitterV2(graph),
+        PRCommenterToSubmitterV2(graph),
+        PRCommenterToCommenterV2(graph),
     ]
 
     issue_graph = [
-        IssueCommenterToCommenterV2(graph, edge_to_project_mapping),
-        IssueCommenterToSubmitterV2(graph, edge_to_project_mapping),
+        IssueCommenterToCommenterV2(graph),
+        IssueCommenterToSubmitterV2(graph),
     ]
 
     activity_graphs = [*pr_graph, *issue_graph]
 
     centr_features = [
-        IntraProjectSecondOrderInDegreeCentrality(
-            graph, edge_to_project_mapping, activity_graphs
-        ),
-        IntraProjectSecondOrderOutDegreeCentrality(
-            graph, edge_to_project_mapping, activity_graphs
-        ),
-        EcosystemSecondOrderInDegreeCentrality(
-            graph, edge_to_project_mapping, activity_graphs
-        ),
-        EcosystemSecondOrderOutDegreeCentrality(
-            graph, edge_to_project_mapping, activity_graphs
+        IntraEcoSecondOrderDegreeCentrality(
+            graph, activity_graphs, centrality_mode, fan_out_threshold
         ),
     ]
+    if use_global_centrality:
+        centr_features.extend(build_global_centrality_features(graph))
+    if use_betweenness:
+        centr_features.append(
+            TemporalEgoBetweennessCentrality(
+                graph, activity_graphs, betweenness_radius, betweenness_max_sources
+            )
+        )
 
     return pr_graph, issue_graph, centr_features
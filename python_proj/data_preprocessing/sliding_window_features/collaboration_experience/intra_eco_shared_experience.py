@@ -6,13 +6,14 @@ intra-project and ecosystem-wide experience.
 from typing import Callable
 from itertools import product
 
-from wmutils.collections.safe_dict import SafeDict
 from wmutils.collections.dict_access import better_get_nested_many
 from wmutils.collections.list_access import resolve_callables_in_list
 
+from python_proj.utils.util import CounterDict
+
 from python_proj.utils.exp_utils import (
-    get_repository_name_from_source_path,
     SOURCE_PATH_KEY,
+    PROJECT_ID_KEY,
     get_integrator_key,
 )
 from python_proj.data_preprocessing.sliding_window_features.collaboration_experience.shared_experience import (
@@ -32,16 +33,7 @@ class IntraProjectSharedExperienceFeature(SharedExperienceFeature):
         is_inversed: bool = False,
     ) -> None:
         super().__init__(nested_source_keys, nested_target_keys, is_inversed)
-        self._shared_experience = SafeDict(
-            default_value=SafeDict,
-            default_value_constructor_kwargs={
-                "default_value": SafeDict,
-                "default_value_constructor_kwargs": {
-                    "default_value": 0,
-                    "delete_when_default": True,
-                },
-            },
-        )
+        self._shared_experience = CounterDict()
 
     def _get_nodes(
         self, entry: dict, nested_key: list[str | Callable[[dict], str]]
@@ -55,7 +47,7 @@ class IntraProjectSharedExperienceFeature(SharedExperienceFeature):
         """Adds new edges."""
         source_ids = self._get_nodes(entry, self._nested_source_keys)
         target_ids = self._get_nodes(entry, self._nested_target_keys)
-        repo_name = get_repository_name_from_source_path(entry[SOURCE_PATH_KEY])
+        project_id = entry[PROJECT_ID_KEY]
         # Creates pairs of nodes between nodes if they are not equal.
         pairs = product(source_ids, target_ids)
         pairs = (
@@ -64,28 +56,61 @@ class IntraProjectSharedExperienceFeature(SharedExperienceFeature):
             if source_id != target_id
         )
         for source_id, target_id in pairs:
-            self._shared_experience[source_id][target_id][repo_name] += sign
+            self._add_shared_experience(source_id, target_id, project_id, sign)
+
+    def _add_shared_experience(
+        self, source_id: int, target_id: int, project_id: int, sign: int
+    ) -> None:
+        self._shared_experience.add(source_id, target_id, project_id, delta=sign)
+
+    def _get_intra_shared_experience(
+        self, source_id: int, target_id: int, project_id: int
+    ) -> int:
+        return self._shared_experience.get_count(source_id, target_id, project_id)
 
     def get_feature(self, entry: dict) -> int:
         source_id = entry["user_data"]["id"]
         integrator_key = get_integrator_key(entry)
         target_id = entry[integrator_key]["id"]
-        repo_name = get_repository_name_from_source_path(entry[SOURCE_PATH_KEY])
-        intra_exp = self._shared_experience[source_id][target_id][repo_name]
+        project_id = entry[PROJECT_ID_KEY]
+        intra_exp = self._get_intra_shared_experience(source_id, target_id, project_id)
         return intra_exp
 
+    def get_required_fields(self) -> list[list[str]]:
+        return [[SOURCE_PATH_KEY], *super().get_required_fields()]
+
 
 class EcosystemSharedExperienceFeature(IntraProjectSharedExperienceFeature):
     """
     Calculates shared experience at an ecosystem level,
-    excluding intra-project experience.
+    excluding intra-project experience. Besides the shared experience
+    per project, it tracks the total shared experience of each pair,
+    so the ecosystem experience is the total minus the intra-project experience.
     """
 
+    def __init__(
+        self,
+        nested_source_keys: list[str | Callable[[dict], str]],
+        nested_target_keys: list[str | Callable[[dict], str]],
+        is_inversed: bool = False,
+    ) -> None:
+        super().__init__(nested_source_keys, nested_target_keys, is_inversed)
+        self._total_shared_experience = CounterDict()
+
+    def _add_shared_experience(
+        self, source_id: int, target_id: int, project_id: int, sign: int
+    ) -> None:
+        super()._add_shared_experience(source_id, target_id, project_id, sign)
+        self._total_shared_experience.add(source_id, target_id, delta=sign)
+
     def get_feature(self, entry: dict) -> int:
         source_id = entry["user_data"]["id"]
         integrator_key = get_integrator_key(entry)
         target_id = entry[integrator_key]["id"]
-        repo_name = get_repository_name_from_source_path(entry[SOURCE_PATH_KEY])
-        shared_exp: SafeDict = self._shared_experience[source_id][target_id]
-        eco_exp = sum(value for key, value in shared_exp.items() if key != repo_name)
+        project_id = entry[PROJECT_ID_KEY]
+        total_exp = self._total_shared_experience.get_count(source_id, target_id)
+        if total_exp == 0:
+            return 0
+        intra_exp = self._get_intra_shared_experience(source_id, target_id, project_id)
+        eco_exp = total_exp - intra_exp
         return eco_exp
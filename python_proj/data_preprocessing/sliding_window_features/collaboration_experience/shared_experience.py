@@ -8,13 +8,15 @@ from warnings import warn
 from numbers import Number
 from typing import Any, Tuple, Callable
 
-from wmutils.collections.safe_dict import SafeDict
-
 from python_proj.data_preprocessing.sliding_window_features.base import (
     SlidingWindowFeature,
 )
-from python_proj.utils.exp_utils import get_integrator_key
-from python_proj.utils.util import better_get_nested_many, resolve_callables_in_list
+from python_proj.utils.exp_utils import get_integrator_key, get_fields_of_nested_key
+from python_proj.utils.util import (
+    better_get_nested_many,
+    resolve_callables_in_list,
+    CounterDict,
+)
 
 
 class SharedExperienceFeature(SlidingWindowFeature):
@@ -39,14 +41,7 @@ class SharedExperienceFeature(SlidingWindowFeature):
             self._nested_source_keys = nested_source_keys
             self._nested_target_keys = nested_target_keys
 
-        self.__shared_experiences = SafeDict(
-            default_value=SafeDict,
-            default_value_constructor_kwargs={
-                "default_value": 0,
-                "delete_when_default": True,
-            },
-            delete_when_default=True,
-        )
+        self.__shared_experiences = CounterDict()
 
     def _get_us_and_vs(self, entry: dict) -> Tuple[list[int], list[int]]:
         """Generates two lists of source and target keys related to this class."""
@@ -69,7 +64,7 @@ class SharedExperienceFeature(SlidingWindowFeature):
             for target_id in target_ids:
                 if source_id == target_id:
                     continue
-                self.__shared_experiences[source_id][target_id] += sign
+                self.__shared_experiences.add(source_id, target_id, delta=sign)
 
     def add_entry(self, entry: dict):
         self._handle(entry, 1)
@@ -81,7 +76,16 @@ class SharedExperienceFeature(SlidingWindowFeature):
         source_id = entry["user_data"]["id"]
         integrator_key = get_integrator_key(entry)
         target_id = entry[integrator_key]["id"]
-        return self.__shared_experiences[source_id][target_id]
+        return self.__shared_experiences.get_count(source_id, target_id)
+
+    def get_required_fields(self) -> list[list[str]]:
+        return [
+            ["user_data", "id"],
+            ["comments"],
+            *get_fields_of_nested_key([get_integrator_key, "id"]),
+            *get_fields_of_nested_key(self._nested_source_keys),
+            *get_fields_of_nested_key(self._nested_target_keys),
+        ]
 
 
 # Pull request
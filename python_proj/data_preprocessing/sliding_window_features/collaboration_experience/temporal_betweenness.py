@@ -0,0 +1,243 @@
+"""
+Implements time-respecting betweenness centrality for the collaboration network;
+i.e., the extent to which the submitter brokers the interactions in its ego network.
+A time-respecting path is a sequence of edges with strictly increasing timestamps,
+such that information can only travel along it in chronological order; two
+interactions of the same PR (which share a timestamp) can't be chained.
+
+The paths that are considered are the foremost paths: those that arrive at each of
+their nodes as early as possible. These are found with an earliest-arrival search,
+which is Dijkstra's algorithm in which an edge can only be traversed at one of its
+timestamps after the arrival at its source. The arrival times along foremost paths
+strictly increase, so they form a DAG on which Brandes' algorithm accumulates the
+dependencies of the sources on the submitter. In large ego networks (i.e., those
+of hubs), only a sample of the sources is searched, and the dependencies are
+extrapolated (Brandes & Pich, 2007); these outputs are counted as uncertain.
+
+This supersedes the prototype in ``betweenness_centrality``.
+"""
+
+from bisect import bisect_right
+from heapq import heappop, heappush
+from itertools import chain
+import random
+from typing import Hashable, Sequence
+
+from python_proj.data_preprocessing.sliding_window_features.collaboration_experience.centrality_features import (
+    SNAFeature,
+    SNACentralityFeature,
+)
+from python_proj.data_preprocessing.sliding_window_features.collaboration_experience.temporal_graph import (
+    TemporalMultiGraph,
+)
+
+# The number of hops around the submitter that are included in its ego network.
+DEFAULT_EGO_RADIUS = 1
+# The maximum number of sources that are searched; if more nodes can reach the submitter,
+# a sample is searched instead. Each search takes O(E log V) time in the ego network.
+DEFAULT_MAX_SOURCES = 100
+
+# The out-edges of each node in an ego network, which uses local indices: per
+# neighbour, the chronological timestamps of all tracked edge types combined.
+EgoNetwork = list[list[tuple[int, Sequence[int]]]]
+
+INFINITY = float("inf")
+
+
+def get_ego_nodes(graph: TemporalMultiGraph, node: int, radius: int) -> list[int]:
+    """
+    Returns the nodes within ``radius`` hops of the node, ignoring the edges' directions
+    (like ``networkx.ego_graph`` with ``undirected=True``). The node itself comes first.
+    """
+    if not graph.has_node(node):
+        return []
+    ego_nodes = {node: None}
+    frontier = [node]
+    for _ in range(radius):
+        next_frontier = []
+        for frontier_node in frontier:
+            for neighbour, edge_data in chain(
+                graph.successors(frontier_node).items(),
+                graph.predecessors(frontier_node).items(),
+            ):
+                # Dead edges (which have no edge data) are skipped.
+                if neighbour not in ego_nodes and len(edge_data) > 0:
+                    ego_nodes[neighbour] = None
+                    next_frontier.append(neighbour)
+        frontier = next_frontier
+    return list(ego_nodes)
+
+
+def build_ego_network(
+    graph: TemporalMultiGraph, ego_nodes: list[int], edge_types: set[str]
+) -> EgoNetwork:
+    """Creates the adjacency of the subgraph of the ego nodes, with only the tracked edge types."""
+    local_indices = {node: index for index, node in enumerate(ego_nodes)}
+    ego_network = []
+    for node in ego_nodes:
+        out_edges = []
+        for neighbour, edge_data in graph.successors(node).items():
+            neighbour_index = local_indices.get(neighbour)
+            if neighbour_index is None:
+                continue
+            timestamps = [
+                edge_timestamps.values()
+                for edge_type, edge_timestamps in edge_data.items()
+                if edge_type in edge_types
+            ]
+            if len(timestamps) == 0:
+                continue
+            if len(timestamps) == 1:
+                out_edges.append((neighbour_index, timestamps[0]))
+            else:
+                out_edges.append((neighbour_index, sorted(chain.from_iterable(timestamps))))
+        ego_network.append(out_edges)
+    return ego_network
+
+
+def get_reaching_nodes(ego_network: EgoNetwork, target: int) -> list[int]:
+    """
+    Returns the nodes from which the target can be reached, regardless of time;
+    the dependencies of other nodes on the target are always 0.
+    """
+    predecessors = [[] for _ in ego_network]
+    for node, out_edges in enumerate(ego_network):
+        for neighbour, _ in out_edges:
+            predecessors[neighbour].append(node)
+    is_reaching = [False] * len(ego_network)
+    is_reaching[target] = True
+    frontier = [target]
+    while len(frontier) > 0:
+        node = frontier.pop()
+        for predecessor in predecessors[node]:
+            if not is_reaching[predecessor]:
+                is_reaching[predecessor] = True
+                frontier.append(predecessor)
+    return [node for node, reaches in enumerate(is_reaching) if reaches and node != target]
+
+
+def calculate_temporal_betweenness(
+    ego_network: EgoNetwork, focal: int, sources: list[int] | None = None
+) -> float:
+    """
+    Returns the (unnormalized) time-respecting betweenness of the focal node; i.e., the
+    sum over all pairs of other nodes of the fraction of foremost paths between them that
+    pass through it. Only the given sources are searched, which default to those that can
+    reach the focal node (see ``get_reaching_nodes``). The search state is allocated once
+    and shared by all of them, as only the nodes a search reached have to be reset.
+    It takes O(S * E log V) time for S sources.
+    """
+
+    node_count = len(ego_network)
+    arrivals = [INFINITY] * node_count
+    path_counts = [0] * node_count
+    predecessors: list[list[int] | None] = [None] * node_count
+    dependencies = [0.0] * node_count
+    is_visited = [False] * node_count
+
+    if sources is None:
+        sources = get_reaching_nodes(ego_network, focal)
+
+    betweenness = 0.0
+    for source in sources:
+        # Finds the earliest arrival times and the foremost paths.
+        arrivals[source] = -INFINITY
+        path_counts[source] = 1
+        predecessors[source] = []
+        visit_order = []
+        heap = [(-INFINITY, source)]
+        while len(heap) > 0:
+            arrival, node = heappop(heap)
+            if is_visited[node]:
+                continue
+            is_visited[node] = True
+            visit_order.append(node)
+            node_path_count = path_counts[node]
+            for neighbour, timestamps in ego_network[node]:
+                # The first edge after arriving at the node.
+                edge_index = bisect_right(timestamps, arrival)
+                if edge_index == len(timestamps):
+                    continue
+                neighbour_arrival = timestamps[edge_index]
+                if neighbour_arrival < arrivals[neighbour]:
+                    arrivals[neighbour] = neighbour_arrival
+                    path_counts[neighbour] = node_path_count
+                    predecessors[neighbour] = [node]
+                    heappush(heap, (neighbour_arrival, neighbour))
+                elif neighbour_arrival == arrivals[neighbour]:
+                    path_counts[neighbour] += node_path_count
+                    predecessors[neighbour].append(node)
+
+        # Accumulates the dependencies in reverse chronological order;
+        # only the nodes that were reached after the focal node matter.
+        if is_visited[focal]:
+            for node in reversed(visit_order):
+                if node == focal:
+                    betweenness += dependencies[focal]
+                    break
+                coefficient = (1 + dependencies[node]) / path_counts[node]
+                for predecessor in predecessors[node]:
+                    dependencies[predecessor] += path_counts[predecessor] * coefficient
+
+        for node in visit_order:
+            arrivals[node] = INFINITY
+            predecessors[node] = None
+            dependencies[node] = 0.0
+            is_visited[node] = False
+
+    return betweenness
+
+
+class TemporalEgoBetweennessCentrality(SNACentralityFeature):
+    """
+    Time-respecting betweenness of the submitter in its ego network (see the module
+    docstring), normalized by the number of ordered pairs of other nodes in it. If more
+    than ``max_sources`` nodes can reach the submitter, a sample of them is searched, which
+    is seeded with the submitter's id, so outputs are reproducible (``None`` disables it).
+    The ego network can extend beyond the two-hop in-neighbourhood, so the output is
+    cached with the maximum node version in it instead (see ``get_node_version``):
+    changes to its edges increase the version of one of its nodes, and changes that add
+    or remove nodes do too, as they change an edge of a node that remains in it.
+    """
+
+    def __init__(
+        self,
+        graph: TemporalMultiGraph,
+        edge_types: list[SNAFeature],
+        radius: int = DEFAULT_EGO_RADIUS,
+        max_sources: int | None = DEFAULT_MAX_SOURCES,
+    ) -> None:
+        super().__init__(graph)
+        self._edge_types = {edge.get_name() for edge in edge_types}
+        self._radius = radius
+        self._max_sources = max_sources
+        # The ego nodes found for the last version, which are used by the calculation.
+        self._last_ego_nodes: tuple[int | None, list[int]] = (None, [])
+
+    def _get_neighbourhood_version(self, entry: dict) -> Hashable:
+        submitter_id = entry["user_data"]["id"]
+        ego_nodes = get_ego_nodes(self._graph, submitter_id, self._radius)
+        self._last_ego_nodes = (submitter_id, ego_nodes)
+        return max((self._graph.get_node_version(node) for node in ego_nodes), default=0)
+
+    def _calculate_feature(self, entry: dict) -> float:
+        submitter_id = entry["user_data"]["id"]
+        last_submitter_id, ego_nodes = self._last_ego_nodes
+        if last_submitter_id != submitter_id:
+            ego_nodes = get_ego_nodes(self._graph, submitter_id, self._radius)
+        # There are no pairs of other nodes without at least two of them.
+        if len(ego_nodes) < 3:
+            return 0.0
+        pair_count = (len(ego_nodes) - 1) * (len(ego_nodes) - 2)
+        ego_network = build_ego_network(self._graph, ego_nodes, self._edge_types)
+
+        # The submitter is the first ego node.
+        sources = get_reaching_nodes(ego_network, 0)
+        self.calculated_outputs += 1
+        if self._max_sources is None or len(sources) <= self._max_sources:
+            return calculate_temporal_betweenness(ego_network, 0, sources) / pair_count
+
+        self.uncertain_outputs += 1
+        sampled_sources = random.Random(submitter_id).sample(sources, self._max_sources)
+        betweenness = calculate_temporal_betweenness(ego_network, 0, sampled_sources)
+        return betweenness * len(sources) / self._max_sources / pair_count
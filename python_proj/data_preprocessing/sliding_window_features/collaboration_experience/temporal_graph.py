@@ -0,0 +1,286 @@
+"""
+Implements a directed temporal multigraph for the SNA features, which replaces
+``networkx.DiGraph``. Nodes are (integer) user ids, and each pair of nodes can
+be connected through multiple edge types, each of which stores the timestamps
+of its edges chronologically in a compact queue, together with the (interned)
+id of the project each edge was created in.
+
+The graph only contains what the sliding window needs: appending edges,
+removing the oldest edge of a type, and iterating through the in- and
+out-neighbours of a node. Edge types without timestamps are removed immediately,
+but edges without types and nodes without edges (i.e., dead ones) are removed in
+batches (see ``collect_garbage``), as active users often lose their last edge and
+get a new one shortly after; until then, they're iterated as neighbours without
+edge data, so the graph only contains the edges within the window.
+It also tracks versions, so results derived from (part of) the graph can be cached,
+and, optionally, which edges changed, so they can be maintained incrementally.
+"""
+
+from array import array
+from typing import Iterator
+
+# The edges between two nodes: the timestamps of each edge type.
+EdgeData = dict[str, "TimestampQueue"]
+
+# The project id of edges that don't belong to a project.
+NO_PROJECT_ID = -1
+
+# The number of dead edges that are kept at most until they're removed.
+DEFAULT_MAX_STALE_EDGES = 4096
+
+
+class TimestampQueue:
+    """
+    A first-in-first-out queue of integer timestamps and the corresponding project ids.
+    They're stored in ``array``s instead of a ``deque``, which requires over 600 bytes
+    for the first entry already, while most queues contain only a few timestamps.
+    Popping from the left moves the head; the popped entries are removed once they make
+    up half of the array, so both appending and popping take amortized O(1) time.
+    """
+
+    __slots__ = ("_timestamps", "_project_ids", "_head")
+
+    def __init__(self) -> None:
+        self._timestamps = array("q")
+        self._project_ids = array("q")
+        self._head = 0
+
+    def append(self, timestamp: int, project_id: int = NO_PROJECT_ID):
+        self._timestamps.append(timestamp)
+        self._project_ids.append(project_id)
+
+    def popleft(self) -> int:
+        if self._head >= len(self._timestamps):
+            raise IndexError("pop from an empty queue")
+        timestamp = self._timestamps[self._head]
+        self._head += 1
+        if 2 * self._head >= len(self._timestamps):
+            del self._timestamps[:self._head]
+            del self._project_ids[:self._head]
+            self._head = 0
+        return timestamp
+
+    def __len__(self) -> int:
+        return len(self._timestamps) - self._head
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.values())
+
+    def values(self) -> array:
+        """
+        Returns the timestamps as an array, which is iterated a lot quicker than the
+        queue itself; it's a copy if entries were popped, and must not be modified.
+        """
+        if self._head == 0:
+            return self._timestamps
+        return self._timestamps[self._head:]
+
+    def project_ids(self) -> array:
+        """Returns the project ids of the timestamps in ``values``; the same rules apply."""
+        if self._head == 0:
+            return self._project_ids
+        return self._project_ids[self._head:]
+
+    def __repr__(self) -> str:
+        return f"TimestampQueue({list(self)})"
+
+
+class TemporalMultiGraph:
+    """
+    Directed temporal multigraph. The adjacency is stored twice, per source and per
+    target, such that both the in- and out-neighbours of a node can be iterated;
+    both share the same ``EdgeData`` objects. Neighbours, and the edge types of a
+    pair of nodes, are iterated in the order in which they were (last) added.
+
+    The graph version is incremented by every change, and the version of a node is
+    the graph version of the last change to one of its edges (see ``get_neighbourhood_version``).
+    The pairs of nodes whose edges changed are collected once ``track_changed_edges`` is called.
+
+    Dead edges are kept (in place) until more than ``max_stale_edges`` pile up, after
+    which they and the dead nodes are removed all at once. If an edge is added to a
+    dead edge first, it's moved to the end, so the neighbours are iterated in the
+    same order as if it had been removed immediately.
+    """
+
+    def __init__(self, max_stale_edges: int = DEFAULT_MAX_STALE_EDGES) -> None:
+        self._successors: dict[int, dict[int, EdgeData]] = {}
+        self._predecessors: dict[int, dict[int, EdgeData]] = {}
+        self._node_versions: dict[int, int] = {}
+        self._stale_edges: set[tuple[int, int]] = set()
+        self._max_stale_edges = max_stale_edges
+        self._changed_edges: set[tuple[int, int]] | None = None
+        self.edge_count = 0
+        self.version = 0
+
+        # Bookkeeping variables; the number of created edges and nodes.
+        self.created_edges = 0
+        self.created_nodes = 0
+
+    def __update_versions(self, source: int, target: int):
+        self.version += 1
+        self._node_versions[source] = self.version
+        self._node_versions[target] = self.version
+        if self._changed_edges is not None:
+            self._changed_edges.add((source, target))
+
+    def track_changed_edges(self):
+        """Starts collecting the changed pairs of nodes (see ``pop_changed_edges``)."""
+        if self._changed_edges is None:
+            self._changed_edges = set()
+
+    def get_changed_edge_count(self) -> int:
+        """Returns the number of pairs of nodes whose edges changed since the last pop."""
+        return 0 if self._changed_edges is None else len(self._changed_edges)
+
+    def pop_changed_edges(self) -> set[tuple[int, int]]:
+        """
+        Returns the (source, target) pairs whose edges were added or removed since
+        the previous call, and starts collecting anew. There's only one collection,
+        so it should be shared by whatever consumes the changes.
+        """
+        changed_edges = self._changed_edges
+        if changed_edges is None:
+            return set()
+        self._changed_edges = set()
+        return changed_edges
+
+    def get_edge_weight(self, source: int, target: int) -> int:
+        """Returns the number of edges (of any type) from source to target."""
+        return sum(len(timestamps) for timestamps in self.get_edge_data(source, target).values())
+
+    def add_edge(
+        self, source: int, target: int, edge_type: str, timestamp: int, project_id: int = NO_PROJECT_ID
+    ):
+        """Adds an edge of the given type; timestamps should be added chronologically."""
+        successors = self._successors.get(source)
+        if successors is None:
+            successors = self._successors[source] = {}
+            self.created_nodes += 1
+        edge_data = successors.get(target)
+        if edge_data is None:
+            edge_data = successors[target] = {}
+            predecessors = self._predecessors.get(target)
+            if predecessors is None:
+                predecessors = self._predecessors[target] = {}
+                self.created_nodes += 1
+            predecessors[source] = edge_data
+            self.created_edges += 1
+        elif len(edge_data) == 0:
+            # Revives the dead edge, which is moved to the end as if it were new.
+            del successors[target]
+            successors[target] = edge_data
+            predecessors = self._predecessors[target]
+            del predecessors[source]
+            predecessors[source] = edge_data
+            self._stale_edges.discard((source, target))
+        timestamps = edge_data.get(edge_type)
+        if timestamps is None:
+            timestamps = edge_data[edge_type] = TimestampQueue()
+        timestamps.append(timestamp, project_id)
+        self.edge_count += 1
+        self.__update_versions(source, target)
+
+    def remove_edge(self, source: int, target: int, edge_type: str) -> int:
+        """
+        Removes the oldest edge of the given type and returns its timestamp.
+        Raises a ``KeyError`` if there is no such edge.
+        """
+        successors = self._successors[source]
+        edge_data = successors[target]
+        timestamps = edge_data[edge_type]
+        timestamp = timestamps.popleft()
+        self.edge_count -= 1
+        self.__update_versions(source, target)
+        if len(timestamps) > 0:
+            return timestamp
+
+        del edge_data[edge_type]
+        if len(edge_data) > 0:
+            return timestamp
+        # The edge is dead, and is removed with the next batch.
+        self._stale_edges.add((source, target))
+        if len(self._stale_edges) > self._max_stale_edges:
+            self.collect_garbage()
+        return timestamp
+
+    def collect_garbage(self):
+        """Removes the dead edges, and the nodes that have no edges left, to preserve memory."""
+        for source, target in self._stale_edges:
+            successors = self._successors[source]
+            del successors[target]
+            if len(successors) == 0:
+                del self._successors[source]
+            predecessors = self._predecessors[target]
+            del predecessors[source]
+            if len(predecessors) == 0:
+                del self._predecessors[target]
+            # All of the remaining edges are alive, so nodes without any are dead.
+            for node in (source, target):
+                if (
+                    node not in self._successors
+                    and node not in self._predecessors
+                    and node in self._node_versions
+                ):
+                    del self._node_versions[node]
+        self._stale_edges = set()
+
+    def get_stale_edge_count(self) -> int:
+        return len(self._stale_edges)
+
+    def get_node_version(self, node: int) -> int:
+        """
+        Returns the graph version of the last change to one of the node's edges;
+        as the graph version only increases, the maximum version of a set of nodes
+        changes whenever any of their edges change. It's 0 for nodes that were never
+        added or were removed; dead nodes keep their version until they're removed.
+        """
+        return self._node_versions.get(node, 0)
+
+    def get_neighbourhood_version(self, node: int) -> tuple[int, int]:
+        """
+        Returns the version of the node's two-hop in-neighbourhood; i.e., its
+        in-edges and all edges of its in-neighbours. It changes whenever any of those
+        edges change: changes to its in-edges change the node's version, and, if that
+        didn't change, the in-neighbours are the same, and any change to their edges
+        increases the sum of their versions. Dead edges are skipped, as removing
+        them in a batch doesn't change the neighbourhood (nor the node's version).
+        """
+        node_versions = self._node_versions
+        in_neighbour_versions = sum(
+            node_versions[in_neighbour]
+            for in_neighbour, edge_data in self.predecessors(node).items()
+            if len(edge_data) > 0
+        )
+        return node_versions.get(node, 0), in_neighbour_versions
+
+    def get_edge_data(self, source: int, target: int) -> EdgeData:
+        """Returns the timestamps per edge type from source to target; must not be modified."""
+        successors = self._successors.get(source)
+        if successors is None:
+            return {}
+        return successors.get(target, {})
+
+    def successors(self, node: int) -> dict[int, EdgeData]:
+        """
+        Returns the edge data per out-neighbour of the node; must not be modified.
+        It can include dead edges, which have no edge data.
+        """
+        return self._successors.get(node, {})
+
+    def predecessors(self, node: int) -> dict[int, EdgeData]:
+        """Returns the edge data per in-neighbour of the node; the same rules apply."""
+        return self._predecessors.get(node, {})
+
+    def has_node(self, node: int) -> bool:
+        """Returns true if the node has edges; i.e., it has a neighbour with edge data."""
+        for neighbours in (self._successors.get(node), self._predecessors.get(node)):
+            if neighbours is not None and any(
+                len(edge_data) > 0 for edge_data in neighbours.values()
+            ):
+                return True
+        return False
+
+    def get_node_count(self) -> int:
+        return sum(
+            1 for node in self._successors.keys() | self._predecessors.keys() if self.has_node(node)
+        )
@@ -1,9 +1,9 @@
 from python_proj.data_filters.post_sort_filters import filter_bots_dey_2020, filter_bots_golzadeh_2021, filter_for_blacklist
-from datetime import datetime
 
 from python_proj.data_preprocessing.sliding_window_features.base import *
-from python_proj.utils.exp_utils import get_integrator_key, get_owner_and_repo_from_source_path
-from python_proj.utils.util import safe_contains_key, has_keys, SafeDict
+from python_proj.utils.exp_utils import get_integrator_key, PROJECT_ID_KEY, \
+    get_fields_of_nested_key, SOURCE_PATH_KEY, TS_CLOSED_AT_KEY, TS_CREATED_AT_KEY
+from python_proj.utils.util import safe_contains_key, has_keys, SafeDict, CounterDict
 
 
 class ControlIntegratedBySameUser(Feature):
@@ -24,39 +24,37 @@ class ControlIntegratedBySameUser(Feature):
         has_sub_keys = has_keys(entry[integrator_key], ['id'])
         return has_sub_keys
 
+    def get_required_fields(self) -> list[list[str]]:
+        return [["user_data", "id"], *get_fields_of_nested_key([get_integrator_key, "id"])]
+
 
 class ControlPullRequestLifeTimeInMinutes(Feature):
     """The lifetime of the pull request in minutes."""
 
-    TS_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
-
     def get_feature(self, entry: dict) -> float:
-        created_at = datetime.strptime(entry['created_at'], self.TS_FORMAT)
-        closed_at = datetime.strptime(entry['closed_at'], self.TS_FORMAT)
-        deltatime = closed_at - created_at
-        lifetime_in_minutes = deltatime.total_seconds() / 60
+        deltatime = entry[TS_CLOSED_AT_KEY] - entry[TS_CREATED_AT_KEY]
+        lifetime_in_minutes = deltatime / 60
         return lifetime_in_minutes
 
     def is_valid_entry(self, entry: dict) -> bool:
-        return has_keys(entry, ["created_at", "closed_at"]) \
+        return has_keys(entry, [TS_CREATED_AT_KEY, TS_CLOSED_AT_KEY]) \
             and self.get_feature(entry) > 0
 
+    def get_required_fields(self) -> list[list[str]]:
+        return [[TS_CREATED_AT_KEY], [TS_CLOSED_AT_KEY]]
+
 
 class ControlIntraProjectPullRequestExperienceOfIntegrator(SlidingWindowFeature):
     """Experience of the integrated measured in pull requests
     they handled inside the project (i.e., intra-project)."""
 
     def __init__(self) -> None:
-        self.__projects_to_integrator_experience: SafeDict[str, SafeDict[int, int]] = \
-            SafeDict(default_value=SafeDict,
-                     default_value_constructor_kwargs={'default_value': 0})
+        self.__projects_to_integrator_experience = CounterDict()
 
     def handle(self, entry: dict, sign: int):
-        owner, repo = get_owner_and_repo_from_source_path(
-            entry["__source_path"])
-        project = f'{owner}/{repo}'
+        project = entry[PROJECT_ID_KEY]
         integrator_key = get_integrator_key(entry)
-        self.__projects_to_integrator_experience[project][integrator_key] += sign
+        self.__projects_to_integrator_experience.add(project, integrator_key, delta=sign)
 
     def add_entry(self, entry: dict):
         self.handle(entry, sign=1)
@@ -65,16 +63,18 @@ class ControlIntraProjectPullRequestExperienceOfIntegrator(SlidingWindowFeature)
         self.handle(entry, sign=-1)
 
     def get_feature(self, entry: dict) -> int:
-        owner, repo = get_owner_and_repo_from_source_path(
-            entry["__source_path"])
-        project = f'{owner}/{repo}'
+        project = entry[PROJECT_ID_KEY]
         integrator_key = get_integrator_key(entry)
-        return self.__projects_to_integrator_experience[project][integrator_key]
+        return self.__projects_to_integrator_experience.get_count(project, integrator_key)
 
     def is_valid_entry(self, entry: dict) -> bool:
         integrator_key = get_integrator_key(entry)
         return has_keys(entry, [integrator_key, "__source_path"])
 
+    def get_required_fields(self) -> list[list[str]]:
+        # HACK: Only the presence of the integrator is checked, so its id is used as a stand-in.
+        return [[SOURCE_PATH_KEY], *get_fields_of_nested_key([get_integrator_key, "id"])]
+
 
 class ControlPullRequestHasComments(Feature):
     """Whether the pull request has comments."""
@@ -85,6 +85,9 @@ class ControlPullRequestHasComments(Feature):
     def is_valid_entry(self, entry: dict) -> bool:
         return has_keys(entry, ["comments"])
 
+    def get_required_fields(self) -> list[list[str]]:
+        return [["comments"]]
+
 
 class ControlNumberOfCommitsInPullRequest(Feature):
     """The number of commmits in the pull request."""
@@ -95,6 +98,9 @@ class ControlNumberOfCommitsInPullRequest(Feature):
     def is_valid_entry(self, entry: dict) -> bool:
         return has_keys(entry, ["commits"])
 
+    def get_required_fields(self) -> list[list[str]]:
+        return [["commits"]]
+
 
 class ControlPullRequestHasCommentByExternalUser(Feature):
     """
@@ -117,9 +123,7 @@ class ControlPullRequestHasCommentByExternalUser(Feature):
         if not entry['merged']:
             return
         submitter_id = entry["user_data"]["id"]
-        (owner, repo) = get_owner_and_repo_from_source_path(
-            entry["__source_path"])
-        project = f'{owner}/{repo}'
+        project = entry[PROJECT_ID_KEY]
         self._contributors_per_project[project].add(submitter_id)
 
     def __has_external_comment(self, entry: dict) -> bool:
@@ -129,10 +133,8 @@ class ControlPullRequestHasCommentByExternalUser(Feature):
         submitter_id = entry["user_data"]["id"]
         integrator_key = get_integrator_key(entry)
         integrator_id = entry[integrator_key]["id"]
-        (owner, repo) = get_owner_and_repo_from_source_path(
-            entry["__source_path"])
-        project = f'{owner}/{repo}'
-        project_contributors = self._contributors_per_project[project]
+        project = entry[PROJECT_ID_KEY]
+        project_contributors = self._contributors_per_project.get(project, ())
 
         for comment in entry["comments_data"]:
             commenter_id = comment["user_data"]["id"]
@@ -162,6 +164,14 @@ class ControlPullRequestHasCommentByExternalUser(Feature):
         has_sub_keys = has_keys(entry[integrator_key], ["id"])
         return has_sub_keys
 
+    def get_required_fields(self) -> list[list[str]]:
+        # The bot filters use the commenter's login, name and email.
+        commenter_fields = [["comments_data", "user_data", key]
+                            for key in ["id", "login", "name", "email"]]
+        return [["comments"], ["user_data", "id"], [SOURCE_PATH_KEY], ["merged"],
+                *get_fields_of_nested_key([get_integrator_key, "id"]),
+                *commenter_fields]
+
 
 class ControlHasHashTagInDescription(Feature):
     """Whether the title or the body contain a #; i.e., a reference to an issue."""
@@ -174,6 +184,9 @@ class ControlHasHashTagInDescription(Feature):
     def is_valid_entry(self, entry: dict) -> bool:
         return has_keys(entry, ["title"])
 
+    def get_required_fields(self) -> list[list[str]]:
+        return [["title"], ["body"]]
+
 
 def build_control_variables():
     sw_features = [
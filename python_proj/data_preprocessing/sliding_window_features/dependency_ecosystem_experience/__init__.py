@@ -1,2 +1,6 @@
 from python_proj.data_preprocessing.sliding_window_features.dependency_ecosystem_experience.dependency_loading import *
+from python_proj.data_preprocessing.sliding_window_features.dependency_ecosystem_experience.dependency_graph import (
+    DependencyGraph,
+    safe_load_dependency_graph,
+)
 from python_proj.data_preprocessing.sliding_window_features.dependency_ecosystem_experience.factory import build_deco_features
@@ -1,70 +1,147 @@
-from typing import Any
+from typing import Any, Iterable, Tuple
 
 from python_proj.data_preprocessing.sliding_window_features.base import (
     SlidingWindowFeature,
 )
 
-from python_proj.data_preprocessing.sliding_window_features.dependency_ecosystem_experience import (
-    safe_load_dependency_map,
+from python_proj.data_preprocessing.sliding_window_features.dependency_ecosystem_experience.dependency_graph import (
+    DependencyGraph,
+    safe_load_dependency_graph,
 )
 from python_proj.data_preprocessing.sliding_window_features.ecosystem_experience import (
     EcosystemExperience,
 )
+from python_proj.data_preprocessing.sliding_window_features.experience_ledger import (
+    ExperienceLedger,
+)
+from python_proj.utils.exp_utils import get_project_name, find_project_id
 
 
 class EcosystemExperienceDecorator(SlidingWindowFeature):
     """
     Decorator class that hijacks the ``project_is_ignored_for_cumulative_experience``
-    method of ``EcosystemExperience``. Inheriting classes can apply more stringent project
-    filters (e.g., dependency experience).
+    and ``_select_projects`` methods of ``EcosystemExperience``. Inheriting classes can
+    apply more stringent project filters (e.g., dependency experience).
     Don't use this class directly, use one of its inheriting classes.
+
+    Rather than testing each of the user's projects for a dependency, inheriting classes
+    intersect the user's projects with the dependencies of the focal project (see
+    ``_intersect_projects``), which are cached per focal project. Dependencies are
+    read from the (memory-mapped) dependency graph; projects are identified by their node.
     """
 
     def __init__(
         # TODO: `use_reversed_dependencies` is only relevant for inheriting classes. Move this parameter.
         self,
         inner_component: type,
+        ledger: ExperienceLedger,
+        dependency_graph: DependencyGraph | None = None,
     ) -> None:
         """
         :param inner_component: The component type that's being decorated.
+        :param ledger: The experience ledger the inner component reads from.
+        :param dependency_graph: The dependency graph that's used; e.g., a transitive
+        dependency graph (see ``safe_load_transitive_dependency_graph``). Uses the
+        direct dependencies by default.
         :param use_reversed_dependencies: The ``DEPENDENCY`` mapping is used or
         the ``INV_DEPENDENCY`` mapping. The former being the projects the focal
         project depends on, and the latter the projects that depend on the focal project.
         """
 
         # initializes singletons.
-        self._dependency_map, self._project_name_to_id = safe_load_dependency_map()
+        self._dependency_graph = (
+            safe_load_dependency_graph() if dependency_graph is None else dependency_graph
+        )
+
+        # Caches the nodes of projects, and the dependencies of focal projects.
+        self._nodes: dict[int, int | None] = {}
+        self._focal_nodes: dict[int, frozenset[int]] = {}
 
         # Loads inner component and hijacks ignore function.
-        self.__inner_component: EcosystemExperience = inner_component()
+        self.__inner_component: EcosystemExperience = inner_component(ledger)
         self.__inner_component.project_is_ignored_for_cumulative_experience = (
             self._project_is_ignored_for_cumulative_experience
         )
+        self.__inner_component._select_projects = self._select_projects
 
     def _project_is_ignored_for_cumulative_experience(
-        self, current_project_name: str, other_project_name: str
+        self, current_project_id: int, other_project_id: int
     ) -> bool:
         raise NotImplementedError(
             "You cannot use `EcosystemExperienceDecorator` directly, use one of its subclasses instead."
         )
 
-    def _has_dependency_on(self, focal_project: str, other_project: str) -> bool:
+    def _select_projects(
+        self, current_project_id: int, project_experience: dict
+    ) -> Tuple[Iterable[int], bool]:
+        selected_projects = [
+            other_project_id for other_project_id in project_experience
+            if not self._project_is_ignored_for_cumulative_experience(current_project_id, other_project_id)
+        ]
+        return selected_projects, False
+
+    def _get_node(self, project_id: int) -> int | None:
+        """Returns the node of the project in the dependency graph, or ``None`` if it isn't identifiable."""
+        if project_id not in self._nodes:
+            project_name = get_project_name(project_id)
+            self._nodes[project_id] = self._dependency_graph.find_node(project_name)
+        return self._nodes[project_id]
+
+    def _get_dependencies(self, node: int) -> frozenset[int]:
+        """Returns the nodes of the projects that the project depends on."""
+        return frozenset(self._dependency_graph.dependencies_of(node).tolist())
+
+    def _get_dependents(self, node: int) -> frozenset[int]:
+        """Returns the nodes of the projects that depend on the project."""
+        return frozenset(self._dependency_graph.dependents_of(node).tolist())
+
+    def _calculate_focal_nodes(self, node: int) -> frozenset[int]:
+        """Returns the nodes of the projects whose experience is selected, given the focal project's node."""
+        raise NotImplementedError(
+            "You cannot use `EcosystemExperienceDecorator` directly, use one of its subclasses instead."
+        )
+
+    def _get_focal_nodes(self, current_project_id: int) -> frozenset[int]:
+        if current_project_id not in self._focal_nodes:
+            node = self._get_node(current_project_id)
+            self._focal_nodes[current_project_id] = (
+                frozenset() if node is None else self._calculate_focal_nodes(node)
+            )
+        return self._focal_nodes[current_project_id]
+
+    def _intersect_projects(
+        self, current_project_id: int, project_experience: dict, nodes: frozenset[int]
+    ) -> list[int]:
+        """
+        Returns the (other) projects the user has experience in that are part of the
+        nodes. It iterates through whichever is smaller: the user's projects or the nodes.
+        """
+        if len(project_experience) <= len(nodes):
+            return [
+                other_project_id for other_project_id in project_experience
+                if other_project_id != current_project_id
+                and self._get_node(other_project_id) in nodes
+            ]
+
+        selected_projects = []
+        for node in nodes:
+            for project_name in self._dependency_graph.get_project_names(node):
+                # Projects that aren't interned yet can't have experience.
+                other_project_id = find_project_id(project_name)
+                if other_project_id is not None \
+                        and other_project_id != current_project_id \
+                        and other_project_id in project_experience:
+                    selected_projects.append(other_project_id)
+        return selected_projects
+
+    def _has_dependency_on(self, focal_project_id: int, other_project_id: int) -> bool:
         """Returns true if `focal_project` has an outgoing dependency on `other_project`."""
-        # TODO: This method is generic enough to not be part of a class.
+        focal_node = self._get_node(focal_project_id)
+        other_node = self._get_node(other_project_id)
         # Returns false if they aren't identifiable.
-        if (
-            not focal_project in self._project_name_to_id
-            or other_project not in self._project_name_to_id
-        ):
-            return False
-        # Returns false if there are no dependencies.
-        focal_id = self._project_name_to_id[focal_project]
-        if focal_id not in self._dependency_map:
+        if focal_node is None or other_node is None:
             return False
-        # Returns whether there is a dependency.
-        other_id = self._project_name_to_id[other_project]
-        has_dependency = other_id in self._dependency_map[focal_id]
-        return has_dependency
+        return self._dependency_graph.has_dependency(focal_node, other_node)
 
     def add_entry(self, entry: dict):
         return self.__inner_component.add_entry(entry)
@@ -78,6 +155,9 @@ class EcosystemExperienceDecorator(SlidingWindowFeature):
     def is_valid_entry(self, entry: dict) -> bool:
         return self.__inner_component.is_valid_entry(entry)
 
+    def get_required_fields(self) -> "list[list[str]] | None":
+        return self.__inner_component.get_required_fields()
+
 
 class DependencyEcosystemExperienceDecorator(EcosystemExperienceDecorator):
     """
@@ -85,12 +165,18 @@ class DependencyEcosystemExperienceDecorator(EcosystemExperienceDecorator):
     excluding all projects where there are no dependencies.
     """
 
-    def __init__(self, inner_component: type, use_reversed_dependencies: bool) -> None:
+    def __init__(
+        self,
+        inner_component: type,
+        ledger: ExperienceLedger,
+        use_reversed_dependencies: bool,
+        dependency_graph: DependencyGraph | None = None,
+    ) -> None:
         self._use_reversed_dependencies = use_reversed_dependencies
-        super().__init__(inner_component)
+        super().__init__(inner_component, ledger, dependency_graph)
 
     def _project_is_ignored_for_cumulative_experience(
-        self, current_project_name, other_project_name
+        self, current_project_id: int, other_project_id: int
     ) -> bool:
         """
         Returns true if the project should be ignored. It does so when the two
@@ -100,23 +186,38 @@ class DependencyEcosystemExperienceDecorator(EcosystemExperienceDecorator):
         """
 
         # Ignores intra-project experience; you can't have a self-dependency anyways.
-        if current_project_name == other_project_name:
+        if current_project_id == other_project_id:
             return True
 
         # Sets the order of parameters if inverse dependencies are used.
         # With dependency A --(depends on)--> B, you have that DEP(A) = [B]
         # and that INV_DEP(B) = [A]; Here the depending project is the focal
         # project and the project that's depended on the other project.
-        (focal_name, other_name) = (
-            (other_project_name, current_project_name)
+        (focal_id, other_id) = (
+            (other_project_id, current_project_id)
             if self._use_reversed_dependencies
-            else (current_project_name, other_project_name)
+            else (current_project_id, other_project_id)
         )
 
-        has_dependency = self._has_dependency_on(focal_name, other_name)
+        has_dependency = self._has_dependency_on(focal_id, other_id)
         # reminder: it's a filter method, so true means the data is ignored.
         return not has_dependency
 
+    def _calculate_focal_nodes(self, node: int) -> frozenset[int]:
+        # With inversed dependencies, the other projects depend on the current project.
+        if self._use_reversed_dependencies:
+            return self._get_dependents(node)
+        return self._get_dependencies(node)
+
+    def _select_projects(
+        self, current_project_id: int, project_experience: dict
+    ) -> Tuple[Iterable[int], bool]:
+        nodes = self._get_focal_nodes(current_project_id)
+        selected_projects = self._intersect_projects(
+            current_project_id, project_experience, nodes
+        )
+        return selected_projects, False
+
 
 class NonDependencyEcosystemExperienceDecorator(EcosystemExperienceDecorator):
     """
@@ -125,17 +226,28 @@ class NonDependencyEcosystemExperienceDecorator(EcosystemExperienceDecorator):
     """
 
     def _project_is_ignored_for_cumulative_experience(
-        self, current_project_name: str, other_project_name: str
+        self, current_project_id: int, other_project_id: int
     ) -> bool:
         # Ignores intra-project experience; you can't have a self-dependency anyways.
-        if current_project_name == other_project_name:
+        if current_project_id == other_project_id:
             return True
 
-        in_dependency = self._has_dependency_on(
-            current_project_name, other_project_name
-        )
-        out_dependency = self._has_dependency_on(
-            other_project_name, current_project_name
-        )
+        in_dependency = self._has_dependency_on(current_project_id, other_project_id)
+        out_dependency = self._has_dependency_on(other_project_id, current_project_id)
 
         return in_dependency or out_dependency
+
+    def _calculate_focal_nodes(self, node: int) -> frozenset[int]:
+        return self._get_dependencies(node) | self._get_dependents(node)
+
+    def _select_projects(
+        self, current_project_id: int, project_experience: dict
+    ) -> Tuple[Iterable[int], bool]:
+        # Subtracts the intra-project and (inversed) dependency experience
+        # from the total, as these are typically far fewer projects.
+        nodes = self._get_focal_nodes(current_project_id)
+        ignored_projects = self._intersect_projects(
+            current_project_id, project_experience, nodes
+        )
+        ignored_projects.append(current_project_id)
+        return ignored_projects, True
@@ -0,0 +1,206 @@
+"""
+Calculates the transitive closure of dependency graphs stored as CSR arrays
+(i.e., offsets plus neighbours; see ``dependency_graph``); i.e., cascading
+dependencies, such that if A depends on B and B on C, A depends on C.
+
+Without a depth limit, the strongly connected components of the graph are
+condensed, so the remaining graph is acyclic. Components are then processed
+by level, starting at those without dependencies, and each component's
+closure is the (sorted) union of its dependencies and their closures.
+With a depth limit, the closure is calculated with repeated (boolean)
+sparse matrix products, which is a breadth-first search from all nodes at once.
+
+In both cases, independent work (the components of a level, or blocks of rows)
+is distributed over threads; ``numpy`` and ``scipy`` release the GIL while
+merging the (large) arrays.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+import numpy
+from scipy.sparse import csr_matrix, vstack
+from scipy.sparse.csgraph import connected_components
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# A graph in CSR format: the offsets of each node's neighbours, and the neighbours.
+CSRGraph = tuple[numpy.ndarray, numpy.ndarray]
+
+
+def to_csr(rows: numpy.ndarray, columns: numpy.ndarray, node_count: int) -> CSRGraph:
+    """Creates the offsets and (sorted, unique) columns of each row; i.e., of each node."""
+    column_count = int(columns.max()) + 1 if len(columns) > 0 else 1
+    keys = numpy.unique(rows.astype(numpy.int64) * column_count + columns)
+    offsets = numpy.zeros(node_count + 1, dtype=numpy.int64)
+    offsets[1:] = numpy.cumsum(numpy.bincount(keys // column_count, minlength=node_count))
+    neighbours = (keys % column_count).astype(numpy.int32)
+    return offsets, neighbours
+
+
+def gather_neighbours(offsets: numpy.ndarray, neighbours: numpy.ndarray, nodes: numpy.ndarray) -> numpy.ndarray:
+    """Returns the concatenated neighbours of the nodes (including duplicates)."""
+    starts = offsets[nodes]
+    lengths = offsets[nodes + 1] - starts
+    total_length = int(lengths.sum())
+    if total_length == 0:
+        return numpy.empty(0, dtype=neighbours.dtype)
+    # The position of each neighbour is its node's start plus its position within the node.
+    positions = numpy.repeat(starts - (numpy.cumsum(lengths) - lengths), lengths)
+    positions += numpy.arange(total_length)
+    return neighbours[positions]
+
+
+def __map_chunks(function: Callable[[T], R], items: list[T], thread_count: int) -> list[R]:
+    if thread_count <= 1 or len(items) <= 1:
+        return [function(item) for item in items]
+    with ThreadPoolExecutor(max_workers=thread_count) as executor:
+        return list(executor.map(function, items))
+
+
+def __split(values: numpy.ndarray, chunk_count: int) -> list[numpy.ndarray]:
+    chunk_count = max(1, min(chunk_count, len(values)))
+    return numpy.array_split(values, chunk_count)
+
+
+def __calculate_levels(offsets: numpy.ndarray, neighbours: numpy.ndarray) -> list[numpy.ndarray]:
+    """
+    Splits the nodes of an acyclic graph into levels, such that all
+    dependencies of a node are in earlier levels. The first level contains
+    the nodes without dependencies.
+    """
+    node_count = len(offsets) - 1
+    sources = numpy.repeat(numpy.arange(node_count, dtype=numpy.int32), numpy.diff(offsets))
+    reverse_offsets, reverse_neighbours = to_csr(neighbours, sources, node_count)
+
+    remaining_dependencies = numpy.diff(offsets)
+    level = numpy.flatnonzero(remaining_dependencies == 0)
+    levels = []
+    while len(level) > 0:
+        levels.append(level)
+        dependents = gather_neighbours(reverse_offsets, reverse_neighbours, level)
+        remaining_dependencies -= numpy.bincount(dependents, minlength=node_count)
+        candidates = numpy.unique(dependents)
+        level = candidates[remaining_dependencies[candidates] == 0]
+    return levels
+
+
+def __calculate_unbounded_closure(offsets: numpy.ndarray, neighbours: numpy.ndarray, thread_count: int) -> CSRGraph:
+    node_count = len(offsets) - 1
+    sources = numpy.repeat(numpy.arange(node_count, dtype=numpy.int32), numpy.diff(offsets))
+
+    # Condenses the strongly connected components.
+    adjacency = csr_matrix(
+        (numpy.ones(len(neighbours), dtype=numpy.bool_), neighbours, offsets),
+        shape=(node_count, node_count),
+    )
+    component_count, components = connected_components(adjacency, directed=True, connection="strong")
+    source_components = components[sources]
+    target_components = components[neighbours]
+    is_external = source_components != target_components
+    component_offsets, component_neighbours = to_csr(
+        source_components[is_external], target_components[is_external], component_count
+    )
+
+    # Components with a cycle (including self-dependencies) depend on themselves.
+    component_sizes = numpy.bincount(components, minlength=component_count)
+    is_cyclic = component_sizes > 1
+    is_cyclic[source_components[sources == neighbours]] = True
+
+    component_closures: list[numpy.ndarray | None] = [None] * component_count
+
+    def __calculate_component_closures(level_chunk: numpy.ndarray) -> list[numpy.ndarray]:
+        chunk_closures = []
+        for component in level_chunk.tolist():
+            dependencies = component_neighbours[component_offsets[component]:component_offsets[component + 1]]
+            parts = [dependencies]
+            parts.extend(component_closures[dependency] for dependency in dependencies.tolist())
+            if is_cyclic[component]:
+                parts.append(numpy.array([component], dtype=numpy.int32))
+            chunk_closures.append(numpy.unique(numpy.concatenate(parts)))
+        return chunk_closures
+
+    for level in __calculate_levels(component_offsets, component_neighbours):
+        level_chunks = __split(level, thread_count)
+        chunk_closures = __map_chunks(__calculate_component_closures, level_chunks, thread_count)
+        for level_chunk, closures in zip(level_chunks, chunk_closures):
+            for component, closure in zip(level_chunk.tolist(), closures):
+                component_closures[component] = closure
+
+    # Expands the component closures to the nodes in the components.
+    member_offsets = numpy.zeros(component_count + 1, dtype=numpy.int64)
+    member_offsets[1:] = numpy.cumsum(component_sizes)
+    members = numpy.argsort(components, kind="stable").astype(numpy.int32)
+
+    def __expand(component_chunk: numpy.ndarray) -> list[numpy.ndarray]:
+        return [
+            numpy.sort(gather_neighbours(member_offsets, members, component_closures[component]))
+            for component in component_chunk.tolist()
+        ]
+
+    component_chunks = __split(numpy.arange(component_count), thread_count)
+    node_closures = [
+        closure
+        for closures in __map_chunks(__expand, component_chunks, thread_count)
+        for closure in closures
+    ]
+
+    closure_lengths = numpy.array([len(node_closures[component]) for component in components.tolist()],
+                                  dtype=numpy.int64)
+    closure_offsets = numpy.zeros(node_count + 1, dtype=numpy.int64)
+    closure_offsets[1:] = numpy.cumsum(closure_lengths)
+    if node_count == 0 or closure_offsets[-1] == 0:
+        return closure_offsets, numpy.empty(0, dtype=numpy.int32)
+    closure_neighbours = numpy.concatenate([node_closures[component] for component in components.tolist()])
+    return closure_offsets, closure_neighbours.astype(numpy.int32)
+
+
+def __calculate_bounded_closure(
+    offsets: numpy.ndarray, neighbours: numpy.ndarray, max_depth: int, thread_count: int
+) -> CSRGraph:
+    node_count = len(offsets) - 1
+    adjacency = csr_matrix(
+        (numpy.ones(len(neighbours), dtype=numpy.bool_), neighbours, offsets),
+        shape=(node_count, node_count),
+    )
+    row_blocks = __split(numpy.arange(node_count), thread_count)
+
+    # Each iteration extends the reachable nodes by one step; i.e., R_{d+1} = A + R_d A.
+    reachable = adjacency
+    for _ in range(max_depth - 1):
+        def __step(rows: numpy.ndarray) -> csr_matrix:
+            block = reachable[rows[0]:rows[-1] + 1] if len(rows) > 0 else reachable[:0]
+            return block @ adjacency
+
+        products = __map_chunks(__step, row_blocks, thread_count)
+        extended = adjacency + vstack(products, format="csr")
+        if extended.nnz == reachable.nnz:
+            # Nothing was added, so it has converged before reaching the depth limit.
+            break
+        reachable = extended
+
+    reachable.sort_indices()
+    return reachable.indptr.astype(numpy.int64), reachable.indices.astype(numpy.int32)
+
+
+def calculate_transitive_closure(
+    offsets: numpy.ndarray, neighbours: numpy.ndarray,
+    max_depth: int | None = None, thread_count: int = 1,
+) -> CSRGraph:
+    """
+    Calculates the transitive closure of a graph in CSR format. Returns the closure
+    in the same format, with sorted neighbours. Nodes that are part of a cycle
+    (within the depth limit) depend on themselves.
+
+    :param max_depth: The maximum length of the dependency chains; unlimited if ``None``.
+    :param thread_count: The number of threads used.
+    """
+
+    offsets = numpy.asarray(offsets, dtype=numpy.int64)
+    neighbours = numpy.asarray(neighbours, dtype=numpy.int32)
+    if max_depth is None:
+        return __calculate_unbounded_closure(offsets, neighbours, thread_count)
+    if max_depth < 1:
+        raise ValueError(f"The maximum depth should be at least 1, not {max_depth}.")
+    return __calculate_bounded_closure(offsets, neighbours, max_depth, thread_count)
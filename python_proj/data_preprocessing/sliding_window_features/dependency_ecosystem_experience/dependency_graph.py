@@ -0,0 +1,353 @@
+"""
+Implements a compact, memory-mappable alternative to the dependency map
+(see ``dependency_loading``). The map is a dictionary of string ids to lists
+of string ids, which takes minutes to parse from the 2GB quick-load file and
+several gigabytes per process to hold in memory.
+
+The dependency graph stores the same data as integer-indexed CSR arrays
+(i.e., offsets plus neighbours), in both directions, together with the
+project names of each node. Like an event store, it's a directory containing
+a ``meta.json`` file and a number of ``.npy`` files, which are memory-mapped,
+so all workers share the same pages instead of holding private copies.
+
+Use ``safe_load_dependency_graph`` to load it; it's created from the
+dependency map if it doesn't exist yet. Similarly, ``safe_load_transitive_dependency_graph``
+loads a graph containing the transitive dependencies (see ``dependency_closure``),
+which can be passed to the dependency experience features instead.
+"""
+
+from bisect import bisect_left
+import datetime
+import json
+import os
+import shutil
+
+import numpy
+
+import python_proj.utils.exp_utils as exp_utils
+from python_proj.data_preprocessing.sliding_window_features.dependency_ecosystem_experience.dependency_closure import (
+    calculate_transitive_closure,
+    to_csr,
+)
+from python_proj.data_preprocessing.sliding_window_features.dependency_ecosystem_experience.dependency_loading import (
+    safe_load_dependency_map,
+    QL_DEPENDENCY_FILE_NAME,
+)
+from python_proj.utils.arg_utils import safe_get_argv
+from python_proj.utils.util import safe_makedirs
+
+DEPENDENCY_GRAPH_EXT = ".csr"
+DEPENDENCY_GRAPH_VERSION = 1
+
+# The files that contain the nodes and their names; i.e., everything but the dependencies.
+NODE_FILE_NAMES = [
+    "name_nodes", "node_name_offsets", "node_names", "node_id_data",
+    "node_id_offsets", "project_name_data", "project_name_offsets",
+]
+
+DEPENDENCY_GRAPH: "DependencyGraph" = None
+# Transitive dependency graphs per maximum depth.
+TRANSITIVE_DEPENDENCY_GRAPHS: "dict[int | None, DependencyGraph]" = {}
+
+
+def get_dependency_graph_path() -> str:
+    """Returns the path of the dependency graph, which is stored next to the quick-load file."""
+    ql_dependency_path = exp_utils.TRAIN_DATASET_PATH(file_name=QL_DEPENDENCY_FILE_NAME)
+    base_path, _ = os.path.splitext(ql_dependency_path)
+    return base_path + DEPENDENCY_GRAPH_EXT
+
+
+def __save_strings(output_path: str, name: str, values: list[str]):
+    """Stores a list of strings as a heap with offsets."""
+    encoded_values = [value.encode("utf-8") for value in values]
+    offsets = numpy.zeros(len(encoded_values) + 1, dtype=numpy.int64)
+    offsets[1:] = numpy.cumsum([len(value) for value in encoded_values])
+    numpy.save(
+        os.path.join(output_path, f"{name}_data.npy"),
+        numpy.frombuffer(b"".join(encoded_values), dtype=numpy.uint8),
+    )
+    numpy.save(os.path.join(output_path, f"{name}_offsets.npy"), offsets)
+
+
+def __save_array(output_path: str, name: str, values: numpy.ndarray):
+    numpy.save(os.path.join(output_path, f"{name}.npy"), values)
+
+
+def __save_dependencies(
+    output_path: str, dependency_offsets: numpy.ndarray, dependencies: numpy.ndarray,
+    project_name_count: int, **meta_fields,
+):
+    """Stores the dependencies, their inverse, and the meta file, which marks the graph as complete."""
+    node_count = len(dependency_offsets) - 1
+    sources = numpy.repeat(numpy.arange(node_count, dtype=numpy.int64), numpy.diff(dependency_offsets))
+    dependent_offsets, dependents = to_csr(dependencies, sources, node_count)
+
+    __save_array(output_path, "dependency_offsets", dependency_offsets)
+    __save_array(output_path, "dependencies", dependencies)
+    __save_array(output_path, "dependent_offsets", dependent_offsets)
+    __save_array(output_path, "dependents", dependents)
+
+    meta = {
+        "format": "dependency-graph",
+        "version": DEPENDENCY_GRAPH_VERSION,
+        "node_count": node_count,
+        "edge_count": len(dependencies),
+        "project_name_count": project_name_count,
+        **meta_fields,
+    }
+    with open(os.path.join(output_path, "meta.json"), "w+", encoding="utf-8") as meta_file:
+        meta_file.write(json.dumps(meta))
+
+    print(f"Stored {node_count} nodes and {len(dependencies)} dependencies.")
+
+
+def build_dependency_graph(
+    dependency_map: dict[str, list[str]],
+    project_name_to_id: dict[str, str],
+    output_path: str,
+) -> str:
+    """
+    Converts the dependency map and project name to id mapping to a
+    dependency graph, and stores it at the output path.
+    """
+
+    print(f'Creating dependency graph at "{output_path}".')
+
+    # Nodes are ordered by their (libraries.io) id, so building is deterministic.
+    node_ids = set(project_name_to_id.values())
+    node_ids.update(dependency_map.keys())
+    for dependency_ids in dependency_map.values():
+        node_ids.update(dependency_ids)
+    node_ids = sorted(node_ids, key=str)
+    node_to_index = {node_id: index for index, node_id in enumerate(node_ids)}
+    node_count = len(node_ids)
+
+    sources = []
+    targets = []
+    for focal_id, dependency_ids in dependency_map.items():
+        focal_index = node_to_index[focal_id]
+        for dependency_id in dependency_ids:
+            sources.append(focal_index)
+            targets.append(node_to_index[dependency_id])
+    sources = numpy.array(sources, dtype=numpy.int64)
+    targets = numpy.array(targets, dtype=numpy.int64)
+
+    dependency_offsets, dependencies = to_csr(sources, targets, node_count)
+
+    # Names are sorted by their encoding, so they can be binary searched.
+    project_names = sorted(project_name_to_id.keys(), key=lambda name: name.encode("utf-8"))
+    name_nodes = numpy.array(
+        [node_to_index[project_name_to_id[name]] for name in project_names],
+        dtype=numpy.int64,
+    )
+    node_name_offsets, node_names = to_csr(
+        name_nodes, numpy.arange(len(project_names), dtype=numpy.int64), node_count
+    )
+
+    safe_makedirs(output_path)
+    __save_array(output_path, "name_nodes", name_nodes.astype(numpy.int32))
+    __save_array(output_path, "node_name_offsets", node_name_offsets)
+    __save_array(output_path, "node_names", node_names)
+    __save_strings(output_path, "node_id", [str(node_id) for node_id in node_ids])
+    __save_strings(output_path, "project_name", project_names)
+    __save_dependencies(output_path, dependency_offsets, dependencies, len(project_names))
+    return output_path
+
+
+class DependencyGraph:
+    """
+    Reads a dependency graph. Nodes are integer indices; use ``find_node``
+    to get the node of a project name. All arrays are memory-mapped.
+
+    NOTE: Individual values are read through memoryviews rather than ``numpy.memmap``
+    objects, as indexing the latter is an order of magnitude slower.
+    """
+
+    def __init__(self, graph_path: str) -> None:
+        self.graph_path = graph_path
+
+        with open(os.path.join(graph_path, "meta.json"), "r", encoding="utf-8") as meta_file:
+            meta = json.loads(meta_file.read())
+        if meta.get("version") != DEPENDENCY_GRAPH_VERSION:
+            raise ValueError(
+                f'Unsupported dependency graph version {meta.get("version")} in "{graph_path}".'
+            )
+
+        self.node_count: int = meta["node_count"]
+        self.edge_count: int = meta["edge_count"]
+        self.project_name_count: int = meta["project_name_count"]
+
+        self._dependency_offsets = memoryview(self._load("dependency_offsets"))
+        self._dependencies = self._load("dependencies")
+        self._dependency_view = memoryview(self._dependencies)
+        self._dependent_offsets = memoryview(self._load("dependent_offsets"))
+        self._dependents = self._load("dependents")
+        self._name_nodes = memoryview(self._load("name_nodes"))
+        self._node_name_offsets = memoryview(self._load("node_name_offsets"))
+        self._node_names = memoryview(self._load("node_names"))
+        self._node_id_data = memoryview(self._load("node_id_data"))
+        self._node_id_offsets = memoryview(self._load("node_id_offsets"))
+        self._project_name_data = memoryview(self._load("project_name_data"))
+        self._project_name_offsets = memoryview(self._load("project_name_offsets"))
+
+    def _load(self, name: str) -> numpy.ndarray:
+        array = numpy.load(os.path.join(self.graph_path, f"{name}.npy"), mmap_mode="r")
+        return array.view(numpy.ndarray)
+
+    @staticmethod
+    def _get_string(data: memoryview, offsets: memoryview, index: int) -> bytes:
+        return bytes(data[offsets[index]:offsets[index + 1]])
+
+    def find_node(self, project_name: str) -> int | None:
+        """Returns the node of the project, or ``None`` if it isn't part of the graph."""
+        key = project_name.encode("utf-8")
+        low, high = 0, self.project_name_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._get_string(self._project_name_data, self._project_name_offsets, middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.project_name_count \
+                and self._get_string(self._project_name_data, self._project_name_offsets, low) == key:
+            return self._name_nodes[low]
+        return None
+
+    def get_project_names(self, node: int) -> list[str]:
+        """Returns the names of the projects corresponding to the node."""
+        name_indices = self._node_names[self._node_name_offsets[node]:self._node_name_offsets[node + 1]]
+        return [
+            self._get_string(self._project_name_data, self._project_name_offsets, name_index).decode("utf-8")
+            for name_index in name_indices
+        ]
+
+    def get_dependency_id(self, node: int) -> str:
+        """Returns the (libraries.io) id of the node; i.e., its key in the dependency map."""
+        return self._get_string(self._node_id_data, self._node_id_offsets, node).decode("utf-8")
+
+    def get_dependency_csr(self) -> "tuple[numpy.ndarray, numpy.ndarray]":
+        """Returns the offsets and the dependencies of all nodes."""
+        return self._load("dependency_offsets"), self._dependencies
+
+    def dependencies_of(self, node: int) -> numpy.ndarray:
+        """Returns the (sorted) nodes that the node depends on."""
+        return self._dependencies[self._dependency_offsets[node]:self._dependency_offsets[node + 1]]
+
+    def dependents_of(self, node: int) -> numpy.ndarray:
+        """Returns the (sorted) nodes that depend on the node."""
+        return self._dependents[self._dependent_offsets[node]:self._dependent_offsets[node + 1]]
+
+    def has_dependency(self, focal_node: int, other_node: int) -> bool:
+        """Returns true if the focal node depends on the other node."""
+        start = self._dependency_offsets[focal_node]
+        end = self._dependency_offsets[focal_node + 1]
+        index = bisect_left(self._dependency_view, other_node, start, end)
+        return index < end and self._dependency_view[index] == other_node
+
+
+def load_dependency_graph() -> DependencyGraph:
+    """
+    Loads the dependency graph, creating it from the dependency map
+    if it doesn't exist yet, or if it's older than the quick-load file.
+    """
+
+    global DEPENDENCY_GRAPH
+
+    exp_utils.load_paths_for_eco()
+    graph_path = get_dependency_graph_path()
+    ql_dependency_path = exp_utils.TRAIN_DATASET_PATH(file_name=QL_DEPENDENCY_FILE_NAME)
+    meta_path = os.path.join(graph_path, "meta.json")
+    if not os.path.exists(meta_path) \
+            or (os.path.exists(ql_dependency_path)
+                and os.path.getmtime(meta_path) < os.path.getmtime(ql_dependency_path)):
+        dependency_map, project_name_to_id = safe_load_dependency_map()
+        build_dependency_graph(dependency_map, project_name_to_id, graph_path)
+
+    DEPENDENCY_GRAPH = DependencyGraph(graph_path)
+    print(f"Loaded dependency graph with {DEPENDENCY_GRAPH.node_count} nodes "
+          f"and {DEPENDENCY_GRAPH.edge_count} dependencies.")
+    return DEPENDENCY_GRAPH
+
+
+def safe_load_dependency_graph() -> DependencyGraph:
+    """Returns the dependency graph that is in memory and loads it if it hasn't been loaded yet."""
+    if DEPENDENCY_GRAPH is None:
+        return load_dependency_graph()
+    return DEPENDENCY_GRAPH
+
+
+def build_transitive_dependency_graph(
+    graph: DependencyGraph, output_path: str,
+    max_depth: int | None = None, thread_count: int = 1,
+) -> str:
+    """
+    Creates a dependency graph with the same nodes as the input graph, containing
+    its transitive dependencies (up to the maximum depth), and stores it at the output path.
+    """
+
+    print(f'Creating transitive dependency graph with {max_depth=} at "{output_path}".')
+    dependency_offsets, dependencies = graph.get_dependency_csr()
+    closure_offsets, closure = calculate_transitive_closure(
+        dependency_offsets, dependencies, max_depth, thread_count
+    )
+
+    safe_makedirs(output_path)
+    for name in NODE_FILE_NAMES:
+        shutil.copyfile(
+            os.path.join(graph.graph_path, f"{name}.npy"),
+            os.path.join(output_path, f"{name}.npy"),
+        )
+    __save_dependencies(
+        output_path, closure_offsets, closure, graph.project_name_count, max_depth=max_depth
+    )
+    return output_path
+
+
+def get_transitive_dependency_graph_path(max_depth: int | None = None) -> str:
+    base_path, _ = os.path.splitext(get_dependency_graph_path())
+    depth_suffix = "" if max_depth is None else f"_{max_depth}"
+    return f"{base_path}_transitive{depth_suffix}{DEPENDENCY_GRAPH_EXT}"
+
+
+def safe_load_transitive_dependency_graph(
+    max_depth: int | None = None, thread_count: int = 1
+) -> DependencyGraph:
+    """
+    Returns the transitive dependency graph with the given maximum depth
+    and creates it if it doesn't exist or is older than the dependency graph.
+    """
+
+    if max_depth in TRANSITIVE_DEPENDENCY_GRAPHS:
+        return TRANSITIVE_DEPENDENCY_GRAPHS[max_depth]
+
+    graph = safe_load_dependency_graph()
+    graph_path = get_transitive_dependency_graph_path(max_depth)
+    meta_path = os.path.join(graph_path, "meta.json")
+    source_meta_path = os.path.join(graph.graph_path, "meta.json")
+    if not os.path.exists(meta_path) \
+            or os.path.getmtime(meta_path) < os.path.getmtime(source_meta_path):
+        build_transitive_dependency_graph(graph, graph_path, max_depth, thread_count)
+
+    TRANSITIVE_DEPENDENCY_GRAPHS[max_depth] = DependencyGraph(graph_path)
+    return TRANSITIVE_DEPENDENCY_GRAPHS[max_depth]
+
+
+def cmd_create_transitive_dependency_graph():
+    """
+    Cmd params:
+    -d: the maximum depth of the dependency chains; unlimited if omitted.
+    -t: number of threads.
+    """
+
+    max_depth = safe_get_argv(key="-d", default=None, data_type=int)
+    thread_count = safe_get_argv(key="-t", default=1, data_type=int)
+    exp_utils.load_paths_for_eco()
+
+    start = datetime.datetime.now()
+    graph = safe_load_transitive_dependency_graph(max_depth, thread_count)
+    deltatime = datetime.datetime.now() - start
+    print(f"Loaded transitive dependency graph with {graph.edge_count} dependencies in {deltatime}.")
+
+
+if __name__ == "__main__":
+    cmd_create_transitive_dependency_graph()
@@ -11,12 +11,20 @@ from csv import reader
 import datetime
 import json
 
+import numpy
+
+from python_proj.data_preprocessing.sliding_window_features.dependency_ecosystem_experience.dependency_closure import (
+    calculate_transitive_closure,
+    to_csr,
+)
 import python_proj.utils.exp_utils as exp_utils
 from python_proj.utils.util import SafeDict
 
 DEPENDENCY_MAP: SafeDict[int, set[int]] = None
 PROJECT_NAME_TO_ID: dict[str, int] = None
 
+QL_DEPENDENCY_FILE_NAME = "ql_dependencies"
+
 
 def __attempt_quick_load_dependency_map() -> (
     Tuple[bool, str, SafeDict[int, list[int]] | None, dict[str, int] | None]
@@ -32,8 +40,7 @@ def __attempt_quick_load_dependency_map() -> (
     # Attempts to load "quick-load" dependency map
     # if it exists. This is much faster than iterating
     # through the whole 15GB datafile.
-    ql_dependency_file_name = "ql_dependencies"
-    ql_dependency_path = exp_utils.TRAIN_DATASET_PATH(file_name=ql_dependency_file_name)
+    ql_dependency_path = exp_utils.TRAIN_DATASET_PATH(file_name=QL_DEPENDENCY_FILE_NAME)
 
     print(f'Loading projects and dependencies from: "{ql_dependency_path}".')
 
@@ -200,60 +207,48 @@ def safe_load_dependency_map() -> Tuple[SafeDict[int, set[int]], dict[str, int]]
 
 
 def calculate_transitive_dependency_map(
-    dependencies: SafeDict[int, list[int]], max_iter: int = 10_000
+    dependencies: SafeDict[int, list[int]],
+    max_depth: int | None = None,
+    thread_count: int = 1,
 ) -> SafeDict[int, set[int]]:
     """
     Calculates the transitive closure of the input dependencies;
-    i.e., cascading dependencies.
+    i.e., cascading dependencies (see ``dependency_closure``).
     """
 
+    project_ids = list(dependencies.keys())
+    project_to_index = {project_id: index for index, project_id in enumerate(project_ids)}
+    sources = []
+    targets = []
+    for project_id, dependency_ids in dependencies.items():
+        for dependency_id in dependency_ids:
+            if dependency_id not in project_to_index:
+                project_to_index[dependency_id] = len(project_ids)
+                project_ids.append(dependency_id)
+            sources.append(project_to_index[project_id])
+            targets.append(project_to_index[dependency_id])
+
+    offsets, neighbours = to_csr(
+        numpy.array(sources, dtype=numpy.int64),
+        numpy.array(targets, dtype=numpy.int64),
+        len(project_ids),
+    )
+    closure_offsets, closure = calculate_transitive_closure(
+        offsets, neighbours, max_depth, thread_count
+    )
+
     # HACK: Changes inner type to set instead of list.
+    closure_offsets = closure_offsets.tolist()
     for key in dependencies.keys():
-        dependencies[key] = set(dependencies[key])
-
-    # Calculates transitive dependencies.
-    not_converged = True
-    iter = 0
-    while not_converged:
-        iter += 1
-        print(f'Starting iteration {iter}/{max_iter}.')
-        not_converged = __calculate_transitive_dependency_map(dependencies)
-        if iter >= max_iter:
-            print(f"Could not converge in {max_iter} iterations.")
-            break
-    print(f"Calculated transitive dependency map in {iter} iterations.")
+        index = project_to_index[key]
+        dependencies[key] = {
+            project_ids[dependency_index]
+            for dependency_index in closure[closure_offsets[index]:closure_offsets[index + 1]].tolist()
+        }
+    print(f"Calculated transitive dependency map with {max_depth=}.")
     return dependencies
 
 
-def __calculate_transitive_dependency_map(
-    dependencies: SafeDict[int, set[int]]
-) -> bool:
-    """
-    Helper function applyling one round of transitive dependency merging.
-    Returns true if a dependency was added.
-    """
-
-    was_updated = False
-
-    project_ids = set(dependencies.keys())
-
-    for project_id in project_ids:
-        deps = dependencies[project_id]
-        old_dep_count = len(deps)
-
-        for dep_id in deps:
-            if dep_id not in dependencies:
-                continue
-            cascade_deps = dependencies[dep_id]
-            dependencies[project_id] = dependencies[project_id].union(cascade_deps)
-
-        new_dep_count = len(dependencies[project_id])
-        if new_dep_count != old_dep_count:
-            was_updated = True
-
-    return was_updated
-
-
 def filter_dependencies(
     included_projects: Iterator[int | str], map_name_to_id: bool = False
 ) -> Tuple[SafeDict[int, set[int]], dict[str, int]]:
@@ -261,6 +256,9 @@ def filter_dependencies(
     Filters all dependency fromm the singleton dependency
     map that are not included in the provided list. Returns
     the updated singletons.
+
+    NOTE: This doesn't affect a dependency graph (see ``dependency_graph``)
+    that is already stored on the file system.
     """
     global DEPENDENCY_MAP, PROJECT_NAME_TO_ID
 
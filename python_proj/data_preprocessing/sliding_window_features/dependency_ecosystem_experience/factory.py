@@ -6,10 +6,12 @@ from python_proj.data_preprocessing.sliding_window_features.dependency_ecosystem
 from python_proj.data_preprocessing.sliding_window_features.dependency_ecosystem_experience.features.inverse_dependency_ecosystem_experience import *
 from python_proj.data_preprocessing.sliding_window_features.dependency_ecosystem_experience.features.non_dependency_ecosystem_experience import *
 
+from python_proj.data_preprocessing.sliding_window_features.experience_ledger import ExperienceLedger
+
 # dependency pull requests.
 
 
-def build_deco_features():
+def build_deco_features(pr_ledger: ExperienceLedger, issue_ledger: ExperienceLedger):
     """
     Factory method for all features.
     """
@@ -17,33 +19,33 @@ def build_deco_features():
     # Discussion participation features are left out as they're
     # essentially the same as comment count.
     deco_pr = [
-        DependencyEcosystemExperienceSubmitterPullRequestSubmissionCount(),
-        DependencyEcosystemExperienceSubmitterPullRequestSuccessRate(),
-        DependencyEcosystemExperienceSubmitterPullRequestCommentCount(),
+        DependencyEcosystemExperienceSubmitterPullRequestSubmissionCount(pr_ledger),
+        DependencyEcosystemExperienceSubmitterPullRequestSuccessRate(pr_ledger),
+        DependencyEcosystemExperienceSubmitterPullRequestCommentCount(pr_ledger),
         # DependencyEcosystemExperienceSubmitterPullRequestDiscussionParticipationCount(),
         # TODO: I merged non-dependency ecosystem experience with the dependency experience return value. This is incorrect, but these factories are messy to begin with.
-        NonDependencyEcosystemExperienceSubmitterPullRequestSubmissionCount(),
-        NonDependencyEcosystemExperienceSubmitterPullRequestSuccessRate(),
-        NonDependencyEcosystemExperienceSubmitterPullRequestCommentCount(),
+        NonDependencyEcosystemExperienceSubmitterPullRequestSubmissionCount(pr_ledger),
+        NonDependencyEcosystemExperienceSubmitterPullRequestSuccessRate(pr_ledger),
+        NonDependencyEcosystemExperienceSubmitterPullRequestCommentCount(pr_ledger),
     ]
     deco_issue = [
-        DependencyEcosystemExperienceSubmitterIssueSubmissionCount(),
-        DependencyEcosystemExperienceSubmitterIssueCommentCount(),
+        DependencyEcosystemExperienceSubmitterIssueSubmissionCount(issue_ledger),
+        DependencyEcosystemExperienceSubmitterIssueCommentCount(issue_ledger),
         # DependencyEcosystemExperienceSubmitterIssueDiscussionParticipationCount(),
         # TODO: Same problem as described above.
-        NonDependencyEcosystemExperienceSubmitterIssueSubmissionCount(),
-        NonDependencyEcosystemExperienceSubmitterIssueCommentCount(),
+        NonDependencyEcosystemExperienceSubmitterIssueSubmissionCount(issue_ledger),
+        NonDependencyEcosystemExperienceSubmitterIssueCommentCount(issue_ledger),
     ]
 
     ideco_pr = [
-        InversedDependencyEcosystemExperienceSubmitterPullRequestSubmissionCount(),
-        InversedDependencyEcosystemExperienceSubmitterPullRequestSuccessRate(),
-        InversedDependencyEcosystemExperienceSubmitterPullRequestCommentCount(),
+        InversedDependencyEcosystemExperienceSubmitterPullRequestSubmissionCount(pr_ledger),
+        InversedDependencyEcosystemExperienceSubmitterPullRequestSuccessRate(pr_ledger),
+        InversedDependencyEcosystemExperienceSubmitterPullRequestCommentCount(pr_ledger),
         # InversedDependencyEcosystemExperienceSubmitterPullRequestDiscussionParticipationCount(),
     ]
     ideco_issue = [
-        InversedDependencyEcosystemExperienceSubmitterIssueSubmissionCount(),
-        InversedDependencyEcosystemExperienceSubmitterIssueCommentCount(),
+        InversedDependencyEcosystemExperienceSubmitterIssueSubmissionCount(issue_ledger),
+        InversedDependencyEcosystemExperienceSubmitterIssueCommentCount(issue_ledger),
         # InversedDependencyEcosystemExperienceSubmitterIssueDiscussionParticipationCount(),
     ]
 
@@ -5,6 +5,9 @@ Implements concrete wrapper for all dependency experience variables.
 from python_proj.data_preprocessing.sliding_window_features.dependency_ecosystem_experience.decorators import (
     DependencyEcosystemExperienceDecorator,
 )
+from python_proj.data_preprocessing.sliding_window_features.experience_ledger import (
+    ExperienceLedger,
+)
 from python_proj.data_preprocessing.sliding_window_features.ecosystem_experience import (
     EcosystemExperienceSubmitterPullRequestSubmissionCount,
     EcosystemExperienceSubmitterPullRequestSuccessRate,
@@ -19,9 +22,10 @@ from python_proj.data_preprocessing.sliding_window_features.ecosystem_experience
 class DependencyEcosystemExperienceSubmitterPullRequestSubmissionCount(
     DependencyEcosystemExperienceDecorator
 ):
-    def __init__(self) -> None:
+    def __init__(self, ledger: ExperienceLedger) -> None:
         super().__init__(
             inner_component=EcosystemExperienceSubmitterPullRequestSubmissionCount,
+            ledger=ledger,
             use_reversed_dependencies=False,
         )
 
@@ -29,9 +33,10 @@ class DependencyEcosystemExperienceSubmitterPullRequestSubmissionCount(
 class DependencyEcosystemExperienceSubmitterPullRequestSuccessRate(
     DependencyEcosystemExperienceDecorator
 ):
-    def __init__(self) -> None:
+    def __init__(self, ledger: ExperienceLedger) -> None:
         super().__init__(
             inner_component=EcosystemExperienceSubmitterPullRequestSuccessRate,
+            ledger=ledger,
             use_reversed_dependencies=False,
         )
 
@@ -39,9 +44,10 @@ class DependencyEcosystemExperienceSubmitterPullRequestSuccessRate(
 class DependencyEcosystemExperienceSubmitterPullRequestCommentCount(
     DependencyEcosystemExperienceDecorator
 ):
-    def __init__(self) -> None:
+    def __init__(self, ledger: ExperienceLedger) -> None:
         super().__init__(
             inner_component=EcosystemExperienceSubmitterPullRequestCommentCount,
+            ledger=ledger,
             use_reversed_dependencies=False,
         )
 
@@ -49,9 +55,10 @@ class DependencyEcosystemExperienceSubmitterPullRequestCommentCount(
 class DependencyEcosystemExperienceSubmitterPullRequestDiscussionParticipationCount(
     DependencyEcosystemExperienceDecorator
 ):
-    def __init__(self) -> None:
+    def __init__(self, ledger: ExperienceLedger) -> None:
         super().__init__(
             inner_component=EcosystemExperienceSubmitterPullRequestDiscussionParticipationCount,
+            ledger=ledger,
             use_reversed_dependencies=False,
         )
 
@@ -62,9 +69,10 @@ class DependencyEcosystemExperienceSubmitterPullRequestDiscussionParticipationCo
 class DependencyEcosystemExperienceSubmitterIssueSubmissionCount(
     DependencyEcosystemExperienceDecorator
 ):
-    def __init__(self) -> None:
+    def __init__(self, ledger: ExperienceLedger) -> None:
         super().__init__(
             inner_component=EcosystemExperienceSubmitterIssueSubmissionCount,
+            ledger=ledger,
             use_reversed_dependencies=False,
         )
 
@@ -72,9 +80,10 @@ class DependencyEcosystemExperienceSubmitterIssueSubmissionCount(
 class DependencyEcosystemExperienceSubmitterIssueCommentCount(
     DependencyEcosystemExperienceDecorator
 ):
-    def __init__(self) -> None:
+    def __init__(self, ledger: ExperienceLedger) -> None:
         super().__init__(
             inner_component=EcosystemExperienceSubmitterIssueCommentCount,
+            ledger=ledger,
             use_reversed_dependencies=False,
         )
 
@@ -82,8 +91,9 @@ class DependencyEcosystemExperienceSubmitterIssueCommentCount(
 class DependencyEcosystemExperienceSubmitterIssueDiscussionParticipationCount(
     DependencyEcosystemExperienceDecorator
 ):
-    def __init__(self) -> None:
+    def __init__(self, ledger: ExperienceLedger) -> None:
         super().__init__(
             inner_component=EcosystemExperienceSubmitterIssueDiscussionParticipationCount,
+            ledger=ledger,
             use_reversed_dependencies=False,
         )
@@ -5,6 +5,9 @@ Implements concrete wrapper for all inverse dependency experience variables.
 from python_proj.data_preprocessing.sliding_window_features.dependency_ecosystem_experience.decorators import (
     DependencyEcosystemExperienceDecorator,
 )
+from python_proj.data_preprocessing.sliding_window_features.experience_ledger import (
+    ExperienceLedger,
+)
 from python_proj.data_preprocessing.sliding_window_features.ecosystem_experience import (
     EcosystemExperienceSubmitterPullRequestSubmissionCount,
     EcosystemExperienceSubmitterPullRequestSuccessRate,
@@ -18,33 +21,37 @@ from python_proj.data_preprocessing.sliding_window_features.ecosystem_experience
 
 
 class InversedDependencyEcosystemExperienceSubmitterPullRequestSubmissionCount(DependencyEcosystemExperienceDecorator):
-    def __init__(self) -> None:
+    def __init__(self, ledger: ExperienceLedger) -> None:
         super().__init__(
             inner_component=EcosystemExperienceSubmitterPullRequestSubmissionCount,
+            ledger=ledger,
             use_reversed_dependencies=True
         )
 
 
 class InversedDependencyEcosystemExperienceSubmitterPullRequestSuccessRate(DependencyEcosystemExperienceDecorator):
-    def __init__(self) -> None:
+    def __init__(self, ledger: ExperienceLedger) -> None:
         super().__init__(
             inner_component=EcosystemExperienceSubmitterPullRequestSuccessRate,
+            ledger=ledger,
             use_reversed_dependencies=True
         )
 
 
 class InversedDependencyEcosystemExperienceSubmitterPullRequestCommentCount(DependencyEcosystemExperienceDecorator):
-    def __init__(self) -> None:
+    def __init__(self, ledger: ExperienceLedger) -> None:
         super().__init__(
             inner_component=EcosystemExperienceSubmitterPullRequestCommentCount,
+            ledger=ledger,
             use_reversed_dependencies=True
         )
 
 
 class InversedDependencyEcosystemExperienceSubmitterPullRequestDiscussionParticipationCount(DependencyEcosystemExperienceDecorator):
-    def __init__(self) -> None:
+    def __init__(self, ledger: ExperienceLedger) -> None:
         super().__init__(
             inner_component=EcosystemExperienceSubmitterPullRequestDiscussionParticipationCount,
+            ledger=ledger,
             use_reversed_dependencies=True
         )
 
@@ -53,25 +60,28 @@ class InversedDependencyEcosystemExperienceSubmitterPullRequestDiscussionPartici
 
 
 class InversedDependencyEcosystemExperienceSubmitterIssueSubmissionCount(DependencyEcosystemExperienceDecorator):
-    def __init__(self) -> None:
+    def __init__(self, ledger: ExperienceLedger) -> None:
         super().__init__(
             inner_component=EcosystemExperienceSubmitterIssueSubmissionCount,
+            ledger=ledger,
             use_reversed_dependencies=True
         )
 
 
 class InversedDependencyEcosystemExperienceSubmitterIssueCommentCount(DependencyEcosystemExperienceDecorator):
-    def __init__(self) -> None:
+    def __init__(self, ledger: ExperienceLedger) -> None:
         super().__init__(
             inner_component=EcosystemExperienceSubmitterIssueCommentCount,
+            ledger=ledger,
             use_reversed_dependencies=True
         )
 
 
 class InversedDependencyEcosystemExperienceSubmitterIssueDiscussionParticipationCount(DependencyEcosystemExperienceDecorator):
-    def __init__(self) -> None:
+    def __init__(self, ledger: ExperienceLedger) -> None:
         super().__init__(
             inner_component=EcosystemExperienceSubmitterIssueDiscussionParticipationCount,
+            ledger=ledger,
             use_reversed_dependencies=True
         )
 
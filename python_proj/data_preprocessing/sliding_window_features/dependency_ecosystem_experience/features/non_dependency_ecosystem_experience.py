@@ -5,6 +5,9 @@ Implements concrete wrapper for all non-dependency experience variables.
 from python_proj.data_preprocessing.sliding_window_features.dependency_ecosystem_experience.decorators import (
     NonDependencyEcosystemExperienceDecorator,
 )
+from python_proj.data_preprocessing.sliding_window_features.experience_ledger import (
+    ExperienceLedger,
+)
 from python_proj.data_preprocessing.sliding_window_features.ecosystem_experience import (
     EcosystemExperienceSubmitterPullRequestSubmissionCount,
     EcosystemExperienceSubmitterPullRequestSuccessRate,
@@ -19,36 +22,40 @@ from python_proj.data_preprocessing.sliding_window_features.ecosystem_experience
 class NonDependencyEcosystemExperienceSubmitterPullRequestSubmissionCount(
     NonDependencyEcosystemExperienceDecorator
 ):
-    def __init__(self) -> None:
+    def __init__(self, ledger: ExperienceLedger) -> None:
         super().__init__(
             inner_component=EcosystemExperienceSubmitterPullRequestSubmissionCount,
+            ledger=ledger,
         )
 
 
 class NonDependencyEcosystemExperienceSubmitterPullRequestSuccessRate(
     NonDependencyEcosystemExperienceDecorator
 ):
-    def __init__(self) -> None:
+    def __init__(self, ledger: ExperienceLedger) -> None:
         super().__init__(
             inner_component=EcosystemExperienceSubmitterPullRequestSuccessRate,
+            ledger=ledger,
         )
 
 
 class NonDependencyEcosystemExperienceSubmitterPullRequestCommentCount(
     NonDependencyEcosystemExperienceDecorator
 ):
-    def __init__(self) -> None:
+    def __init__(self, ledger: ExperienceLedger) -> None:
         super().__init__(
             inner_component=EcosystemExperienceSubmitterPullRequestCommentCount,
+            ledger=ledger,
         )
 
 
 class NonDependencyEcosystemExperienceSubmitterPullRequestDiscussionParticipationCount(
     NonDependencyEcosystemExperienceDecorator
 ):
-    def __init__(self) -> None:
+    def __init__(self, ledger: ExperienceLedger) -> None:
         super().__init__(
             inner_component=EcosystemExperienceSubmitterPullRequestDiscussionParticipationCount,
+            ledger=ledger,
         )
 
 
@@ -58,25 +65,28 @@ class NonDependencyEcosystemExperienceSubmitterPullRequestDiscussionParticipatio
 class NonDependencyEcosystemExperienceSubmitterIssueSubmissionCount(
     NonDependencyEcosystemExperienceDecorator
 ):
-    def __init__(self) -> None:
+    def __init__(self, ledger: ExperienceLedger) -> None:
         super().__init__(
             inner_component=EcosystemExperienceSubmitterIssueSubmissionCount,
+            ledger=ledger,
         )
 
 
 class NonDependencyEcosystemExperienceSubmitterIssueCommentCount(
     NonDependencyEcosystemExperienceDecorator
 ):
-    def __init__(self) -> None:
+    def __init__(self, ledger: ExperienceLedger) -> None:
         super().__init__(
             inner_component=EcosystemExperienceSubmitterIssueCommentCount,
+            ledger=ledger,
         )
 
 
 class NonDependencyEcosystemExperienceSubmitterIssueDiscussionParticipationCount(
     NonDependencyEcosystemExperienceDecorator
 ):
-    def __init__(self) -> None:
+    def __init__(self, ledger: ExperienceLedger) -> None:
         super().__init__(
             inner_component=EcosystemExperienceSubmitterIssueDiscussionParticipationCount,
+            ledger=ledger,
         )
@@ -3,20 +3,75 @@ Implements the features tracking the ecosystem experience of an individual;
 i.e., the experience they acquired through submitting PRs, issues, and comments.
 """
 
-from typing import Any
+from typing import Any, Iterable, Tuple
 
-from python_proj.data_preprocessing.sliding_window_features.base import SlidingWindowFeature, PullRequestSuccess
-from python_proj.utils.util import has_keys, SafeDict
-from python_proj.utils.exp_utils import get_owner_and_repo_from_source_path
+from python_proj.data_preprocessing.sliding_window_features.base import PullRequestSuccess
+from python_proj.data_preprocessing.sliding_window_features.experience_ledger import (
+    ExperienceLedger,
+    ExperienceLedgerView,
+)
+from python_proj.utils.util import has_keys, CounterDict
+from python_proj.utils.exp_utils import PROJECT_ID_KEY, SOURCE_PATH_KEY
 
 
-class EcosystemExperience(SlidingWindowFeature):
-    """Base class for ecosystem experience features."""
+class EcosystemExperience(ExperienceLedgerView):
+    """
+    Base class for ecosystem experience features. Besides the experience per
+    user per project, the ledger tracks a running total per user, so the ecosystem
+    experience can be calculated as the total minus the intra-project experience,
+    instead of iterating through all projects the user has been active in.
+    """
+
+    # The running totals can only be used when nothing but the current project
+    # is ignored; when it's disabled, ``project_is_ignored_for_cumulative_experience``
+    # is applied to every project instead. Decorators replace ``_select_projects``
+    # altogether (see ``EcosystemExperienceDecorator``).
+    uses_running_totals: bool = True
 
     def project_is_ignored_for_cumulative_experience(self, current_project_id, other_project_id) -> bool:
         """Returns true if the experience current and other project are the same."""
         return current_project_id == other_project_id
 
+    def _select_projects(
+        self, current_project_id: int, project_experience: dict
+    ) -> Tuple[Iterable[int], bool]:
+        """
+        Selects the projects whose experience is summed, or, if the returned boolean
+        is true, subtracted from the user's total experience. By default, only the
+        intra-project experience is subtracted.
+        """
+        if self.uses_running_totals:
+            return (current_project_id,), True
+        selected_projects = [
+            other_project_id for other_project_id in project_experience
+            if not self.project_is_ignored_for_cumulative_experience(current_project_id, other_project_id)
+        ]
+        return selected_projects, False
+
+    def _to_experience(self, counts: Any) -> Any:
+        """
+        Converts the ledger's counts of a user (in a project) to an experience value
+        that supports addition and subtraction; ``counts`` is ``None`` when there are none.
+        """
+        raise NotImplementedError()
+
+    def _aggregate_experience(
+        self, current_project_id: int, project_experience: dict, total_experience: Any
+    ) -> Any:
+        """Aggregates the experience of the user in the projects selected by ``_select_projects``."""
+        experience = self._to_experience(None)
+        if not project_experience:
+            return experience
+        projects, is_subtracted = self._select_projects(current_project_id, project_experience)
+        if is_subtracted:
+            experience = self._to_experience(total_experience)
+            for project_id in projects:
+                experience -= self._to_experience(project_experience.get(project_id))
+        else:
+            for project_id in projects:
+                experience += self._to_experience(project_experience[project_id])
+        return experience
+
 
 # Pull requests.
 
@@ -27,27 +82,6 @@ class EcosystemExperienceSubmitterPullRequestSuccessRate(EcosystemExperience):
     pull request success rate inside the ecosystem, excluding intra-project experience.
     """
 
-    def __init__(self) -> None:
-        self._user_to_project_success_rate: SafeDict[str, SafeDict[str, PullRequestSuccess]] = SafeDict(
-            default_value=SafeDict,
-            default_value_constructor_kwargs={'default_value': PullRequestSuccess})
-
-    def __handle(self, entry: dict, sign: int):
-        # New user.
-        user_id = entry["user_data"]["id"]
-        owner, repo = get_owner_and_repo_from_source_path(entry["__source_path"])
-        project = f'{owner}/{repo}'
-        if entry["merged"]:
-            self._user_to_project_success_rate[user_id][project].merged += sign
-        else:
-            self._user_to_project_success_rate[user_id][project].unmerged += sign
-
-    def add_entry(self, entry: dict):
-        self.__handle(entry, sign=1)
-
-    def remove_entry(self, entry: dict):
-        self.__handle(entry, sign=-1)
-
     def _get_cumulative_success_rate(self, entry: dict) -> PullRequestSuccess:
         """
         Builds a cumulative ``PullRequestSuccess`` object including all 
@@ -55,18 +89,16 @@ class EcosystemExperienceSubmitterPullRequestSuccessRate(EcosystemExperience):
         experience. 
         """
 
-        cumulative_success_rate = PullRequestSuccess()
-
         user_id = entry["user_data"]["id"]
-        owner, repo = get_owner_and_repo_from_source_path(entry["__source_path"])
-        current_project = f'{owner}/{repo}'
-        for other_project_key, success_rate in self._user_to_project_success_rate[user_id].items():
-            # Ignores intra-project experience.
-            if self.project_is_ignored_for_cumulative_experience(current_project, other_project_key):
-                continue
-            cumulative_success_rate.merged += success_rate.merged
-            cumulative_success_rate.unmerged += success_rate.unmerged
-        return cumulative_success_rate
+        current_project = entry[PROJECT_ID_KEY]
+        return self._aggregate_experience(
+            current_project,
+            self._ledger.submissions.get_counts(user_id),
+            self._ledger.submission_totals.get_counts(user_id),
+        )
+
+    def _to_experience(self, counts: dict | None) -> PullRequestSuccess:
+        return ExperienceLedger.to_success(counts or {})
 
     def get_feature(self, entry: dict) -> float:
         cumulative_success_rate = self._get_cumulative_success_rate(entry)
@@ -75,6 +107,9 @@ class EcosystemExperienceSubmitterPullRequestSuccessRate(EcosystemExperience):
     def is_valid_entry(self, entry: dict) -> bool:
         return has_keys(entry, ["user_data", "__source_path", "merged"])
 
+    def get_required_fields(self) -> list[list[str]]:
+        return [["user_data", "id"], [SOURCE_PATH_KEY], ["merged"]]
+
 
 class EcosystemExperienceSubmitterPullRequestSubmissionCount(EcosystemExperienceSubmitterPullRequestSuccessRate):
     """
@@ -94,37 +129,22 @@ class EcosystemExperienceSubmitterPullRequestCommentCount(EcosystemExperience):
     when someone comments on a pull request twice, it will count as two.
     """
 
-    def __init__(self) -> None:
-        self._user_to_project_pr_comment_count: SafeDict[int, SafeDict[str, int]] = SafeDict(
-            default_value=SafeDict,
-            default_value_constructor_kwargs={'default_value': 0})
-
-    def _handle(self, entry: dict, sign: int):
-        if entry["comments"] == 0:
-            return
-        owner, repo = get_owner_and_repo_from_source_path(entry["__source_path"])
-        project = f'{owner}/{repo}'
-        for comment in entry["comments_data"]:
-            commenter_id = comment["user_data"]["id"]
-            self._user_to_project_pr_comment_count[commenter_id][project] += sign
-
-    def add_entry(self, entry: dict):
-        self._handle(entry, sign=1)
-
-    def remove_entry(self, entry: dict):
-        self._handle(entry, sign=-1)
+    def _get_comment_counts(self) -> Tuple[CounterDict, CounterDict]:
+        """Returns the comment counts per user and project, and per user."""
+        return self._ledger.comments, self._ledger.comment_totals
 
     def get_feature(self, entry: dict) -> int:
         user_id = entry["user_data"]["id"]
-        owner, repo = get_owner_and_repo_from_source_path(entry["__source_path"])
-        current_project = f'{owner}/{repo}'
-        total_experience = 0
-        for other_project, experience in self._user_to_project_pr_comment_count[user_id].items():
-            # Ignores intra-project experience.
-            if self.project_is_ignored_for_cumulative_experience(current_project, other_project):
-                continue
-            total_experience += experience
-        return total_experience
+        current_project = entry[PROJECT_ID_KEY]
+        comment_counts, comment_totals = self._get_comment_counts()
+        return self._aggregate_experience(
+            current_project,
+            comment_counts.get_counts(user_id),
+            comment_totals.get_count(user_id),
+        )
+
+    def _to_experience(self, counts: int | None) -> int:
+        return counts or 0
 
     def is_valid_entry(self, entry: dict) -> bool:
         has_basics = has_keys(entry, ['comments', '__source_path'])
@@ -135,6 +155,10 @@ class EcosystemExperienceSubmitterPullRequestCommentCount(EcosystemExperience):
             return has_keys(entry, ['comments_data'])
         return True
 
+    def get_required_fields(self) -> list[list[str]]:
+        return [["comments"], ["comments_data", "user_data", "id"],
+                ["user_data", "id"], [SOURCE_PATH_KEY]]
+
 
 # TODO: This field can be removed from the repository as it's obsolete; it's essentially the same feature as comment count. This is also for the issue variant.
 class EcosystemExperienceSubmitterPullRequestDiscussionParticipationCount(EcosystemExperienceSubmitterPullRequestCommentCount):
@@ -146,18 +170,33 @@ class EcosystemExperienceSubmitterPullRequestDiscussionParticipationCount(Ecosys
     and instead only counts participating in discussion (i.e., those two comments count as 1).
 
     Functionally, this class does all the same things as ``SubmitterEcosystemExperiencePullRequestDiscussionParticipationCount``
-    though, hence why it inherits it and only overrides ``_handle``.
+    though, hence why it inherits it. As the ledger doesn't track participation,
+    it keeps its own counts.
     """
 
+    def __init__(self, ledger: ExperienceLedger) -> None:
+        super().__init__(ledger)
+        self._user_to_project_participation_count = CounterDict()
+        self._user_to_participation_count = CounterDict()
+
+    def _get_comment_counts(self) -> Tuple[CounterDict, CounterDict]:
+        return self._user_to_project_participation_count, self._user_to_participation_count
+
     def _handle(self, entry: dict, sign: int):
         if entry["comments"] == 0:
             return
-        owner, repo = get_owner_and_repo_from_source_path(entry["__source_path"])
-        project = f'{owner}/{repo}'
+        project = entry[PROJECT_ID_KEY]
         unique_commmenters = {comment['user_data']['id']
                               for comment in entry['comments_data']}
         for commenter_id in unique_commmenters:
-            self._user_to_project_pr_comment_count[commenter_id][project] += sign
+            self._user_to_project_participation_count.add(commenter_id, project, delta=sign)
+            self._user_to_participation_count.add(commenter_id, delta=sign)
+
+    def add_entry(self, entry: dict):
+        self._handle(entry, sign=1)
+
+    def remove_entry(self, entry: dict):
+        self._handle(entry, sign=-1)
 
 
 # Issue
@@ -169,39 +208,25 @@ class EcosystemExperienceSubmitterIssueSubmissionCount(EcosystemExperience):
     at an ecosystem level, excluding intra-project experience.
     """
 
-    def __init__(self) -> None:
-        self._user_to_project_success_rate: SafeDict[int, SafeDict[str, int]] = SafeDict(
-            default_value=SafeDict,
-            default_value_constructor_kwargs={'default_value': 0}
-        )
-
-    def _handle(self, entry: dict, sign: int):
-        user_id = entry["user_data"]["id"]
-        owner, repo = get_owner_and_repo_from_source_path(entry["__source_path"])
-        project = f'{owner}/{repo}'
-        self._user_to_project_success_rate[user_id][project] += sign
-
-    def add_entry(self, entry: dict):
-        self._handle(entry, sign=1)
-
-    def remove_entry(self, entry: dict):
-        self._handle(entry, sign=-1)
-
     def get_feature(self, entry: dict) -> int:
         user_id = entry["user_data"]["id"]
-        owner, repo = get_owner_and_repo_from_source_path(entry["__source_path"])
-        current_project = f'{owner}/{repo}'
-        total_experience = 0
-        for project, experience in self._user_to_project_success_rate[user_id].items():
-            # Ignores intra-project experience.
-            if self.project_is_ignored_for_cumulative_experience(current_project, project):
-                continue
-            total_experience += experience
-        return total_experience
+        current_project = entry[PROJECT_ID_KEY]
+        return self._aggregate_experience(
+            current_project,
+            self._ledger.submissions.get_counts(user_id),
+            self._ledger.submission_totals.get_counts(user_id),
+        )
+
+    def _to_experience(self, counts: dict | None) -> int:
+        # Issues are never merged, but all submissions are counted regardless.
+        return sum((counts or {}).values())
 
     def is_valid_entry(self, entry: dict) -> bool:
         return has_keys(entry, ['user_data', "__source_path"])
 
+    def get_required_fields(self) -> list[list[str]]:
+        return [["user_data", "id"], [SOURCE_PATH_KEY]]
+
 
 class EcosystemExperienceSubmitterIssueCommentCount(EcosystemExperienceSubmitterPullRequestCommentCount):
     """
@@ -222,17 +247,17 @@ class EcosystemExperienceSubmitterIssueDiscussionParticipationCount(EcosystemExp
     """
 
 
-def build_eco_experience():
+def build_eco_experience(pr_ledger: ExperienceLedger, issue_ledger: ExperienceLedger):
     eco_exp_pr_sw_features = [
-        EcosystemExperienceSubmitterPullRequestSuccessRate(),
-        EcosystemExperienceSubmitterPullRequestSubmissionCount(),
-        EcosystemExperienceSubmitterPullRequestCommentCount(),
+        EcosystemExperienceSubmitterPullRequestSuccessRate(pr_ledger),
+        EcosystemExperienceSubmitterPullRequestSubmissionCount(pr_ledger),
+        EcosystemExperienceSubmitterPullRequestCommentCount(pr_ledger),
         # Participation count is almost the same thing as comment count.
         # SubmitterEcosystemExperiencePullRequestDiscussionParticipationCount(),
     ]
     eco_exp_issue_sw_features = [
-        EcosystemExperienceSubmitterIssueSubmissionCount(),
-        EcosystemExperienceSubmitterIssueCommentCount(),
+        EcosystemExperienceSubmitterIssueSubmissionCount(issue_ledger),
+        EcosystemExperienceSubmitterIssueCommentCount(issue_ledger),
         # SubmitterEcosystemExperienceIssueDiscussionParticipationCount(),
     ]
     return eco_exp_pr_sw_features, eco_exp_issue_sw_features
@@ -0,0 +1,100 @@
+"""
+Implements a ledger of the user×project counters that are shared by the
+intra-project, ecosystem, and (non-/inversed) dependency experience features.
+Before, each of these features kept its own copy of the same counters, so one
+entry updated ~10 of them; now, the ledger is updated once per entry and the
+features are read-only views on it, which only differ in how they aggregate it.
+
+Similar to the SNA features, the ledger is a (non-output) sliding window feature
+that's part of the same feature list as its views; i.e., there is one for
+pull requests and one for issues.
+"""
+
+from python_proj.data_preprocessing.sliding_window_features.base import (
+    SlidingWindowFeature,
+    PullRequestSuccess,
+)
+from python_proj.utils.exp_utils import PROJECT_ID_KEY, SOURCE_PATH_KEY
+from python_proj.utils.util import CounterDict
+
+
+class ExperienceLedger(SlidingWindowFeature):
+    """
+    Counts the submissions and comments per user and project, as well as the
+    per-user totals. Views hold a reference to the ledger.
+    """
+
+    def __init__(self) -> None:
+        # Submissions per user, project, and whether they're merged.
+        self.submissions = CounterDict()
+        # Submissions per user, and whether they're merged.
+        self.submission_totals = CounterDict()
+        # Comments per commenter and project.
+        self.comments = CounterDict()
+        # Comments per commenter.
+        self.comment_totals = CounterDict()
+
+    def __handle(self, entry: dict, sign: int):
+        user_id = entry["user_data"]["id"]
+        project = entry[PROJECT_ID_KEY]
+        # Issues are never merged.
+        is_merged = bool(entry.get("merged", False))
+        self.submissions.add(user_id, project, is_merged, delta=sign)
+        self.submission_totals.add(user_id, is_merged, delta=sign)
+
+        if entry["comments"] == 0:
+            return
+        for comment in entry["comments_data"]:
+            commenter_id = comment["user_data"]["id"]
+            self.comments.add(commenter_id, project, delta=sign)
+            self.comment_totals.add(commenter_id, delta=sign)
+
+    def add_entry(self, entry: dict):
+        self.__handle(entry, sign=1)
+
+    def remove_entry(self, entry: dict):
+        self.__handle(entry, sign=-1)
+
+    def is_output_feature(self) -> bool:
+        return False
+
+    def get_feature(self, entry: dict) -> None:
+        return None
+
+    def get_required_fields(self) -> list[list[str]]:
+        return [["user_data", "id"], [SOURCE_PATH_KEY], ["merged"],
+                ["comments"], ["comments_data", "user_data", "id"]]
+
+    @staticmethod
+    def to_success(counts: dict) -> PullRequestSuccess:
+        """Converts (merged flag -> count) submission counts to a ``PullRequestSuccess``."""
+        return PullRequestSuccess(merged=counts.get(True, 0), unmerged=counts.get(False, 0))
+
+
+class ExperienceLedgerView(SlidingWindowFeature):
+    """
+    Base class for features that read from a ledger. Entries are added to and
+    removed from the ledger itself, so these methods don't do anything here.
+    """
+
+    def __init__(self, ledger: ExperienceLedger) -> None:
+        self._ledger = ledger
+
+    def add_entry(self, entry: dict):
+        pass
+
+    def remove_entry(self, entry: dict):
+        pass
+
+
+class PullRequestExperienceLedger(ExperienceLedger):
+    """Only here for the name."""
+
+
+class IssueExperienceLedger(ExperienceLedger):
+    """Only here for the name."""
+
+
+def build_experience_ledgers() -> tuple[ExperienceLedger, ExperienceLedger]:
+    """Factory method; returns the pull request and the issue ledger."""
+    return PullRequestExperienceLedger(), IssueExperienceLedger()
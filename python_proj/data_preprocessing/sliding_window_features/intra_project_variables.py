@@ -1,42 +1,30 @@
 from typing import Any
-from python_proj.data_preprocessing.sliding_window_features.base import SlidingWindowFeature, PullRequestSuccess
-from python_proj.utils.util import SafeDict, has_keys
+from python_proj.data_preprocessing.sliding_window_features.experience_ledger import (
+    ExperienceLedger,
+    ExperienceLedgerView,
+)
+from python_proj.utils.util import has_keys
 
-from python_proj.utils.exp_utils import get_owner_and_repo_from_source_path
+from python_proj.utils.exp_utils import PROJECT_ID_KEY, SOURCE_PATH_KEY
 
 
-class IntraProjectSubmitterPullRequestSubmissionCount(SlidingWindowFeature):
+class IntraProjectSubmitterPullRequestSubmissionCount(ExperienceLedgerView):
     """Intra PR submitted."""
 
-    def __init__(self) -> None:
-        self.pr_counts_per_user_per_project = SafeDict(
-            default_value=SafeDict,
-            default_value_constructor_kwargs={'default_value': 0}
-        )
-
-    def __handle(self, entry: dict, sign: int):
-        submitter_id = entry["user_data"]["id"]
-        owner, repo = get_owner_and_repo_from_source_path(entry["__source_path"])
-        project = f'{owner}/{repo}'
-        self.pr_counts_per_user_per_project[submitter_id][project] += sign
-
-    def add_entry(self, entry: dict):
-        self.__handle(entry, 1)
-
-    def remove_entry(self, entry: dict):
-        self.__handle(entry, -1)
-
     def is_valid_entry(self, entry: dict) -> bool:
         return has_keys(entry, ['user_data', "__source_path"])
 
+    def get_required_fields(self) -> list[list[str]]:
+        return [["user_data", "id"], [SOURCE_PATH_KEY]]
+
     def get_feature(self, entry: dict) -> Any:
         submitter_id = entry["user_data"]["id"]
-        owner, repo = get_owner_and_repo_from_source_path(entry["__source_path"])
-        project = f'{owner}/{repo}'
-        return self.pr_counts_per_user_per_project[submitter_id][project]
+        project = entry[PROJECT_ID_KEY]
+        submissions = self._ledger.submissions.get_counts(submitter_id, project)
+        return sum(submissions.values())
 
 
-class IntraProjectSubmitterPullRequestSuccessRate(SlidingWindowFeature):
+class IntraProjectSubmitterPullRequestSuccessRate(ExperienceLedgerView):
     """
     The success rate of the submitter of the pull request at 
     an intra-project level. This measure is used as a proxy for "core member"
@@ -47,60 +35,22 @@ class IntraProjectSubmitterPullRequestSuccessRate(SlidingWindowFeature):
     ControlIntraProjectPullRequestSuccessRateSubmitter()
     """
 
-    def __init__(self) -> None:
-        self.__projects_to_integrator_experience: SafeDict[str, SafeDict[int, PullRequestSuccess]] \
-            = SafeDict(default_value=SafeDict,
-                       default_value_constructor_kwargs={"default_value": PullRequestSuccess})
-
-    def handle(self, entry: dict, sign: int):
-        owner, repo = get_owner_and_repo_from_source_path(entry["__source_path"])
-        project = f'{owner}/{repo}'
-        submitter_id = entry["user_data"]["id"]
-        if entry["merged"]:
-            self.__projects_to_integrator_experience[project][submitter_id].merged += sign
-        else:
-            self.__projects_to_integrator_experience[project][submitter_id].unmerged += sign
-
-    def add_entry(self, entry: dict):
-        self.handle(entry, sign=1)
-
-    def remove_entry(self, entry: dict):
-        self.handle(entry, sign=-1)
-
     def get_feature(self, entry: dict) -> float:
-        owner, repo = get_owner_and_repo_from_source_path(entry["__source_path"])
-        project = f'{owner}/{repo}'
+        project = entry[PROJECT_ID_KEY]
         submitter = entry["user_data"]["id"]
-        dev_success_rate = self.__projects_to_integrator_experience[project][submitter]
+        submissions = self._ledger.submissions.get_counts(submitter, project)
+        dev_success_rate = ExperienceLedger.to_success(submissions)
         return dev_success_rate.get_success_rate()
 
     def is_valid_entry(self, entry: dict) -> bool:
         return has_keys(entry, ["__source_path", "user_data", "merged"])
 
+    def get_required_fields(self) -> list[list[str]]:
+        return [["user_data", "id"], [SOURCE_PATH_KEY], ["merged"]]
 
-class IntraProjectSubmitterPullRequestCommentCount(SlidingWindowFeature):
-    """The number of comments made no pull requests at an intra-project level."""
-
-    def __init__(self) -> None:
-        self.comment_counts_per_user_per_project = SafeDict(
-            default_value=SafeDict,
-            default_value_constructor_kwargs={'default_value': 0}
-        )
-
-    def __handle(self, entry: dict, sign: int):
-        if entry['comments'] == 0:
-            return
-        owner, repo = get_owner_and_repo_from_source_path(entry["__source_path"])
-        project = f'{owner}/{repo}'
-        for comment in entry['comments_data']:
-            commenter_id = comment['user_data']["id"]
-            self.comment_counts_per_user_per_project[commenter_id][project] += sign
-
-    def add_entry(self, entry: dict):
-        self.__handle(entry, sign=1)
 
-    def remove_entry(self, entry: dict):
-        self.__handle(entry, sign=-1)
+class IntraProjectSubmitterPullRequestCommentCount(ExperienceLedgerView):
+    """The number of comments made no pull requests at an intra-project level."""
 
     def is_valid_entry(self, entry: dict) -> bool:
         has_basics = has_keys(entry, ['comments'])
@@ -109,11 +59,14 @@ class IntraProjectSubmitterPullRequestCommentCount(SlidingWindowFeature):
                 return has_keys(entry, ['comments_data'])
         return False
 
+    def get_required_fields(self) -> list[list[str]]:
+        return [["comments"], ["comments_data", "user_data", "id"],
+                ["user_data", "id"], [SOURCE_PATH_KEY]]
+
     def get_feature(self, entry: dict) -> Any:
         submitter_id = entry['user_data']["id"]
-        owner, repo = get_owner_and_repo_from_source_path(entry["__source_path"])
-        project = f'{owner}/{repo}'
-        return self.comment_counts_per_user_per_project[submitter_id][project]
+        project = entry[PROJECT_ID_KEY]
+        return self._ledger.comments.get_count(submitter_id, project)
 
 
 class IntraProjectSubmitterIssueSubmissionCount(IntraProjectSubmitterPullRequestSubmissionCount):
@@ -124,15 +77,15 @@ class IntraProjectSubmitterIssueCommentCount(IntraProjectSubmitterPullRequestCom
     """Has the exact same implementation as parent class. just implemented for a different name."""
 
 
-def build_intra_project_features():
+def build_intra_project_features(pr_ledger: ExperienceLedger, issue_ledger: ExperienceLedger):
     """Factory method."""
     ip_issue_sw_features = [
-        IntraProjectSubmitterIssueSubmissionCount(),
-        IntraProjectSubmitterIssueCommentCount()
+        IntraProjectSubmitterIssueSubmissionCount(issue_ledger),
+        IntraProjectSubmitterIssueCommentCount(issue_ledger)
     ]
     ip_pr_sw_features = [
-        IntraProjectSubmitterPullRequestSubmissionCount(),
-        IntraProjectSubmitterPullRequestSuccessRate(),
-        IntraProjectSubmitterPullRequestCommentCount()
+        IntraProjectSubmitterPullRequestSubmissionCount(pr_ledger),
+        IntraProjectSubmitterPullRequestSuccessRate(pr_ledger),
+        IntraProjectSubmitterPullRequestCommentCount(pr_ledger)
     ]
     return ip_issue_sw_features, ip_pr_sw_features
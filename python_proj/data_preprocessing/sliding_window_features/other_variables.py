@@ -2,7 +2,7 @@ from typing import Any
 
 from python_proj.data_preprocessing.sliding_window_features.base import Feature
 from python_proj.utils.util import SafeDict, has_keys
-from python_proj.utils.exp_utils import get_owner_and_repo_from_source_path
+from python_proj.utils.exp_utils import PROJECT_ID_KEY, SOURCE_PATH_KEY
 
 
 class PullRequestIsMerged(Feature):
@@ -17,6 +17,9 @@ class PullRequestIsMerged(Feature):
     def is_valid_entry(self, entry: dict) -> bool:
         return "merged" in entry
 
+    def get_required_fields(self) -> list[list[str]]:
+        return [["merged"]]
+
 
 class SubmitterIsFirstTimeContributor(Feature):
     """
@@ -29,8 +32,7 @@ class SubmitterIsFirstTimeContributor(Feature):
         self.__submitters_per_project = SafeDict(default_value=set)
 
     def get_feature(self, entry: dict) -> Any:
-        owner, repo = get_owner_and_repo_from_source_path(entry["__source_path"])
-        project = f'{owner}/{repo}'
+        project = entry[PROJECT_ID_KEY]
         submitter_id = entry['user_data']['id']
         is_first_time_contributor = submitter_id \
             not in self.__submitters_per_project[project]
@@ -40,6 +42,9 @@ class SubmitterIsFirstTimeContributor(Feature):
     def is_valid_entry(self, entry: dict) -> bool:
         return has_keys(entry, ['user_data', "__source_path"])
 
+    def get_required_fields(self) -> list[list[str]]:
+        return [["user_data", "id"], [SOURCE_PATH_KEY]]
+
 
 def build_other_features():
     """Feature factory method."""
@@ -0,0 +1,176 @@
+"""
+Implements an opt-in profiler for the hot paths of the sliding window features;
+i.e., ``add_entry``, ``remove_entry`` and ``get_feature``. For each feature class
+and method, it tracks the call count, the cumulative wall time, and a latency
+histogram from which the p50 and p99 latencies are derived.
+
+Features are profiled by changing their class to a subclass that times these
+methods (see ``FeatureProfiler.profile_features``), so runs without profiling
+don't have any overhead at all.
+"""
+
+import csv
+import json
+import math
+from time import perf_counter_ns
+from typing import Any, Callable, Iterator
+
+from python_proj.data_preprocessing.sliding_window_features.base import Feature
+
+PROFILED_METHODS = ["add_entry", "remove_entry", "get_feature"]
+
+# Latencies are binned with 8 bins per power of two (i.e., ~9% precision),
+# so the percentiles can be calculated without storing every measurement.
+BINS_PER_OCTAVE = 8
+
+
+class MethodProfile:
+    """The call count, cumulative time and latency histogram of a method."""
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.total_time_ns: int = 0
+        self.histogram: dict[int, int] = {}
+
+    def add(self, elapsed_ns: int):
+        self.count += 1
+        self.total_time_ns += elapsed_ns
+        bin_index = int(math.log2(elapsed_ns) * BINS_PER_OCTAVE) if elapsed_ns > 0 else 0
+        self.histogram[bin_index] = self.histogram.get(bin_index, 0) + 1
+
+    def merge(self, other: "MethodProfile"):
+        self.count += other.count
+        self.total_time_ns += other.total_time_ns
+        for bin_index, count in other.histogram.items():
+            self.histogram[bin_index] = self.histogram.get(bin_index, 0) + count
+
+    def get_percentile(self, percentile: float) -> float:
+        """Returns the (upper bound of the) latency percentile in seconds."""
+        if self.count == 0:
+            return 0.0
+        threshold = math.ceil(self.count * percentile / 100)
+        cumulative_count = 0
+        for bin_index in sorted(self.histogram.keys()):
+            cumulative_count += self.histogram[bin_index]
+            if cumulative_count >= threshold:
+                break
+        return 2 ** ((bin_index + 1) / BINS_PER_OCTAVE) / 10**9
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total_time_ns": self.total_time_ns,
+            # JSON keys have to be strings.
+            "histogram": {str(key): value for key, value in self.histogram.items()},
+        }
+
+    @staticmethod
+    def from_dict(data: dict) -> "MethodProfile":
+        profile = MethodProfile()
+        profile.count = data["count"]
+        profile.total_time_ns = data["total_time_ns"]
+        profile.histogram = {int(key): value for key, value in data["histogram"].items()}
+        return profile
+
+
+def _create_timed_method(method: Callable, profile: MethodProfile) -> Callable:
+    def timed_method(self, *args, **kwargs):
+        start = perf_counter_ns()
+        result = method(self, *args, **kwargs)
+        profile.add(perf_counter_ns() - start)
+        return result
+
+    return timed_method
+
+
+class FeatureProfiler:
+    """Profiles the methods of all features of the same class together."""
+
+    def __init__(self) -> None:
+        self._profiles: dict[str, dict[str, MethodProfile]] = {}
+        self._profiled_classes: dict[type, type] = {}
+
+    def _get_profiled_class(self, feature_class: type) -> type:
+        if feature_class in self._profiled_classes.values():
+            return feature_class
+        if feature_class not in self._profiled_classes:
+            class_profiles = self._profiles.setdefault(feature_class.__name__, {})
+            namespace = {}
+            for method_name in PROFILED_METHODS:
+                # Plain features don't have ``add_entry`` and ``remove_entry``.
+                if not hasattr(feature_class, method_name):
+                    continue
+                profile = class_profiles.setdefault(method_name, MethodProfile())
+                method = getattr(feature_class, method_name)
+                namespace[method_name] = _create_timed_method(method, profile)
+            # It keeps the name as that's used to name the outputs.
+            profiled_class = type(feature_class.__name__, (feature_class,), namespace)
+            profiled_class.__module__ = feature_class.__module__
+            self._profiled_classes[feature_class] = profiled_class
+        return self._profiled_classes[feature_class]
+
+    def profile_features(self, features: list[Feature]):
+        """Starts profiling the given features."""
+        for feature in features:
+            feature.__class__ = self._get_profiled_class(feature.__class__)
+
+    def to_dict(self) -> dict:
+        return {
+            feature_name: {
+                method_name: profile.to_dict()
+                for method_name, profile in method_profiles.items()
+                if profile.count > 0
+            }
+            for feature_name, method_profiles in self._profiles.items()
+        }
+
+
+def _iterate_report_rows(
+    profiles: dict[tuple[str, str, Any], MethodProfile]
+) -> Iterator[dict]:
+    for (feature_name, method_name, worker), profile in profiles.items():
+        yield {
+            "feature": feature_name,
+            "method": method_name,
+            "worker": worker,
+            "count": profile.count,
+            "total_time_s": profile.total_time_ns / 10**9,
+            "p50_s": profile.get_percentile(50),
+            "p99_s": profile.get_percentile(99),
+        }
+
+
+def write_profile_report(
+    worker_profiles: Iterator[tuple[int, dict]], output_base_path: str
+):
+    """
+    Merges the profiles of the workers (i.e., (worker index, ``to_dict``) pairs)
+    and writes a report to ``<output_base_path>.json`` and ``<output_base_path>.csv``.
+    The report contains a row per feature, method and worker, and one for the
+    workers combined (``"all"``), which are sorted by their cumulative time.
+    """
+
+    merged_profiles: dict[tuple[str, str, Any], MethodProfile] = {}
+    for worker_index, worker_profile in worker_profiles:
+        for feature_name, method_profiles in worker_profile.items():
+            for method_name, profile_data in method_profiles.items():
+                profile = MethodProfile.from_dict(profile_data)
+                for worker in [worker_index, "all"]:
+                    key = (feature_name, method_name, worker)
+                    merged_profiles.setdefault(key, MethodProfile()).merge(profile)
+
+    rows = sorted(
+        _iterate_report_rows(merged_profiles),
+        key=lambda row: (row["worker"] != "all", -row["total_time_s"]),
+    )
+
+    with open(f"{output_base_path}.json", "w+", encoding="utf-8") as output_file:
+        output_file.write(json.dumps(rows, indent=2))
+    with open(f"{output_base_path}.csv", "w+", encoding="utf-8") as output_file:
+        csv_writer = csv.DictWriter(
+            output_file,
+            fieldnames=["feature", "method", "worker", "count", "total_time_s", "p50_s", "p99_s"],
+        )
+        csv_writer.writeheader()
+        csv_writer.writerows(rows)
+    print(f'Stored feature profile at "{output_base_path}.json" and "{output_base_path}.csv".')
@@ -0,0 +1,129 @@
+"""
+Compares the peak resident set size of the sliding window algorithm with
+the ``CounterDict``-based features to that of the original ``SafeDict``-based
+behaviour, which added an (empty) entry on every read and never removed counters
+that dropped to zero. The latter is emulated by changing the class of all
+counters to ``InsertingCounterDict``, which underestimates the original memory use
+slightly, as nested ``SafeDict`` objects are larger than plain dictionaries.
+
+Each variant is run in a separate process, so their peak RSS doesn't overlap;
+the reported value is that of the largest worker.
+
+Cmd params:
+-pd: comma-separated pull request dataset names.
+-id: comma-separated issue dataset names.
+-w: window size in days.
+-t: number of threads.
+--no-sna: disables the SNA features.
+"""
+
+from datetime import datetime
+import filecmp
+from functools import partial
+import multiprocessing
+import resource
+from typing import Callable
+
+from python_proj.data_preprocessing.sliding_window_3 import (
+    all_features_factory,
+    create_sliding_window_dataset,
+)
+from python_proj.data_preprocessing.sliding_window_features.base import Feature
+from python_proj.utils.arg_utils import safe_get_argv, get_argv_flag
+import python_proj.utils.exp_utils as exp_utils
+from python_proj.utils.util import CounterDict
+
+
+class InsertingCounterDict(CounterDict):
+    """Emulates ``SafeDict``: reads add entries and counters aren't removed at zero."""
+
+    def add(self, *keys, delta: int = 1):
+        mapping = self.get_counts(*keys[:-1])
+        mapping[keys[-1]] = mapping.get(keys[-1], 0) + delta
+
+    def get_count(self, *keys, default: int = 0) -> int:
+        mapping = self.get_counts(*keys[:-1])
+        return mapping.setdefault(keys[-1], default)
+
+    def get_counts(self, *keys) -> dict:
+        mapping = self
+        for key in keys:
+            mapping = mapping.setdefault(key, {})
+        return mapping
+
+
+def use_inserting_counters(obj: object, visited: set[int] | None = None):
+    """Changes the class of all counters of the (nested) features."""
+    visited = set() if visited is None else visited
+    if id(obj) in visited:
+        return
+    visited.add(id(obj))
+    for value in vars(obj).values():
+        if isinstance(value, CounterDict):
+            value.__class__ = InsertingCounterDict
+        elif isinstance(value, Feature):
+            # E.g., the inner component of decorators.
+            use_inserting_counters(value, visited)
+
+
+def inserting_features_factory(feature_factory: Callable) -> tuple:
+    feature_sets = feature_factory()
+    for features in feature_sets:
+        for feature in features:
+            use_inserting_counters(feature)
+    return feature_sets
+
+
+def measure_run(output_path: str, kwargs: dict, results: multiprocessing.Queue):
+    start = datetime.now()
+    create_sliding_window_dataset(output_path, **kwargs)
+    deltatime = datetime.now() - start
+    # It's a fresh process, so this only contains the workers of this run.
+    peak_rss_in_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    results.put((peak_rss_in_kb, deltatime.total_seconds()))
+
+
+def timed_run(name: str, **kwargs) -> tuple[str, int]:
+    output_path = exp_utils.TRAIN_DATASET_PATH(file_name=f"counter_memory_benchmark_{name}")
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    process = context.Process(target=measure_run, args=(output_path, kwargs, results))
+    process.start()
+    peak_rss_in_kb, wall_time = results.get()
+    process.join()
+    print(f"{name}: {peak_rss_in_kb / 1024:.1f} MiB peak worker RSS, {wall_time:.3f}s wall time.")
+    return output_path, peak_rss_in_kb
+
+
+def cmd_counter_memory_benchmark():
+    exp_utils.load_paths_for_eco()
+
+    pr_dataset_names = [entry for entry in safe_get_argv(key="-pd", default="").split(",")
+                        if entry != ""]
+    issue_dataset_names = [entry for entry in safe_get_argv(key="-id", default="").split(",")
+                           if entry != ""]
+    window_size_in_days = safe_get_argv(key="-w", default=90, data_type=int)
+    thread_count = safe_get_argv(key="-t", default=4, data_type=int)
+    use_sna = not get_argv_flag("--no-sna")
+
+    feature_factory = partial(all_features_factory, use_sna=use_sna)
+    kwargs = {
+        "chunk_output_base_path": exp_utils.BASE_PATH + "/temp/sna_output/counter_memory_benchmark_",
+        "input_issue_dataset_names": issue_dataset_names,
+        "input_pr_dataset_names": pr_dataset_names,
+        "window_size_in_days": window_size_in_days,
+        "thread_count": thread_count,
+    }
+
+    inserting_path, inserting_rss = timed_run(
+        "inserting", feature_factory=partial(inserting_features_factory, feature_factory), **kwargs)
+    counter_path, counter_rss = timed_run("counter", feature_factory=feature_factory, **kwargs)
+
+    print(f"Peak RSS reduction: {(inserting_rss - counter_rss) / 1024:.1f} MiB "
+          f"({counter_rss / inserting_rss:.2f}x).")
+    is_identical = filecmp.cmp(inserting_path, counter_path, shallow=False)
+    print(f"Outputs are identical: {is_identical}.")
+
+
+if __name__ == "__main__":
+    cmd_counter_memory_benchmark()
@@ -0,0 +1,87 @@
+"""
+Benchmarks ``count_preceding_edges``, which the second-order degree centrality
+features use to count the experience edges preceding the connecting edges,
+against the original nested loop. It uses random chronological timestamp sequences
+of various lengths (with duplicate timestamps), and verifies the counts are identical.
+
+Cmd params:
+-r: number of repetitions per sequence length.
+"""
+
+from array import array
+from datetime import datetime
+import random
+from typing import Callable, Sequence
+
+import python_proj.data_preprocessing.sliding_window_features.collaboration_experience.centrality_features as centrality_features
+from python_proj.data_preprocessing.sliding_window_features.collaboration_experience.centrality_features import (
+    count_preceding_edges,
+)
+from python_proj.utils.arg_utils import safe_get_argv
+from python_proj.utils.util import stepped_enumerate
+
+SEQUENCE_LENGTHS = [1, 2, 4, 8, 16, 32, 64, 128, 512, 2048]
+
+
+def nested_loop_count_preceding_edges(
+    connecting_timestamps: Sequence[int], experience_timestamps: Sequence[int]
+) -> int:
+    """The original implementation in ``FirstOrderDegreeCentralityV2``, used as a reference."""
+    degree = 0
+    for remaining_connected_edge_count, connecting_edge_timestamp in stepped_enumerate(
+        connecting_timestamps, start=len(connecting_timestamps), step=-1
+    ):
+        for experience_edge_timestamp in experience_timestamps:
+            if experience_edge_timestamp >= connecting_edge_timestamp:
+                break
+            degree += remaining_connected_edge_count
+    return degree
+
+
+def generate_timestamps(length: int) -> array:
+    """Generates chronological timestamps, some of which are identical."""
+    return array("q", sorted(random.randrange(length * 4) for _ in range(length)))
+
+
+def timed_count(
+    count: Callable, cases: list[tuple[Sequence[int], Sequence[int]]]
+) -> tuple[float, list[int]]:
+    start = datetime.now()
+    degrees = [count(connecting, experience) for connecting, experience in cases]
+    return (datetime.now() - start).total_seconds(), degrees
+
+
+def cmd_degree_counting_benchmark():
+    repetitions = safe_get_argv(key="-r", default=200, data_type=int)
+    random.seed(0)
+
+    all_identical = True
+    for connecting_length in SEQUENCE_LENGTHS:
+        for experience_length in SEQUENCE_LENGTHS:
+            # The connecting edges are filtered into a list by the features.
+            cases = [
+                (list(generate_timestamps(connecting_length)), generate_timestamps(experience_length))
+                for _ in range(repetitions)
+            ]
+            reference_time, reference_degrees = timed_count(nested_loop_count_preceding_edges, cases)
+            bisect_time, bisect_degrees = timed_count(count_preceding_edges, cases)
+
+            # Disables the numpy variant, to compare it to pure bisection.
+            threshold = centrality_features.NUMPY_COUNTING_THRESHOLD
+            centrality_features.NUMPY_COUNTING_THRESHOLD = float("inf")
+            pure_bisect_time, pure_bisect_degrees = timed_count(count_preceding_edges, cases)
+            centrality_features.NUMPY_COUNTING_THRESHOLD = threshold
+
+            is_identical = reference_degrees == bisect_degrees == pure_bisect_degrees
+            all_identical &= is_identical
+            print(f"{connecting_length=}, {experience_length=}: "
+                  f"nested loop {reference_time * 1e6 / repetitions:.1f}us, "
+                  f"bisect {pure_bisect_time * 1e6 / repetitions:.1f}us, "
+                  f"count_preceding_edges {bisect_time * 1e6 / repetitions:.1f}us, "
+                  f"{is_identical=}.")
+
+    print(f"All counts are identical: {all_identical}.")
+
+
+if __name__ == "__main__":
+    cmd_degree_counting_benchmark()
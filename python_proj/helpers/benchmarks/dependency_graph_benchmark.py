@@ -0,0 +1,237 @@
+"""
+Compares the memory-mapped CSR dependency graph to the JSON quick-load
+dependency map in terms of load time and memory use. Each variant is loaded in
+a fresh process, which then forks a number of workers that query the dependencies
+of random projects, similar to how the sliding window workers use them.
+
+For the workers, the private memory (i.e., the memory that's not shared with
+other processes) is reported, which is what each additional worker costs.
+
+Cmd params:
+-s: number of projects in a synthetic dependency map; uses the eco's quick-load file when 0.
+-d: average number of dependencies per project in the synthetic dependency map.
+-t: number of workers.
+-q: number of queries per worker.
+"""
+
+from datetime import datetime
+import gc
+import json
+import multiprocessing
+import os
+import random
+from typing import Callable
+
+from python_proj.data_preprocessing.sliding_window_features.dependency_ecosystem_experience.dependency_graph import (
+    DependencyGraph,
+    build_dependency_graph,
+    get_dependency_graph_path,
+)
+from python_proj.data_preprocessing.sliding_window_features.dependency_ecosystem_experience.dependency_loading import (
+    QL_DEPENDENCY_FILE_NAME,
+)
+from python_proj.utils.arg_utils import safe_get_argv
+import python_proj.utils.exp_utils as exp_utils
+from python_proj.utils.util import SafeDict, safe_makedirs
+
+# A query workload's result per project: its dependencies and whether it depends on the next project.
+QueryResult = list[tuple[list[str], bool]]
+
+
+def generate_quick_load_file(output_path: str, project_count: int, dependency_count: int):
+    """Writes a synthetic quick-load file with a heavy-tailed number of dependencies per project."""
+    print(f'Generating synthetic quick-load file at "{output_path}".')
+    random.seed(0)
+    project_ids = [str(1_000_000 + index) for index in range(project_count)]
+    dependency_map = {}
+    for project_id in project_ids:
+        project_dependency_count = min(project_count, int(random.expovariate(1 / dependency_count)))
+        if project_dependency_count > 0:
+            dependency_map[project_id] = random.sample(project_ids, k=project_dependency_count)
+    project_name_to_id = {
+        f"owner{index}/repo{index}": project_id
+        for index, project_id in enumerate(project_ids)
+    }
+    with open(output_path, "w+", encoding="utf-8") as output_file:
+        output_file.write(json.dumps({
+            "dependency_map": dependency_map,
+            "project_name_to_id": project_name_to_id,
+        }))
+
+
+def get_memory_usage() -> dict[str, int]:
+    """Returns the RSS, PSS, and private memory of this process in KiB."""
+    memory_usage = {}
+    with open("/proc/self/smaps_rollup", "r", encoding="utf-8") as smaps_file:
+        for line in smaps_file:
+            key, *values = line.split()
+            if key in ("Rss:", "Pss:", "Private_Clean:", "Private_Dirty:"):
+                memory_usage[key[:-1]] = int(values[0])
+    memory_usage["Private"] = memory_usage["Private_Clean"] + memory_usage["Private_Dirty"]
+    return memory_usage
+
+
+def load_json(ql_dependency_path: str, _: str) -> Callable[[list[str]], QueryResult]:
+    # NOTE: This mirrors the quick load in ``dependency_loading``, which has a fixed path.
+    with open(ql_dependency_path, "r", encoding="utf-8") as input_file:
+        j_data = json.loads(input_file.read())
+        dependency_map = SafeDict(initial_mapping=j_data["dependency_map"], default_value=set)
+        project_name_to_id = j_data["project_name_to_id"]
+
+    def __query(project_names: list[str]) -> QueryResult:
+        results = []
+        for project_name, other_project_name in zip(project_names, project_names[1:]):
+            project_id = project_name_to_id.get(project_name)
+            dependencies = dependency_map.get(project_id, [])
+            other_project_id = project_name_to_id.get(other_project_name)
+            results.append((sorted(dependencies), other_project_id in dependencies))
+        return results
+
+    return __query
+
+
+def load_graph(_: str, graph_path: str) -> Callable[[list[str]], QueryResult]:
+    graph = DependencyGraph(graph_path)
+
+    def __query(project_names: list[str]) -> QueryResult:
+        results = []
+        for project_name, other_project_name in zip(project_names, project_names[1:]):
+            node = graph.find_node(project_name)
+            other_node = graph.find_node(other_project_name)
+            if node is None:
+                results.append(([], False))
+                continue
+            dependencies = [graph.get_dependency_id(dependency)
+                            for dependency in graph.dependencies_of(node).tolist()]
+            has_dependency = other_node is not None and graph.has_dependency(node, other_node)
+            results.append((sorted(dependencies), has_dependency))
+        return results
+
+    return __query
+
+
+def run_worker(
+    worker_index: int, query: Callable, project_names: list[str], results: multiprocessing.Queue
+):
+    start = datetime.now()
+    query_result = query(project_names)
+    deltatime = datetime.now() - start
+    # HACK: Long-running workers do full garbage collections, which touch
+    # all container objects; i.e., this emulates the copy-on-write cost of that.
+    gc.collect()
+    results.put((worker_index, (get_memory_usage(), deltatime.total_seconds(), query_result)))
+
+
+def run_variant(
+    load: Callable, ql_dependency_path: str, graph_path: str,
+    worker_project_names: list[list[str]], results: multiprocessing.Queue
+):
+    context = multiprocessing.get_context("fork")
+    rss_before = get_memory_usage()["Rss"]
+    start = datetime.now()
+    query = load(ql_dependency_path, graph_path)
+    load_time = (datetime.now() - start).total_seconds()
+    loader_rss = get_memory_usage()["Rss"] - rss_before
+
+    worker_results = context.Queue()
+    workers = [context.Process(target=run_worker, args=(index, query, project_names, worker_results))
+               for index, project_names in enumerate(worker_project_names)]
+    for worker in workers:
+        worker.start()
+    # Workers finish in arbitrary order.
+    worker_outputs = [output for _, output in sorted(
+        (worker_results.get() for _ in workers), key=lambda result: result[0])]
+    for worker in workers:
+        worker.join()
+    results.put((load_time, loader_rss, worker_outputs))
+
+
+def timed_variant(
+    name: str, load: Callable, ql_dependency_path: str,
+    graph_path: str, worker_project_names: list[list[str]]
+) -> list[QueryResult]:
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    process = context.Process(
+        target=run_variant,
+        args=(load, ql_dependency_path, graph_path, worker_project_names, results),
+    )
+    process.start()
+    load_time, loader_rss, worker_outputs = results.get()
+    process.join()
+
+    worker_private = sum(memory_usage["Private"] for memory_usage, _, _ in worker_outputs)
+    worker_pss = sum(memory_usage["Pss"] for memory_usage, _, _ in worker_outputs)
+    query_time = max(query_time for _, query_time, _ in worker_outputs)
+    print(f"{name}: {load_time:.3f}s load time, {loader_rss / 1024:.1f} MiB loaded RSS, "
+          f"{worker_private / 1024:.1f} MiB private / {worker_pss / 1024:.1f} MiB PSS "
+          f"in {len(worker_outputs)} workers, {query_time:.3f}s query time.")
+    return [query_result for _, _, query_result in worker_outputs]
+
+
+def sample_project_names(graph_path: str, worker_count: int, query_count: int) -> list[list[str]]:
+    """Samples the project names each worker queries; drawn from random nodes of the graph."""
+    random.seed(0)
+    graph = DependencyGraph(graph_path)
+    worker_project_names = []
+    for _ in range(worker_count):
+        project_names = []
+        while len(project_names) < query_count + 1:
+            node = random.randrange(graph.node_count)
+            project_names.extend(graph.get_project_names(node)[:1])
+        worker_project_names.append(project_names)
+    return worker_project_names
+
+
+def prepare_files(
+    ql_dependency_path: str, graph_path: str, project_count: int, dependency_count: int
+):
+    if project_count > 0:
+        generate_quick_load_file(ql_dependency_path, project_count, dependency_count)
+    # The graph is always recreated, so it's in sync with the quick-load file.
+    with open(ql_dependency_path, "r", encoding="utf-8") as input_file:
+        j_data = json.loads(input_file.read())
+    build_dependency_graph(j_data["dependency_map"], j_data["project_name_to_id"], graph_path)
+
+
+def cmd_dependency_graph_benchmark():
+    exp_utils.load_paths_for_eco()
+
+    project_count = safe_get_argv(key="-s", default=0, data_type=int)
+    dependency_count = safe_get_argv(key="-d", default=10, data_type=int)
+    worker_count = safe_get_argv(key="-t", default=4, data_type=int)
+    query_count = safe_get_argv(key="-q", default=10_000, data_type=int)
+
+    if project_count > 0:
+        output_path = exp_utils.BASE_PATH + "/temp/dependency_graph_benchmark/"
+        safe_makedirs(output_path)
+        ql_dependency_path = output_path + f"{QL_DEPENDENCY_FILE_NAME}.json"
+        graph_path = output_path + f"{QL_DEPENDENCY_FILE_NAME}.csr"
+    else:
+        ql_dependency_path = exp_utils.TRAIN_DATASET_PATH(file_name=QL_DEPENDENCY_FILE_NAME)
+        graph_path = get_dependency_graph_path()
+
+    # This is done in a separate process, so its memory isn't inherited by the variants.
+    context = multiprocessing.get_context("fork")
+    process = context.Process(
+        target=prepare_files,
+        args=(ql_dependency_path, graph_path, project_count, dependency_count),
+    )
+    process.start()
+    process.join()
+
+    print(f"Graph size: {sum(entry.stat().st_size for entry in os.scandir(graph_path)) / 2**20:.1f} MiB, "
+          f"quick-load file size: {os.path.getsize(ql_dependency_path) / 2**20:.1f} MiB.")
+
+    worker_project_names = sample_project_names(graph_path, worker_count, query_count)
+    json_results = timed_variant(
+        "json", load_json, ql_dependency_path, graph_path, worker_project_names)
+    graph_results = timed_variant(
+        "graph", load_graph, ql_dependency_path, graph_path, worker_project_names)
+
+    is_identical = json_results == graph_results
+    print(f"Query results are identical: {is_identical}.")
+
+
+if __name__ == "__main__":
+    cmd_dependency_graph_benchmark()
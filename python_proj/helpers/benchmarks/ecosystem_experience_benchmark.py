@@ -0,0 +1,131 @@
+"""
+Benchmarks the ecosystem experience features using the running per-user
+totals against the original implementation, which iterated through all
+projects a user has been active in on every ``get_feature`` call.
+It simulates a sliding window over synthetic pull requests with a heavy-tailed
+activity distribution; i.e., a few (bot-like) users are active in hundreds of
+projects and submit/comment on most pull requests.
+
+Cmd params:
+-n: number of pull requests.
+-u: number of users.
+-p: number of projects.
+-w: window size in number of pull requests.
+"""
+
+from collections import deque
+from datetime import datetime
+import random
+from typing import Callable
+
+from python_proj.data_preprocessing.sliding_window_features.base import SlidingWindowFeature
+from python_proj.data_preprocessing.sliding_window_features.experience_ledger import ExperienceLedger
+from python_proj.data_preprocessing.sliding_window_features.ecosystem_experience import (
+    EcosystemExperienceSubmitterPullRequestSuccessRate,
+    EcosystemExperienceSubmitterPullRequestSubmissionCount,
+    EcosystemExperienceSubmitterPullRequestCommentCount,
+    EcosystemExperienceSubmitterPullRequestDiscussionParticipationCount,
+    EcosystemExperienceSubmitterIssueSubmissionCount,
+)
+from python_proj.utils.arg_utils import safe_get_argv
+from python_proj.utils.exp_utils import PROJECT_ID_KEY
+
+FEATURE_TYPES = [
+    EcosystemExperienceSubmitterPullRequestSuccessRate,
+    EcosystemExperienceSubmitterPullRequestSubmissionCount,
+    EcosystemExperienceSubmitterPullRequestCommentCount,
+    EcosystemExperienceSubmitterPullRequestDiscussionParticipationCount,
+    EcosystemExperienceSubmitterIssueSubmissionCount,
+]
+
+
+def generate_entries(entry_count: int, user_count: int, project_count: int) -> list[dict]:
+    """
+    Generates pull requests whose submitters and commenters are drawn from a
+    Zipf-like distribution. The number of projects a user is active in grows
+    with their activity, so the most active users touch nearly all projects.
+    """
+    random.seed(0)
+    user_weights = [1 / (rank + 1) for rank in range(user_count)]
+    user_projects = [
+        random.sample(range(project_count), k=min(project_count, 1 + project_count // (rank + 1)))
+        for rank in range(user_count)
+    ]
+
+    def __draw_user() -> int:
+        return random.choices(range(user_count), weights=user_weights)[0]
+
+    entries = []
+    for _ in range(entry_count):
+        user_id = __draw_user()
+        comment_count = random.randint(0, 5)
+        entries.append({
+            "user_data": {"id": user_id},
+            PROJECT_ID_KEY: random.choice(user_projects[user_id]),
+            "merged": random.random() < 0.7,
+            "comments": comment_count,
+            "comments_data": [{"user_data": {"id": __draw_user()}}
+                              for _ in range(comment_count)],
+        })
+    return entries
+
+
+def timed_window(
+    name: str, entries: list[dict], window_size: int,
+    feature_factory: Callable[[], list[SlidingWindowFeature]]
+) -> list[list]:
+    """Slides a window over the entries, calculating the features of each entry."""
+    features = feature_factory()
+    window = deque()
+    results = []
+    start = datetime.now()
+    for entry in entries:
+        if len(window) == window_size:
+            old_entry = window.popleft()
+            for feature in features:
+                feature.remove_entry(old_entry)
+        results.append([feature.get_feature(entry) for feature in features])
+        for feature in features:
+            feature.add_entry(entry)
+        window.append(entry)
+    deltatime = datetime.now() - start
+    print(f"{name}: {deltatime.total_seconds():.3f}s for {len(entries)} entries.")
+    return results
+
+
+def create_loop_features() -> list[SlidingWindowFeature]:
+    ledger = ExperienceLedger()
+    features = [feature_type(ledger) for feature_type in FEATURE_TYPES]
+    for feature in features:
+        feature.uses_running_totals = False
+    return [ledger, *features]
+
+
+def create_total_features() -> list[SlidingWindowFeature]:
+    ledger = ExperienceLedger()
+    features = [feature_type(ledger) for feature_type in FEATURE_TYPES]
+    return [ledger, *features]
+
+
+def run_benchmark(entry_count: int, user_count: int, project_count: int, window_size: int):
+    entries = generate_entries(entry_count, user_count, project_count)
+    print(f"Sliding a window of {window_size} entries over {entry_count} entries "
+          f"by {user_count} users in {project_count} projects.")
+
+    reference = timed_window("project loop", entries, window_size, create_loop_features)
+    running_totals = timed_window("running totals", entries, window_size, create_total_features)
+
+    is_identical = reference == running_totals
+    print(f"Features are identical: {is_identical}.")
+
+
+def cmd_ecosystem_experience_benchmark():
+    entry_count = safe_get_argv(key="-n", default=100_000, data_type=int)
+    user_count = safe_get_argv(key="-u", default=5_000, data_type=int)
+    project_count = safe_get_argv(key="-p", default=1_000, data_type=int)
+    window_size = safe_get_argv(key="-w", default=50_000, data_type=int)
+    run_benchmark(entry_count, user_count, project_count, window_size)
+
+
+if __name__ == "__main__":
+    cmd_ecosystem_experience_benchmark()
@@ -0,0 +1,150 @@
+"""
+Benchmarks the incremental global centrality features (see ``global_centrality``)
+against recomputing PageRank and eigenvector centrality from scratch with ``networkx``.
+It replays the synthetic pull requests of ``temporal_graph_benchmark`` through a
+sliding window, and calculates the features for the submitter of every pull request.
+Periodically, the scores of all nodes are compared to those of ``networkx``.
+
+Cmd params:
+-u: number of users.
+-n: number of pull requests.
+-w: number of pull requests in the sliding window.
+-c: average number of commenters per pull request.
+-s: the scores are compared to ``networkx`` for every s-th pull request.
+-b: the batch size of the incremental features.
+-k: the number of power-iteration sweeps per batch.
+"""
+
+from datetime import datetime
+from itertools import product
+
+import networkx as nx
+import numpy
+
+from python_proj.data_preprocessing.sliding_window_features.collaboration_experience.global_centrality import (
+    build_global_centrality_features,
+    IncrementalGlobalCentrality,
+)
+from python_proj.data_preprocessing.sliding_window_features.collaboration_experience.temporal_graph import (
+    TemporalMultiGraph,
+)
+from python_proj.helpers.benchmarks.temporal_graph_benchmark import (
+    Activity,
+    generate_pull_requests,
+)
+from python_proj.utils.arg_utils import safe_get_argv
+
+
+def update_graph(graph: TemporalMultiGraph, activities: list[Activity], add_entry: bool):
+    for edge_label, sources, targets, timestamp in activities:
+        for source, target in product(sources, targets):
+            if source == target:
+                continue
+            if add_entry:
+                graph.add_edge(source, target, edge_label, timestamp)
+            else:
+                graph.remove_edge(source, target, edge_label)
+
+
+def to_networkx(graph: TemporalMultiGraph, nodes: list[int]) -> nx.DiGraph:
+    """Creates a weighted ``networkx`` graph, like ``CollaborationMatrix`` does."""
+    nx_graph = nx.DiGraph()
+    nx_graph.add_nodes_from(nodes)
+    for node in nodes:
+        for target in graph.successors(node):
+            weight = graph.get_edge_weight(node, target)
+            # Dead edges have no weight.
+            if weight > 0:
+                nx_graph.add_edge(node, target, weight=weight)
+    return nx_graph
+
+
+def calculate_from_scratch(graph: TemporalMultiGraph, nodes: list[int]) -> list[dict[int, float]]:
+    """Calculates the reference scores, which sum to 1."""
+    nx_graph = to_networkx(graph, nodes)
+    page_rank = nx.pagerank(nx_graph, weight="weight", tol=1e-10, max_iter=1000)
+
+    # Eigenvector centrality of the undirected graph, in which both directions are summed.
+    undirected_graph = nx.Graph()
+    undirected_graph.add_nodes_from(nodes)
+    for source, target, weight in nx_graph.edges(data="weight"):
+        previous_weight = undirected_graph.get_edge_data(source, target, {"weight": 0})["weight"]
+        undirected_graph.add_edge(source, target, weight=previous_weight + weight)
+    eigenvector = nx.eigenvector_centrality(undirected_graph, weight="weight", tol=1e-12, max_iter=10_000)
+    eigenvector_sum = sum(eigenvector.values())
+    eigenvector = {node: score / eigenvector_sum for node, score in eigenvector.items()}
+    return [page_rank, eigenvector]
+
+
+def calculate_errors(
+    feature: IncrementalGlobalCentrality, reference: dict[int, float]
+) -> tuple[float, float]:
+    """Returns the mean and max absolute error, relative to the average score."""
+    node_count = len(reference)
+    errors = numpy.array([
+        abs(feature.get_feature({"user_data": {"id": node}}) - score * node_count)
+        for node, score in reference.items()
+    ])
+    return float(errors.mean()), float(errors.max())
+
+
+def cmd_global_centrality_benchmark():
+    user_count = safe_get_argv(key="-u", default=20_000, data_type=int)
+    pull_request_count = safe_get_argv(key="-n", default=100_000, data_type=int)
+    window_size = safe_get_argv(key="-w", default=20_000, data_type=int)
+    commenter_count = safe_get_argv(key="-c", default=3, data_type=int)
+    comparison_step = safe_get_argv(key="-s", default=5_000, data_type=int)
+    batch_size = safe_get_argv(key="-b", default=1000, data_type=int)
+    sweep_count = safe_get_argv(key="-k", default=3, data_type=int)
+
+    pull_requests = generate_pull_requests(user_count, pull_request_count, commenter_count)
+    print(f"Replaying {pull_request_count} pull requests of {user_count} users "
+          f"with a window of {window_size}, {batch_size=}, {sweep_count=}.")
+
+    graph = TemporalMultiGraph()
+    features = build_global_centrality_features(graph, batch_size, sweep_count)
+
+    incremental_time = 0.0
+    scratch_time = 0.0
+    comparison_count = 0
+    errors = {feature.get_name(): [] for feature in features}
+    for index, activities in enumerate(pull_requests):
+        if index >= window_size:
+            update_graph(graph, pull_requests[index - window_size], False)
+
+        start = datetime.now()
+        submitter = activities[0][2][0]
+        for feature in features:
+            feature.get_feature({"user_data": {"id": submitter}})
+        incremental_time += (datetime.now() - start).total_seconds()
+
+        update_graph(graph, activities, True)
+
+        if index < window_size or index % comparison_step != 0:
+            continue
+        # The errors include the lag of (at most) one batch of changes.
+        nodes = [node for node in range(user_count) if graph.has_node(node)]
+        start = datetime.now()
+        references = calculate_from_scratch(graph, nodes)
+        scratch_time += (datetime.now() - start).total_seconds()
+        comparison_count += 1
+        for feature in features:
+            feature.get_feature({"user_data": {"id": submitter}})
+        for feature, reference in zip(features, references):
+            errors[feature.get_name()].append(calculate_errors(feature, reference))
+
+    print(f"incremental: {incremental_time:.3f}s in total, "
+          f"{incremental_time * 1e6 / pull_request_count:.1f}us per pull request.")
+    if comparison_count == 0:
+        return
+    print(f"from scratch: {scratch_time / comparison_count:.3f}s per pull request "
+          f"(i.e., ~{scratch_time / comparison_count * pull_request_count:.0f}s in total).")
+    for feature in features:
+        feature_errors = numpy.array(errors[feature.get_name()])
+        print(f"{feature.get_name()}: {feature.batches} batches, {feature.sweeps} sweeps, "
+              f"mean error {feature_errors[:, 0].mean():.4f}, max error {feature_errors[:, 1].max():.4f} "
+              f"(relative to the average score of 1).")
+
+
+if __name__ == "__main__":
+    cmd_global_centrality_benchmark()
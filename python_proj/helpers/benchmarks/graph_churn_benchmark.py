@@ -0,0 +1,76 @@
+"""
+Benchmarks the batched removal of dead edges and nodes in ``TemporalMultiGraph``
+(see ``collect_garbage``) against removing them immediately (i.e., a maximum of 0
+stale edges). It replays the synthetic pull requests of ``temporal_graph_benchmark``
+through a sliding window, and counts how often edges and nodes are (re)created.
+The submitter's neighbourhood is traversed periodically in the order the centrality
+features use, to check the iteration order is unaffected by the deferred removal.
+
+Cmd params:
+-u: number of users.
+-n: number of pull requests.
+-w: number of pull requests in the sliding window.
+-c: average number of commenters per pull request.
+-s: the submitter's neighbourhood is traversed for every s-th pull request.
+-m: comma-separated maximum numbers of stale edges that are compared to 0.
+"""
+
+from python_proj.data_preprocessing.sliding_window_features.collaboration_experience.temporal_graph import (
+    DEFAULT_MAX_STALE_EDGES,
+    TemporalMultiGraph,
+)
+from python_proj.helpers.benchmarks.temporal_graph_benchmark import (
+    generate_pull_requests,
+    replay,
+    temporal_add_remove_edge,
+)
+from python_proj.utils.arg_utils import safe_get_argv
+
+
+def ordered_traverse(graph: TemporalMultiGraph, node: int) -> int:
+    """Returns a hash of the order in which the (live) two-hop in-neighbourhood is iterated."""
+    visited = []
+    for neighbour, edge_data in graph.predecessors(node).items():
+        if len(edge_data) == 0:
+            continue
+        visited.append(neighbour)
+        for other, other_edge_data in graph.predecessors(neighbour).items():
+            if len(other_edge_data) > 0:
+                visited.append((other, tuple(other_edge_data)))
+    return hash(tuple(visited))
+
+
+def cmd_graph_churn_benchmark():
+    user_count = safe_get_argv(key="-u", default=20_000, data_type=int)
+    pull_request_count = safe_get_argv(key="-n", default=100_000, data_type=int)
+    window_size = safe_get_argv(key="-w", default=20_000, data_type=int)
+    commenter_count = safe_get_argv(key="-c", default=3, data_type=int)
+    traversal_step = safe_get_argv(key="-s", default=100, data_type=int)
+    max_stale_edge_counts = [0] + [
+        int(entry)
+        for entry in safe_get_argv(key="-m", default=f"256,{DEFAULT_MAX_STALE_EDGES},65536").split(",")
+        if entry != ""
+    ]
+
+    pull_requests = generate_pull_requests(user_count, pull_request_count, commenter_count)
+    print(f"Replaying {pull_request_count} pull requests of {user_count} users "
+          f"with a window of {window_size}.")
+
+    reference_outputs = None
+    for max_stale_edges in max_stale_edge_counts:
+        graph = TemporalMultiGraph(max_stale_edges)
+        update_time, _, outputs = replay(
+            graph, temporal_add_remove_edge, ordered_traverse,
+            pull_requests, window_size, traversal_step,
+        )
+        if reference_outputs is None:
+            reference_outputs = outputs
+
+        print(f"{max_stale_edges=}: {update_time:.3f}s updating, "
+              f"{graph.created_edges} edges and {graph.created_nodes} nodes created, "
+              f"{graph.get_stale_edge_count()} stale edges at the end, "
+              f"iteration order identical: {outputs == reference_outputs}.")
+
+
+if __name__ == "__main__":
+    cmd_graph_churn_benchmark()
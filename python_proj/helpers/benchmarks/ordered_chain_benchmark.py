@@ -0,0 +1,111 @@
+"""
+Benchmarks the heap-based ``ordered_chain`` against the original
+implementation, which rebuilt the list of keys and called ``numpy.argmin``
+on every step. It merges synthetic chronological datasets, using both
+``strptime``-parsed keys and pre-parsed integer timestamps.
+
+Cmd params:
+-k: number of merged datasets.
+-n: number of entries per dataset.
+"""
+
+from datetime import datetime, timedelta
+import math
+import random
+from typing import Callable, Iterator, Tuple
+
+import numpy
+
+from python_proj.utils.arg_utils import safe_get_argv
+from python_proj.utils.exp_utils import DATETIME_FORMAT
+from python_proj.utils.util import ordered_chain
+
+
+def argmin_ordered_chain(
+    iterables: list[Iterator], key: Callable
+) -> Iterator[Tuple[int, dict]]:
+    """The original implementation of ``ordered_chain``, used as a reference."""
+
+    current_elements = [next(iterables[idx]) for idx in range(len(iterables))]
+    stop_iterations = 0
+
+    def __key_wrapper(entry):
+        return math.inf if entry is None else key(entry)
+
+    while stop_iterations != len(iterables):
+        current_idx = numpy.argmin([__key_wrapper(ele) for ele in current_elements])
+        yield current_idx, current_elements[current_idx]
+        try:
+            current_elements[current_idx] = next(iterables[current_idx])
+        except StopIteration:
+            stop_iterations += 1
+            current_elements[current_idx] = None
+
+
+def generate_datasets(dataset_count: int, entry_count: int) -> list[list[dict]]:
+    """Generates sorted synthetic datasets with ``closed_at`` timestamps."""
+    random.seed(0)
+    start = datetime(2015, 1, 1)
+    datasets = []
+    for _ in range(dataset_count):
+        offsets = sorted(random.randint(0, 10**8) for _ in range(entry_count))
+        dataset = []
+        for offset in offsets:
+            timestamp = start + timedelta(seconds=offset)
+            dataset.append({
+                "closed_at": timestamp.strftime(DATETIME_FORMAT),
+                "__ts_closed_at": int(timestamp.timestamp()),
+            })
+        datasets.append(dataset)
+    return datasets
+
+
+def strptime_key(entry: dict) -> float:
+    return datetime.strptime(entry["closed_at"], DATETIME_FORMAT).timestamp()
+
+
+def timed_merge(name: str, merge: Callable[[], Iterator]) -> list:
+    start = datetime.now()
+    merged = [idx for idx, _ in merge()]
+    deltatime = datetime.now() - start
+    print(f"{name}: {deltatime.total_seconds():.3f}s for {len(merged)} entries.")
+    return merged
+
+
+def run_benchmark(dataset_count: int, entry_count: int):
+    datasets = generate_datasets(dataset_count, entry_count)
+    print(f"Merging {dataset_count} datasets with {entry_count} entries each.")
+
+    reference = timed_merge(
+        "argmin (strptime key)",
+        lambda: argmin_ordered_chain([iter(d) for d in datasets], strptime_key),
+    )
+    heap_strptime = timed_merge(
+        "heap (strptime key)",
+        lambda: ordered_chain([iter(d) for d in datasets], strptime_key),
+    )
+    heap_int = timed_merge(
+        "heap (int timestamp key)",
+        lambda: ordered_chain(
+            [iter(d) for d in datasets], key=lambda e: e["__ts_closed_at"]
+        ),
+    )
+    heap_presorted = timed_merge(
+        "heap (pre-parsed int timestamps)",
+        lambda: ordered_chain(
+            [(e["__ts_closed_at"] for e in d) for d in datasets]
+        ),
+    )
+
+    is_identical = reference == heap_strptime == heap_int == heap_presorted
+    print(f"Merge orders are identical: {is_identical}.")
+
+
+def cmd_ordered_chain_benchmark():
+    dataset_count = safe_get_argv(key="-k", default=8, data_type=int)
+    entry_count = safe_get_argv(key="-n", default=25_000, data_type=int)
+    run_benchmark(dataset_count, entry_count)
+
+
+if __name__ == "__main__":
+    cmd_ordered_chain_benchmark()
@@ -0,0 +1,178 @@
+"""
+Benchmarks the time-respecting betweenness engine (see ``temporal_betweenness``).
+First, it verifies it on small random temporal graphs against a brute-force
+reference, which enumerates all foremost paths between each pair of nodes.
+Then, it fills a sliding window with the synthetic pull requests of
+``temporal_graph_benchmark``, and calculates the betweenness of users with
+various degrees (i.e., realistic neighbourhood sizes), comparing it to the
+``networkx`` prototype in ``betweenness_centrality`` for the smaller ones, and
+the sampled betweenness to the exact one for the larger ones.
+
+Cmd params:
+-u: number of users.
+-w: number of pull requests in the sliding window.
+-c: average number of commenters per pull request.
+-r: the radius of the ego networks.
+-p: the maximum ego network size for which the prototype is timed.
+-m: the maximum number of sampled sources.
+-x: the maximum number of sources for which the exact betweenness is calculated.
+"""
+
+from datetime import datetime
+from itertools import product
+import random
+
+from python_proj.data_preprocessing.sliding_window_features.betweenness_centrality import (
+    TimedGraph,
+    neighborhood_betweenness_centrality,
+)
+from python_proj.data_preprocessing.sliding_window_features.collaboration_experience.temporal_betweenness import (
+    EgoNetwork,
+    build_ego_network,
+    calculate_temporal_betweenness,
+    get_ego_nodes,
+    get_reaching_nodes,
+)
+from python_proj.data_preprocessing.sliding_window_features.collaboration_experience.temporal_graph import (
+    TemporalMultiGraph,
+)
+from python_proj.helpers.benchmarks.temporal_graph_benchmark import generate_pull_requests
+from python_proj.utils.arg_utils import safe_get_argv
+
+DEGREE_QUANTILES = [0.5, 0.9, 0.99, 0.999, 1.0]
+
+
+def reference_betweenness(ego_network: EgoNetwork, focal: int) -> float:
+    """
+    Calculates the earliest arrival times by relaxing all edges until nothing changes,
+    and enumerates every foremost path (i.e., one that arrives at each of its nodes as
+    early as possible) between each pair of nodes to count those through the focal node.
+    """
+    node_count = len(ego_network)
+    betweenness = 0.0
+    for source in range(node_count):
+        if source == focal:
+            continue
+        arrivals = [float("inf")] * node_count
+        arrivals[source] = float("-inf")
+        is_changed = True
+        while is_changed:
+            is_changed = False
+            for node, out_edges in enumerate(ego_network):
+                for neighbour, timestamps in out_edges:
+                    later = [timestamp for timestamp in timestamps if timestamp > arrivals[node]]
+                    if len(later) > 0 and min(later) < arrivals[neighbour]:
+                        arrivals[neighbour] = min(later)
+                        is_changed = True
+
+        def __enumerate_paths(path: list[int]):
+            yield path
+            node = path[-1]
+            for neighbour, timestamps in ego_network[node]:
+                later = [timestamp for timestamp in timestamps if timestamp > arrivals[node]]
+                if len(later) > 0 and min(later) == arrivals[neighbour]:
+                    yield from __enumerate_paths([*path, neighbour])
+
+        path_counts = [0] * node_count
+        focal_path_counts = [0] * node_count
+        for path in __enumerate_paths([source]):
+            path_counts[path[-1]] += 1
+            if focal in path[1:-1]:
+                focal_path_counts[path[-1]] += 1
+        for target in range(node_count):
+            if target not in (source, focal) and path_counts[target] > 0:
+                betweenness += focal_path_counts[target] / path_counts[target]
+    return betweenness
+
+
+def generate_ego_network(node_count: int, edge_count: int) -> EgoNetwork:
+    """Generates a random temporal graph with few distinct timestamps, so there are ties."""
+    edges = {}
+    for _ in range(edge_count):
+        source, target = random.sample(range(node_count), k=2)
+        edges.setdefault((source, target), []).append(random.randrange(3 * node_count))
+    ego_network = [[] for _ in range(node_count)]
+    for (source, target), timestamps in edges.items():
+        ego_network[source].append((target, sorted(timestamps)))
+    return ego_network
+
+
+def verify_engine() -> bool:
+    is_identical = True
+    for node_count, edge_count in product([3, 5, 8, 12], [2, 10, 30]):
+        for _ in range(20):
+            ego_network = generate_ego_network(node_count, edge_count)
+            for focal in range(node_count):
+                engine = calculate_temporal_betweenness(ego_network, focal)
+                reference = reference_betweenness(ego_network, focal)
+                is_identical &= abs(engine - reference) < 1e-9
+    return is_identical
+
+
+def fill_window(user_count: int, window_size: int, commenter_count: int) -> tuple[TemporalMultiGraph, TimedGraph]:
+    """Adds the edges of one window of pull requests to both graph implementations."""
+    graph = TemporalMultiGraph()
+    timed_graph = TimedGraph()
+    for activities in generate_pull_requests(user_count, window_size, commenter_count):
+        for edge_label, sources, targets, timestamp in activities:
+            for source, target in product(sources, targets):
+                if source == target:
+                    continue
+                graph.add_edge(source, target, edge_label, timestamp)
+                timed_graph.add_edge(source, target, timestamp=timestamp)
+    return graph, timed_graph
+
+
+def cmd_temporal_betweenness_benchmark():
+    user_count = safe_get_argv(key="-u", default=20_000, data_type=int)
+    window_size = safe_get_argv(key="-w", default=20_000, data_type=int)
+    commenter_count = safe_get_argv(key="-c", default=3, data_type=int)
+    radius = safe_get_argv(key="-r", default=1, data_type=int)
+    prototype_limit = safe_get_argv(key="-p", default=40, data_type=int)
+    max_sources = safe_get_argv(key="-m", default=100, data_type=int)
+    exact_limit = safe_get_argv(key="-x", default=1000, data_type=int)
+
+    random.seed(0)
+    print(f"The engine is identical to the reference: {verify_engine()}.")
+
+    graph, timed_graph = fill_window(user_count, window_size, commenter_count)
+    nodes = sorted(
+        (node for node in range(user_count) if graph.has_node(node)),
+        key=lambda node: len(graph.successors(node)) + len(graph.predecessors(node)),
+    )
+    edge_types = {"PRIntegratorToSubmitter", "PRCommenterToSubmitter", "PRCommenterToCommenter"}
+    print(f"Filled a window of {window_size} pull requests with {len(nodes)} users, {radius=}.")
+
+    for quantile in DEGREE_QUANTILES:
+        node = nodes[min(int(quantile * len(nodes)), len(nodes) - 1)]
+        ego_nodes = get_ego_nodes(graph, node, radius)
+        ego_network = build_ego_network(graph, ego_nodes, edge_types)
+        sources = get_reaching_nodes(ego_network, 0)
+        ego_edge_count = sum(len(out_edges) for out_edges in ego_network)
+        message = f"{quantile=}: {len(ego_nodes)} nodes, {ego_edge_count} edges, {len(sources)} sources"
+
+        betweenness = None
+        if len(sources) <= exact_limit:
+            start = datetime.now()
+            betweenness = calculate_temporal_betweenness(ego_network, 0, sources)
+            message += f", engine {(datetime.now() - start).total_seconds():.4f}s"
+
+        if len(sources) > max_sources:
+            start = datetime.now()
+            sampled_sources = random.Random(node).sample(sources, max_sources)
+            estimate = calculate_temporal_betweenness(ego_network, 0, sampled_sources)
+            estimate *= len(sources) / max_sources
+            message += f", sampled {(datetime.now() - start).total_seconds():.4f}s"
+            if betweenness is not None and betweenness > 0:
+                message += f" (relative error {abs(estimate - betweenness) / betweenness:.1%})"
+
+        if len(ego_nodes) <= prototype_limit:
+            start = datetime.now()
+            neighborhood_betweenness_centrality(timed_graph, node, radius)
+            prototype_time = (datetime.now() - start).total_seconds()
+            message += f", prototype {prototype_time:.4f}s"
+        print(f"{message}.")
+
+
+if __name__ == "__main__":
+    cmd_temporal_betweenness_benchmark()
@@ -0,0 +1,196 @@
+"""
+Benchmarks the ``TemporalMultiGraph`` against the original ``networkx.DiGraph``
+implementation of the SNA features' edge bookkeeping. It replays a synthetic
+stream of pull requests through a sliding window: each pull request adds edges
+from its integrator and commenters to its submitter, and between its commenters,
+and removes those of the pull request that left the window. Both graphs are
+traversed like ``FirstOrderDegreeCentralityV2`` does, to check they're equivalent.
+
+Cmd params:
+-u: number of users.
+-n: number of pull requests.
+-w: number of pull requests in the sliding window.
+-c: average number of commenters per pull request.
+-s: the submitter's neighbourhood is traversed for every s-th pull request.
+"""
+
+from collections import deque
+from datetime import datetime
+from itertools import product
+import random
+import tracemalloc
+from typing import Callable
+
+import networkx as nx
+
+from python_proj.data_preprocessing.sliding_window_features.collaboration_experience.temporal_graph import (
+    TemporalMultiGraph,
+)
+from python_proj.utils.arg_utils import safe_get_argv
+
+# An edge type, its sources, its targets, and its timestamp.
+Activity = tuple[str, list[int], list[int], int]
+
+
+def generate_pull_requests(
+    user_count: int, pull_request_count: int, commenter_count: int
+) -> list[list[Activity]]:
+    """Generates chronological pull requests with heavy-tailed user activity."""
+    random.seed(0)
+    users = list(range(user_count))
+    # Zipf-distributed; i.e., a few users are involved in a lot of pull requests.
+    weights = [1 / (rank + 1) for rank in range(user_count)]
+
+    pull_requests = []
+    for timestamp in range(pull_request_count):
+        commenters = random.choices(users, weights, k=int(random.expovariate(1 / commenter_count)))
+        submitter, integrator = random.choices(users, weights, k=2)
+        pull_requests.append([
+            ("PRIntegratorToSubmitter", [integrator], [submitter], timestamp),
+            ("PRCommenterToSubmitter", commenters, [submitter], timestamp),
+            ("PRCommenterToCommenter", commenters, commenters, timestamp),
+        ])
+    return pull_requests
+
+
+def networkx_add_remove_edge(
+    graph: nx.DiGraph, edge_label: str, source: int, target: int, timestamp: int, add_entry: bool
+):
+    """The original implementation of ``SNAFeature._add_remove_edge``, used as a reference."""
+    for node in (source, target):
+        if not graph.has_node(node):
+            graph.add_node(node)
+    if source == target:
+        return
+    edge_data = graph.get_edge_data(source, target, default={})
+    if edge_label not in edge_data:
+        edge_data[edge_label] = deque()
+    edge_timestamps: deque = edge_data[edge_label]
+    if add_entry:
+        edge_timestamps.append(timestamp)
+    elif len(edge_timestamps) == 1:
+        del edge_data[edge_label]
+    else:
+        edge_timestamps.popleft()
+    if len(edge_data) > 0:
+        graph.add_edge(source, target, **edge_data)
+    else:
+        graph.remove_edge(source, target)
+    if nx.is_isolate(graph, source):
+        graph.remove_node(source)
+    if nx.is_isolate(graph, target):
+        graph.remove_node(target)
+
+
+def temporal_add_remove_edge(
+    graph: TemporalMultiGraph, edge_label: str, source: int, target: int, timestamp: int, add_entry: bool
+):
+    if source == target:
+        return
+    if add_entry:
+        graph.add_edge(source, target, edge_label, timestamp)
+    else:
+        graph.remove_edge(source, target, edge_label)
+
+
+def networkx_traverse(graph: nx.DiGraph, node: int) -> int:
+    """Counts the timestamps of the second-order in-edges like the centrality features."""
+    if not graph.has_node(node):
+        return 0
+    count = 0
+    for neighbour, _ in graph.in_edges(nbunch=[node]):
+        for other, _ in graph.in_edges(neighbour):
+            if other == node:
+                continue
+            for timestamps in graph.get_edge_data(other, neighbour).values():
+                count += len(timestamps)
+    return count
+
+
+def temporal_traverse(graph: TemporalMultiGraph, node: int) -> int:
+    count = 0
+    for neighbour, neighbour_edge_data in graph.predecessors(node).items():
+        # Dead edges (which have no edge data) are skipped, like the centrality features do.
+        if len(neighbour_edge_data) == 0:
+            continue
+        for other, edge_data in graph.predecessors(neighbour).items():
+            if other == node:
+                continue
+            for timestamps in edge_data.values():
+                count += len(timestamps)
+    return count
+
+
+def replay(
+    graph, add_remove_edge: Callable, traverse: Callable,
+    pull_requests: list[list[Activity]], window_size: int, traversal_step: int,
+) -> tuple[float, float, list[int]]:
+    """Replays the pull requests, returning the update time, traversal time, and traversal outputs."""
+    update_time = 0.0
+    traversal_time = 0.0
+    outputs = []
+
+    def __update(activities: list[Activity], add_entry: bool):
+        for edge_label, sources, targets, timestamp in activities:
+            for source, target in product(sources, targets):
+                add_remove_edge(graph, edge_label, source, target, timestamp, add_entry)
+
+    for index, activities in enumerate(pull_requests):
+        start = datetime.now()
+        __update(activities, True)
+        if index >= window_size:
+            __update(pull_requests[index - window_size], False)
+        update_time += (datetime.now() - start).total_seconds()
+
+        if index % traversal_step != 0:
+            continue
+        start = datetime.now()
+        submitter = activities[0][2][0]
+        outputs.append(traverse(graph, submitter))
+        traversal_time += (datetime.now() - start).total_seconds()
+
+    return update_time, traversal_time, outputs
+
+
+def measure_memory(create_graph: Callable, add_remove_edge: Callable, pull_requests: list[list[Activity]]) -> int:
+    """Returns the size of a graph containing all pull requests in bytes."""
+    tracemalloc.start()
+    graph = create_graph()
+    for activities in pull_requests:
+        for edge_label, sources, targets, timestamp in activities:
+            for source, target in product(sources, targets):
+                add_remove_edge(graph, edge_label, source, target, timestamp, True)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size
+
+
+def cmd_temporal_graph_benchmark():
+    user_count = safe_get_argv(key="-u", default=20_000, data_type=int)
+    pull_request_count = safe_get_argv(key="-n", default=100_000, data_type=int)
+    window_size = safe_get_argv(key="-w", default=20_000, data_type=int)
+    commenter_count = safe_get_argv(key="-c", default=3, data_type=int)
+    traversal_step = safe_get_argv(key="-s", default=100, data_type=int)
+
+    pull_requests = generate_pull_requests(user_count, pull_request_count, commenter_count)
+    print(f"Replaying {pull_request_count} pull requests of {user_count} users "
+          f"with a window of {window_size}.")
+
+    variants = [
+        ("networkx", nx.DiGraph, networkx_add_remove_edge, networkx_traverse),
+        ("temporal", TemporalMultiGraph, temporal_add_remove_edge, temporal_traverse),
+    ]
+    outputs = []
+    for name, create_graph, add_remove_edge, traverse in variants:
+        update_time, traversal_time, variant_outputs = replay(
+            create_graph(), add_remove_edge, traverse, pull_requests, window_size, traversal_step)
+        window_memory = measure_memory(create_graph, add_remove_edge, pull_requests[:window_size])
+        print(f"{name}: {update_time:.3f}s updating, {traversal_time:.3f}s traversing, "
+              f"{window_memory / 2**20:.1f} MiB per window.")
+        outputs.append(variant_outputs)
+
+    print(f"Traversal outputs are identical: {outputs[0] == outputs[1]}.")
+
+
+if __name__ == "__main__":
+    cmd_temporal_graph_benchmark()
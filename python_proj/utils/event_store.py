@@ -0,0 +1,527 @@
+"""
+Implements a binary, columnar alternative to the chronological JSON-lines
+datasets (i.e., the output of ``data_sorter``). Parsing the 11GB JSON files
+is the largest cost of a sliding window run, so this format stores only the
+fields that are read by the sliding window features in typed ``numpy``
+columns, which can be memory-mapped and decoded in bulk.
+
+An event store is a directory containing a ``meta.json`` file and a number
+of ``.npy`` column files. Entries are yielded as (reduced) dictionaries
+with the same structure as the original JSON entries, so they can be
+consumed by anything that consumes the chronological datasets.
+
+Use ``convert_to_event_store`` (or ``cmd_create_event_store``) to create one
+from a sorted JSON-lines dataset.
+"""
+
+from array import array
+import json
+import os
+import shutil
+from typing import Any, Iterable, Iterator
+
+import numpy
+
+from python_proj.utils.util import safe_makedirs, parse_iso_timestamp
+
+EVENT_STORE_EXT = ".evs"
+EVENT_STORE_VERSION = 2
+
+# Sentinel values for missing fields.
+MISSING_INT = numpy.iinfo(numpy.int64).min
+MISSING_REF = -1
+
+# The ``array`` type codes used to buffer the values of each column type.
+_ARRAY_TYPECODES = {
+    numpy.int64: "q",
+    numpy.int32: "i",
+    numpy.int8: "b",
+    numpy.uint8: "B",
+    numpy.bool_: "b",
+}
+
+
+def get_event_store_path(dataset_path: str) -> str:
+    """Returns the event store path corresponding to a chronological dataset path."""
+    base_path, ext = os.path.splitext(dataset_path)
+    if ext == EVENT_STORE_EXT:
+        return dataset_path
+    return base_path + EVENT_STORE_EXT
+
+
+class _Column:
+    """
+    Helper to build a fixed-width column. Its values are written to a temporary
+    file in chunks, so the column is never kept in memory as a whole.
+    """
+
+    def __init__(
+        self, directory: str, name: str, dtype: type, chunk_size: int = 1 << 16
+    ) -> None:
+        self._path = os.path.join(directory, f"{name}.npy")
+        self._dtype = numpy.dtype(dtype)
+        self._chunk_size = chunk_size
+        self._buffer = array(_ARRAY_TYPECODES[dtype])
+        self._part_file = open(f"{self._path}.part", "wb")
+        self._flushed_count = 0
+
+    def __len__(self) -> int:
+        return self._flushed_count + len(self._buffer)
+
+    def append(self, value: int):
+        self._buffer.append(value)
+        if len(self._buffer) >= self._chunk_size:
+            self._flush()
+
+    def extend(self, values: Iterable[int]):
+        self._buffer.extend(values)
+        if len(self._buffer) >= self._chunk_size:
+            self._flush()
+
+    def _flush(self):
+        values = numpy.frombuffer(self._buffer, dtype=self._buffer.typecode)
+        values.astype(self._dtype, copy=False).tofile(self._part_file)
+        self._flushed_count += len(self._buffer)
+        # The buffer can't be cleared while it's exported to ``numpy``.
+        self._buffer = array(self._buffer.typecode)
+
+    def save(self):
+        """Writes the column to its ``.npy`` file and removes the temporary file."""
+        self._flush()
+        self._part_file.close()
+        header = {
+            "descr": numpy.lib.format.dtype_to_descr(self._dtype),
+            "fortran_order": False,
+            "shape": (self._flushed_count,),
+        }
+        # NOTE: The length is only known now, so the data is copied behind the header.
+        with open(self._path, "wb") as output_file:
+            numpy.lib.format.write_array_header_1_0(output_file, header)
+            with open(self._part_file.name, "rb") as part_file:
+                shutil.copyfileobj(part_file, output_file)
+        os.remove(self._part_file.name)
+
+
+class _StringColumn:
+    """Helper to build a variable-length string column (i.e., a heap with offsets)."""
+
+    def __init__(self, directory: str, name: str) -> None:
+        self._data = _Column(directory, f"{name}_data", numpy.uint8)
+        self._offsets = _Column(directory, f"{name}_offsets", numpy.int64)
+        self._is_null = _Column(directory, f"{name}_isnull", numpy.bool_)
+        self._offsets.append(0)
+
+    def append(self, value: "str | None"):
+        if value is not None:
+            self._data.extend(value.encode("utf-8"))
+        self._offsets.append(len(self._data))
+        self._is_null.append(value is None)
+
+    def save(self):
+        self._data.save()
+        self._offsets.save()
+        self._is_null.save()
+
+
+# The fixed-width columns of an event store and their types.
+_COLUMN_DTYPES = {
+    "id": numpy.int64,
+    "number": numpy.int64,
+    "ts_closed_at": numpy.int64,
+    "ts_created_at": numpy.int64,
+    "project": numpy.int32,
+    "data_type": numpy.int8,
+    "user": numpy.int32,
+    "merged": numpy.int8,
+    "merged_by": numpy.int32,
+    "closed_by": numpy.int32,
+    "comments": numpy.int64,
+    "commits": numpy.int64,
+    "has_comments_data": numpy.bool_,
+    "body_marker": numpy.int8,
+    "comment_offsets": numpy.int64,
+    "comment_users": numpy.int32,
+}
+
+
+class EventStoreWriter:
+    """
+    Writes chronological issue / pull request entries to an event store.
+    Columns are written to the file system in chunks as entries are added,
+    and are finalized when closed.
+    """
+
+    def __init__(self, output_path: str) -> None:
+        self.output_path = output_path
+        safe_makedirs(output_path)
+
+        self._projects: dict[str, int] = {}
+        self._data_types: dict[str, int] = {}
+        self._users: dict[tuple, int] = {}
+
+        self._user_ids = _Column(output_path, "user_ids", numpy.int64)
+        self._user_logins = _StringColumn(output_path, "user_login")
+        self._user_names = _StringColumn(output_path, "user_name")
+        self._user_emails = _StringColumn(output_path, "user_email")
+
+        self._columns: dict[str, _Column] = {
+            name: _Column(output_path, name, dtype)
+            for name, dtype in _COLUMN_DTYPES.items()
+        }
+        # The original timestamp is only used in the output, and isn't always 20 characters.
+        self._closed_at = _StringColumn(output_path, "closed_at")
+        self._titles = _StringColumn(output_path, "title")
+        self._columns["comment_offsets"].append(0)
+
+    def __enter__(self) -> "EventStoreWriter":
+        return self
+
+    def __exit__(self, type, value, traceback) -> None:
+        if type is None:
+            self.close()
+
+    def _get_project_ref(self, source_path: str) -> int:
+        if source_path not in self._projects:
+            self._projects[source_path] = len(self._projects)
+        return self._projects[source_path]
+
+    def _get_data_type_ref(self, data_type: "str | None") -> int:
+        if data_type is None:
+            return MISSING_REF
+        if data_type not in self._data_types:
+            self._data_types[data_type] = len(self._data_types)
+        return self._data_types[data_type]
+
+    def _get_user_ref(self, user_data: "dict | None") -> int:
+        if user_data is None:
+            return MISSING_REF
+        user_key = (
+            user_data["id"],
+            user_data.get("login"),
+            user_data.get("name"),
+            user_data.get("email"),
+        )
+        if user_key not in self._users:
+            self._users[user_key] = len(self._users)
+            self._user_ids.append(user_key[0])
+            self._user_logins.append(user_key[1])
+            self._user_names.append(user_key[2])
+            self._user_emails.append(user_key[3])
+        return self._users[user_key]
+
+    @staticmethod
+    def _get_int(entry: dict, key: str) -> int:
+        value = entry.get(key)
+        return MISSING_INT if value is None else value
+
+    def write(self, entry: dict):
+        """Adds an entry to the store."""
+        columns = self._columns
+
+        columns["id"].append(entry["id"])
+        columns["number"].append(self._get_int(entry, "number"))
+
+        closed_at = entry["closed_at"]
+        self._closed_at.append(closed_at)
+        ts_closed_at = entry.get("__ts_closed_at")
+        if ts_closed_at is None:
+            ts_closed_at = parse_iso_timestamp(closed_at)
+        columns["ts_closed_at"].append(ts_closed_at)
+
+        created_at = entry.get("created_at")
+        ts_created_at = entry.get("__ts_created_at")
+        if ts_created_at is None and created_at is not None:
+            ts_created_at = parse_iso_timestamp(created_at)
+        columns["ts_created_at"].append(
+            MISSING_INT if ts_created_at is None else ts_created_at
+        )
+
+        columns["project"].append(self._get_project_ref(entry["__source_path"]))
+        columns["data_type"].append(self._get_data_type_ref(entry.get("__data_type")))
+        columns["user"].append(self._get_user_ref(entry.get("user_data")))
+
+        merged = entry.get("merged")
+        columns["merged"].append(-1 if merged is None else int(merged))
+        columns["merged_by"].append(self._get_user_ref(entry.get("merged_by_data")))
+        columns["closed_by"].append(self._get_user_ref(entry.get("closed_by")))
+
+        columns["comments"].append(self._get_int(entry, "comments"))
+        columns["commits"].append(self._get_int(entry, "commits"))
+
+        # Only the commenters are relevant.
+        has_comments_data = "comments_data" in entry
+        columns["has_comments_data"].append(has_comments_data)
+        comment_users = columns["comment_users"]
+        if has_comments_data:
+            for comment in entry["comments_data"]:
+                comment_users.append(self._get_user_ref(comment["user_data"]))
+        columns["comment_offsets"].append(len(comment_users))
+
+        # HACK: The description is only used to test whether it references
+        # an issue, so only that is stored rather than the (huge) body itself.
+        if "body" not in entry:
+            body_marker = -1
+        else:
+            body = entry["body"]
+            body_marker = int(isinstance(body, str) and "#" in body)
+        columns["body_marker"].append(body_marker)
+        self._titles.append(entry.get("title"))
+
+    def close(self):
+        """Finalizes all columns and writes the metadata."""
+        columns = self._columns
+        row_count = len(columns["id"])
+        for column in columns.values():
+            column.save()
+        self._closed_at.save()
+        self._titles.save()
+
+        user_count = len(self._user_ids)
+        self._user_ids.save()
+        self._user_logins.save()
+        self._user_names.save()
+        self._user_emails.save()
+
+        projects = sorted(self._projects.keys(), key=self._projects.get)
+        data_types = sorted(self._data_types.keys(), key=self._data_types.get)
+        meta = {
+            "format": "event-store",
+            "version": EVENT_STORE_VERSION,
+            "row_count": row_count,
+            "user_count": user_count,
+            "projects": projects,
+            "data_types": data_types,
+        }
+        with open(
+            os.path.join(self.output_path, "meta.json"), "w+", encoding="utf-8"
+        ) as meta_file:
+            meta_file.write(json.dumps(meta))
+
+
+class EventStoreReader:
+    """
+    Reads entries from an event store. Columns are memory-mapped and
+    decoded in batches, so a full pass is mostly bound by I/O.
+    """
+
+    def __init__(self, store_path: str) -> None:
+        self.store_path = store_path
+
+        with open(
+            os.path.join(store_path, "meta.json"), "r", encoding="utf-8"
+        ) as meta_file:
+            meta = json.loads(meta_file.read())
+        if meta.get("version") != EVENT_STORE_VERSION:
+            raise ValueError(
+                f'Unsupported event store version {meta.get("version")} in "{store_path}". '
+                "Recreate it using `create_event_store`."
+            )
+
+        self.row_count: int = meta["row_count"]
+        self._projects: list[str] = meta["projects"]
+        self._data_types: list[str] = meta["data_types"]
+
+        # User data is decoded lazily as it's shared between many entries.
+        self._user_ids = self._load("user_ids").tolist()
+        self._user_logins = self._load_strings("user_login")
+        self._user_names = self._load_strings("user_name")
+        self._user_emails = self._load_strings("user_email")
+        self._user_cache: list["dict | None"] = [None] * meta["user_count"]
+
+    def get_closed_at_timestamps(self) -> numpy.ndarray:
+        """Returns the (memory-mapped) column of epoch ``closed_at`` timestamps."""
+        return self._load("ts_closed_at")
+
+    def _load(self, name: str) -> numpy.ndarray:
+        return numpy.load(
+            os.path.join(self.store_path, f"{name}.npy"), mmap_mode="r"
+        )
+
+    def _load_strings(
+        self, name: str
+    ) -> "tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]":
+        return (
+            self._load(f"{name}_data"),
+            self._load(f"{name}_offsets"),
+            self._load(f"{name}_isnull"),
+        )
+
+    @staticmethod
+    def _decode_strings(
+        column: tuple, start: int, end: int
+    ) -> "list[str | None]":
+        """Decodes the strings in the range ``[start, end)`` of a string column."""
+        data, offsets, is_null = column
+        offsets = offsets[start : end + 1].tolist()
+        is_null = is_null[start:end].tolist()
+        if len(offsets) == 0:
+            return []
+        base = offsets[0]
+        heap = data[base : offsets[-1]].tobytes()
+        return [
+            None
+            if is_null[index]
+            else heap[offsets[index] - base : offsets[index + 1] - base].decode("utf-8")
+            for index in range(end - start)
+        ]
+
+    def _get_user(self, user_ref: int) -> "dict | None":
+        """
+        Returns the user data of the user. The returned dictionary
+        is shared between entries, so it should not be modified.
+        """
+        if user_ref == MISSING_REF:
+            return None
+        user = self._user_cache[user_ref]
+        if user is None:
+            user = {"id": self._user_ids[user_ref]}
+            login = self._decode_strings(self._user_logins, user_ref, user_ref + 1)[0]
+            if login is not None:
+                user["login"] = login
+            name = self._decode_strings(self._user_names, user_ref, user_ref + 1)[0]
+            if name is not None:
+                user["name"] = name
+            email = self._decode_strings(self._user_emails, user_ref, user_ref + 1)[0]
+            if email is not None:
+                user["email"] = email
+            self._user_cache[user_ref] = user
+        return user
+
+    def iterate(
+        self, start: int = 0, end: "int | None" = None, batch_size: int = 50_000
+    ) -> Iterator[dict]:
+        """Yields the entries in the range ``[start, end)``."""
+        if end is None:
+            end = self.row_count
+
+        columns = {
+            name: self._load(name)
+            for name in [
+                "id",
+                "number",
+                "ts_closed_at",
+                "ts_created_at",
+                "project",
+                "data_type",
+                "user",
+                "merged",
+                "merged_by",
+                "closed_by",
+                "comments",
+                "commits",
+                "has_comments_data",
+                "body_marker",
+                "comment_offsets",
+                "comment_users",
+            ]
+        }
+        closed_at = self._load_strings("closed_at")
+        titles = self._load_strings("title")
+        get_user = self._get_user
+        projects = self._projects
+        data_types = self._data_types
+
+        for batch_start in range(start, end, batch_size):
+            batch_end = min(batch_start + batch_size, end)
+
+            # Converts the batch to python types in bulk.
+            batch: dict[str, list[Any]] = {
+                name: column[batch_start:batch_end].tolist()
+                for name, column in columns.items()
+                if name not in ("comment_offsets", "comment_users")
+            }
+            comment_offsets = columns["comment_offsets"][
+                batch_start : batch_end + 1
+            ].tolist()
+            comment_users = columns["comment_users"][
+                comment_offsets[0] : comment_offsets[-1]
+            ].tolist()
+            batch_closed_at = self._decode_strings(closed_at, batch_start, batch_end)
+            batch_titles = self._decode_strings(titles, batch_start, batch_end)
+
+            for index in range(batch_end - batch_start):
+                entry = {
+                    "id": batch["id"][index],
+                    "closed_at": batch_closed_at[index],
+                    "__ts_closed_at": batch["ts_closed_at"][index],
+                    "__source_path": projects[batch["project"][index]],
+                }
+
+                data_type = batch["data_type"][index]
+                if data_type != MISSING_REF:
+                    entry["__data_type"] = data_types[data_type]
+
+                number = batch["number"][index]
+                if number != MISSING_INT:
+                    entry["number"] = number
+                ts_created_at = batch["ts_created_at"][index]
+                if ts_created_at != MISSING_INT:
+                    entry["__ts_created_at"] = ts_created_at
+
+                user = get_user(batch["user"][index])
+                if user is not None:
+                    entry["user_data"] = user
+
+                merged = batch["merged"][index]
+                if merged != -1:
+                    entry["merged"] = merged == 1
+                merged_by = get_user(batch["merged_by"][index])
+                if merged_by is not None:
+                    entry["merged_by_data"] = merged_by
+                closed_by = get_user(batch["closed_by"][index])
+                if closed_by is not None:
+                    entry["closed_by"] = closed_by
+
+                comments = batch["comments"][index]
+                if comments != MISSING_INT:
+                    entry["comments"] = comments
+                commits = batch["commits"][index]
+                if commits != MISSING_INT:
+                    entry["commits"] = commits
+
+                if batch["has_comments_data"][index]:
+                    comment_start = comment_offsets[index] - comment_offsets[0]
+                    comment_end = comment_offsets[index + 1] - comment_offsets[0]
+                    entry["comments_data"] = [
+                        {"user_data": get_user(user_ref)}
+                        for user_ref in comment_users[comment_start:comment_end]
+                    ]
+
+                title = batch_titles[index]
+                if title is not None:
+                    entry["title"] = title
+                body_marker = batch["body_marker"][index]
+                if body_marker != -1:
+                    entry["body"] = "#" if body_marker == 1 else ""
+
+                yield entry
+
+    def __iter__(self) -> Iterator[dict]:
+        return self.iterate()
+
+
+def iterate_through_event_store(
+    store_path: str, start: int = 0, end: "int | None" = None
+) -> Iterator[dict]:
+    """Iterates through the entries of an event store."""
+    reader = EventStoreReader(store_path)
+    return reader.iterate(start, end)
+
+
+def convert_to_event_store(
+    input_path: str, output_path: str, print_progress_interval: int = 50000
+) -> str:
+    """
+    Converts a chronological JSON-lines dataset to an event store.
+    Returns the path of the event store.
+    """
+
+    print(f'Converting "{input_path}" to event store "{output_path}".')
+    with EventStoreWriter(output_path) as writer:
+        with open(input_path, "r", encoding="utf-8") as input_file:
+            for index, line in enumerate(input_file):
+                if index % print_progress_interval == 0:
+                    print(f"Converting {index + 1}st entry.")
+                writer.write(json.loads(line))
+    print(f'Stored event store at "{output_path}".')
+    return output_path
@@ -6,15 +6,28 @@ from functools import partial
 from datetime import datetime
 from os import getenv
 import json
-from typing import Iterator
+from typing import Iterator, Callable
 from numbers import Number
 import math
 
 
 from python_proj.utils.arg_utils import safe_get_argv
-from python_proj.utils.util import OpenMany, ordered_chain
+from python_proj.utils.util import OpenMany, ordered_chain, apply_projection, parse_iso_timestamp
+from python_proj.utils.event_store import (
+    get_event_store_path,
+    iterate_through_event_store,
+)
 
 SOURCE_PATH_KEY = "__source_path"
+PROJECT_ID_KEY = "__project_id"
+
+# Keys of the pre-parsed (epoch) timestamps, and the fields they're parsed from.
+TS_CLOSED_AT_KEY = "__ts_closed_at"
+TS_CREATED_AT_KEY = "__ts_created_at"
+TIMESTAMP_FIELDS = {
+    "closed_at": TS_CLOSED_AT_KEY,
+    "created_at": TS_CREATED_AT_KEY,
+}
 
 # Default argv keys.
 ECO_KEY = "-e"
@@ -217,12 +230,70 @@ def iterate_through_chronological_data(data_type=None,
                 raise
 
 
+def get_chronological_dataset_paths(dataset_names: list[str],
+                                    data_sources: list[str] | None = None,
+                                    use_event_store: bool = False) -> list[str]:
+    """
+    Returns the paths of the chronological datasets, or those of
+    their event stores when ``use_event_store`` is set.
+    """
+    if data_sources is None:
+        r_dataset_names = [CHRONOLOGICAL_DATASET_PATH(file_name=dataset_name)
+                           for dataset_name in dataset_names]
+    else:
+        r_dataset_names = [CHRONOLOGICAL_DATASET_PATH(file_name=dataset_name, data_type=data_source)
+                           for (dataset_name, data_source) in zip(dataset_names, data_sources)]
+
+    if use_event_store:
+        r_dataset_names = [get_event_store_path(dataset_name)
+                           for dataset_name in r_dataset_names]
+
+    return r_dataset_names
+
+
+def iterate_through_chronological_iterators(dataset_iterators: list[Iterator[dict]],
+                                            dataset_types: list[str],
+                                            print_progress_interval: int = 50000,
+                                            add_project_ids: bool = False) \
+        -> Iterator[dict]:
+    """
+    Merges the (chronological) dataset iterators into one chronological
+    iterator, setting the ``__data_type`` of each entry (and optionally its
+    project id; see ``iterate_through_multiple_chronological_datasets``).
+    """
+
+    def __key(entry: dict) -> Number:
+        return entry[TS_CLOSED_AT_KEY]
+
+    for index, (file_idx, entry) in enumerate(ordered_chain(dataset_iterators, key=__key)):
+        if index % print_progress_interval == 0:
+            print(
+                f'Iterating through {index + 1}st chronological data entry.')
+        dataset_type = dataset_types[file_idx]
+        entry["__data_type"] = dataset_type
+        if add_project_ids:
+            add_project_id(entry)
+        yield entry
+
+
 def iterate_through_multiple_chronological_datasets(dataset_names: list[str],
                                                     dataset_types: list[str] | None = None,
                                                     data_sources: list[str] | None = None,
-                                                    print_progress_interval: int = 50000) \
+                                                    print_progress_interval: int = 50000,
+                                                    use_event_store: bool = False,
+                                                    projection: dict | None = None,
+                                                    add_project_ids: bool = False) \
         -> Iterator[dict]:
-    "Assumes partial paths have been loaded up to the specific dataset names."
+    """
+    Assumes partial paths have been loaded up to the specific dataset names.
+    When ``use_event_store`` is set, the event stores corresponding to the
+    datasets are used instead of the JSON-lines files (see ``event_store``).
+    When a ``projection`` is given (see ``util.build_projection``), all fields
+    that are not part of it are stripped when an entry is loaded; it must
+    contain ``TS_CLOSED_AT_KEY``. When ``add_project_ids`` is set, entries
+    are given a project id (see ``add_project_id``); as these ids are local
+    to the process, they shouldn't be written to any output file.
+    """
 
     if dataset_types is None:
         dataset_types = [''] * len(dataset_names)
@@ -232,43 +303,40 @@ def iterate_through_multiple_chronological_datasets(dataset_names: list[str],
             or (data_sources and len(dataset_names) != len(data_sources)):
         raise ValueError("input data has different lengths.")
 
-    dt_format = "%Y-%m-%dT%H:%M:%SZ"
-
-    def __key(entry: dict) -> Number:
-        closed_at = entry["closed_at"]
-        dt_closed_at = datetime.strptime(closed_at, dt_format)
-        return dt_closed_at.timestamp()
-
     def __file_iterator(file) -> Iterator[dict]:
         for line in file:
             try:
                 stripped_line = line.strip()
-                yield json.loads(stripped_line)
+                entry = json.loads(stripped_line)
+                # Legacy datasets don't contain the pre-parsed timestamps.
+                add_timestamp_fields(entry)
+                yield apply_projection(entry, projection)
             except json.JSONDecodeError:
                 print(f'JSONDecodeError with {file=}')
                 print(f'JSONDecodeError with {stripped_line=}')
                 raise
 
-    if data_sources is None:
-        r_dataset_names = [CHRONOLOGICAL_DATASET_PATH(file_name=dataset_name)
-                           for dataset_name in dataset_names]
-    else:
-        r_dataset_names = [CHRONOLOGICAL_DATASET_PATH(file_name=dataset_name, data_type=data_source)
-                           for (dataset_name, data_source) in zip(dataset_names, data_sources)]
+    r_dataset_names = get_chronological_dataset_paths(
+        dataset_names, data_sources, use_event_store)
 
     print(
         f'Iterating through {len(r_dataset_names)} datasets: {r_dataset_names}')
 
+    def __iterate(dataset_iterators: list[Iterator[dict]]) -> Iterator[dict]:
+        return iterate_through_chronological_iterators(
+            dataset_iterators, dataset_types, print_progress_interval, add_project_ids)
+
+    if use_event_store:
+        dataset_iterators = [(apply_projection(entry, projection)
+                              for entry in iterate_through_event_store(dataset_name))
+                             for dataset_name in r_dataset_names]
+        yield from __iterate(dataset_iterators)
+        return
+
     with OpenMany(r_dataset_names, mode="r") as dataset_files:
         dataset_iterators = [__file_iterator(dataset_file)
                              for dataset_file in dataset_files]
-        for index, (file_idx, entry) in enumerate(ordered_chain(dataset_iterators, key=__key)):
-            if index % print_progress_interval == 0:
-                print(
-                    f'Iterating through {index + 1}st chronological data entry.')
-            dataset_type = dataset_types[file_idx]
-            entry["__data_type"] = dataset_type
-            yield entry
+        yield from __iterate(dataset_iterators)
 
 
 def iterate_through_multiple_chronological_issue_pr_datasets(
@@ -276,7 +344,10 @@ def iterate_through_multiple_chronological_issue_pr_datasets(
     pull_request_dataset_names: list[str],
     issue_key: str = "issues",
     pr_key: str = "pull-requests",
-    print_progress_interval: int = 50000
+    print_progress_interval: int = 50000,
+    use_event_store: bool = False,
+    projection: dict | None = None,
+    add_project_ids: bool = False
 ):
     """Iterates through various PR and issue datasets setting the correct datasource keys."""
     data_source = [issue_key] * len(issue_dataset_names)
@@ -286,13 +357,54 @@ def iterate_through_multiple_chronological_issue_pr_datasets(
         dataset_names,
         dataset_types=data_source,
         data_sources=data_source,
-        print_progress_interval=print_progress_interval)
+        print_progress_interval=print_progress_interval,
+        use_event_store=use_event_store,
+        projection=projection,
+        add_project_ids=add_project_ids)
+
+
+# All keys ``get_integrator_key`` can resolve to.
+INTEGRATOR_KEYS = ["merged_by_data", "closed_by"]
+
+
+def add_timestamp_fields(entry: dict) -> dict:
+    """
+    Adds the pre-parsed epoch timestamps (see ``TIMESTAMP_FIELDS``) to the
+    entry if they're not there yet, so the string timestamps don't have
+    to be parsed over and over again.
+    """
+    for key, ts_key in TIMESTAMP_FIELDS.items():
+        if ts_key not in entry and entry.get(key) is not None:
+            entry[ts_key] = parse_iso_timestamp(entry[key])
+    return entry
 
 
 def get_integrator_key(entry):
     return "merged_by_data" if entry["merged"] else "closed_by"
 
 
+def get_fields_of_nested_key(nested_key: list[str | Callable[[dict], str]]) -> list[list[str]]:
+    """
+    Returns the fields (as nested keys) that are read when resolving the nested key.
+    ``get_integrator_key`` is expanded into all keys it can resolve to, and the field it reads.
+    """
+    fields = [[]]
+    reads_merged = False
+    for key_element in nested_key:
+        if key_element is get_integrator_key:
+            fields = [[*field, integrator_key]
+                      for field in fields
+                      for integrator_key in INTEGRATOR_KEYS]
+            reads_merged = True
+        elif isinstance(key_element, str):
+            fields = [[*field, key_element] for field in fields]
+        else:
+            raise ValueError(f"Can't determine the fields read by {key_element}.")
+    if reads_merged:
+        fields.append(["merged"])
+    return fields
+
+
 def get_owner_and_repo_from_source_path(source_path) -> tuple[str, str]:
     """
     Helper method for string magic. 
@@ -307,6 +419,44 @@ def get_repository_name_from_source_path(source_path) -> str:
     owner, repo = get_owner_and_repo_from_source_path(source_path)
     return f'{owner}/{repo}'
 
+
+# Interned project names. The ids are only meaningful
+# inside the process that assigned them.
+_PROJECT_NAME_TO_ID: dict[str, int] = {}
+_PROJECT_ID_TO_NAME: list[str] = []
+_SOURCE_PATH_TO_PROJECT_ID: dict[str, int] = {}
+
+
+def get_project_id(project_name: str) -> int:
+    """Returns the dense integer id of an ``owner/repo`` project name, creating one if necessary."""
+    if project_name not in _PROJECT_NAME_TO_ID:
+        _PROJECT_NAME_TO_ID[project_name] = len(_PROJECT_ID_TO_NAME)
+        _PROJECT_ID_TO_NAME.append(project_name)
+    return _PROJECT_NAME_TO_ID[project_name]
+
+
+def find_project_id(project_name: str) -> int | None:
+    """Returns the id of the project name if it's interned; unlike ``get_project_id``, it doesn't create one."""
+    return _PROJECT_NAME_TO_ID.get(project_name)
+
+
+def get_project_name(project_id: int) -> str:
+    """Returns the ``owner/repo`` project name corresponding to the project id."""
+    return _PROJECT_ID_TO_NAME[project_id]
+
+
+def add_project_id(entry: dict) -> dict:
+    """
+    Sets ``PROJECT_ID_KEY`` to the id of the project the entry belongs to,
+    so features don't have to derive the project name from the source path.
+    """
+    source_path = entry[SOURCE_PATH_KEY]
+    if source_path not in _SOURCE_PATH_TO_PROJECT_ID:
+        project_name = get_repository_name_from_source_path(source_path)
+        _SOURCE_PATH_TO_PROJECT_ID[source_path] = get_project_id(project_name)
+    entry[PROJECT_ID_KEY] = _SOURCE_PATH_TO_PROJECT_ID[source_path]
+    return entry
+
 def log_transform(number: Number) -> Number:
     """Applies log-tranfsorm on the number."""
     return math.log10(1 + number)
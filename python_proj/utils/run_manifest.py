@@ -0,0 +1,128 @@
+"""
+Implements the bookkeeping that makes long multiprocessed runs resumable.
+A run is identified by a key, which is a hash of its input files and
+parameters. All of its intermediary outputs are stored in a run directory,
+together with a manifest that records which tasks are complete, and the
+hashes of their outputs. When a run is restarted with the same inputs and
+parameters, tasks whose outputs are recorded and still verify are skipped.
+
+Workers record the tasks they completed in separate ``.complete`` files
+(as they can't safely write to one file concurrently), which are folded into
+the manifest by the main process using ``load_completed_tasks``.
+"""
+
+import hashlib
+import json
+import os
+from typing import Any
+
+from python_proj.utils.util import safe_makedirs
+
+MANIFEST_FILE_NAME = "manifest.json"
+COMPLETE_RECORD_EXT = ".complete"
+
+
+def _get_input_fingerprint(input_path: str) -> list:
+    """
+    Returns the path, size and modification time of the input. The content
+    itself isn't hashed, as the inputs can be many gigabytes in size.
+    Directories (i.e., event stores) are fingerprinted file by file, and
+    inputs that don't exist are fingerprinted as such.
+    """
+    if not os.path.exists(input_path):
+        return [input_path, None]
+    if os.path.isdir(input_path):
+        return [
+            _get_input_fingerprint(os.path.join(input_path, file_name))
+            for file_name in sorted(os.listdir(input_path))
+        ]
+    stat = os.stat(input_path)
+    return [input_path, stat.st_size, stat.st_mtime_ns]
+
+
+def get_run_key(input_paths: list[str], parameters: dict[str, Any]) -> str:
+    """Returns the key of a run with the given input files and (JSON-serializable) parameters."""
+    run_description = {
+        "inputs": [_get_input_fingerprint(input_path) for input_path in input_paths],
+        "parameters": parameters,
+    }
+    run_description = json.dumps(run_description, sort_keys=True)
+    return hashlib.sha1(run_description.encode("utf-8")).hexdigest()
+
+
+def get_file_hash(file_path: str) -> str:
+    """Returns the MD5 hash of a file's content."""
+    file_hash = hashlib.md5()
+    with open(file_path, "rb") as input_file:
+        while block := input_file.read(2**20):
+            file_hash.update(block)
+    return file_hash.hexdigest()
+
+
+def write_json_atomically(output_path: str, data: Any):
+    """Writes the data to a temporary file first, so it's never left half-written."""
+    temp_path = output_path + ".tmp"
+    with open(temp_path, "w+", encoding="utf-8") as output_file:
+        output_file.write(json.dumps(data, indent=2))
+    os.replace(temp_path, output_path)
+
+
+def record_completed_task(run_path: str, task_name: str, output_file_names: list[str]):
+    """
+    Records that a task is complete, together with the hashes of its outputs.
+    The output files are relative to the run directory, and should be complete
+    before this is called.
+    """
+    output_hashes = {
+        file_name: get_file_hash(os.path.join(run_path, file_name))
+        for file_name in output_file_names
+    }
+    record_path = os.path.join(run_path, task_name + COMPLETE_RECORD_EXT)
+    write_json_atomically(record_path, output_hashes)
+
+
+def _is_verified(run_path: str, output_hashes: dict[str, str]) -> bool:
+    """Returns true if all output files exist and still have their recorded hash."""
+    for file_name, output_hash in output_hashes.items():
+        output_path = os.path.join(run_path, file_name)
+        if not os.path.exists(output_path) or get_file_hash(output_path) != output_hash:
+            return False
+    return True
+
+
+def load_completed_tasks(
+    run_path: str, run_key: str, parameters: dict[str, Any]
+) -> set[str]:
+    """
+    Loads the manifest of the run (creating one if it doesn't exist), folds the
+    completion records of the workers into it, and returns the names of the
+    tasks whose outputs are verified. Tasks whose outputs don't verify are
+    removed from the manifest, so they are processed again.
+    """
+
+    safe_makedirs(run_path)
+    manifest_path = os.path.join(run_path, MANIFEST_FILE_NAME)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r", encoding="utf-8") as manifest_file:
+            manifest = json.loads(manifest_file.read())
+    else:
+        manifest = {"run_key": run_key, "parameters": parameters, "tasks": {}}
+
+    # Folds the workers' records into the manifest.
+    for file_name in os.listdir(run_path):
+        if not file_name.endswith(COMPLETE_RECORD_EXT):
+            continue
+        record_path = os.path.join(run_path, file_name)
+        with open(record_path, "r", encoding="utf-8") as record_file:
+            task_name = file_name[: -len(COMPLETE_RECORD_EXT)]
+            manifest["tasks"][task_name] = json.loads(record_file.read())
+        os.remove(record_path)
+
+    manifest["tasks"] = {
+        task_name: output_hashes
+        for task_name, output_hashes in manifest["tasks"].items()
+        if _is_verified(run_path, output_hashes)
+    }
+    write_json_atomically(manifest_path, manifest)
+
+    return set(manifest["tasks"].keys())
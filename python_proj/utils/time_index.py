@@ -0,0 +1,164 @@
+"""
+Implements a sidecar time index for chronological datasets. For each entry
+in a sorted JSON-lines dataset, it stores its epoch ``closed_at`` timestamp
+and its byte offset in the file, so time ranges of the dataset can be read
+in place (i.e., without having to copy them to separate chunk files).
+Event stores don't need a sidecar file, as their rows can be addressed
+directly; for those, the "offsets" are row numbers.
+
+The index is created by ``data_sorter``, or lazily when it's first used.
+"""
+
+import json
+import os
+from typing import Iterator
+
+import numpy
+
+import python_proj.utils.exp_utils as exp_utils
+from python_proj.utils.event_store import EventStoreReader, iterate_through_event_store
+from python_proj.utils.util import parse_iso_timestamp
+
+TIME_INDEX_EXT = ".tidx.npz"
+
+# A range of entries in a dataset: (dataset path, start offset, end offset).
+DatasetRange = tuple[str, int, int]
+
+
+def get_time_index_path(dataset_path: str) -> str:
+    """Returns the path of the sidecar time index of a chronological dataset."""
+    base_path, _ = os.path.splitext(dataset_path)
+    return base_path + TIME_INDEX_EXT
+
+
+def build_time_index(dataset_path: str) -> "tuple[numpy.ndarray, numpy.ndarray]":
+    """
+    Creates the time index of a JSON-lines dataset and stores it next to it.
+    Returns the timestamps of all entries, and their offsets, which has one
+    extra element at the end: the size of the file.
+    """
+
+    print(f'Creating time index for "{dataset_path}".')
+    timestamps = []
+    offsets = []
+    offset = 0
+    with open(dataset_path, "rb") as dataset_file:
+        for line in dataset_file:
+            offsets.append(offset)
+            offset += len(line)
+            entry = json.loads(line)
+            timestamp = entry.get(exp_utils.TS_CLOSED_AT_KEY)
+            if timestamp is None:
+                timestamp = parse_iso_timestamp(entry["closed_at"])
+            timestamps.append(timestamp)
+    offsets.append(offset)
+
+    timestamps = numpy.array(timestamps, dtype=numpy.int64)
+    offsets = numpy.array(offsets, dtype=numpy.int64)
+    if numpy.any(timestamps[1:] < timestamps[:-1]):
+        raise ValueError(f'Dataset "{dataset_path}" is not sorted chronologically.')
+
+    index_path = get_time_index_path(dataset_path)
+    numpy.savez(index_path, timestamps=timestamps, offsets=offsets)
+    print(f'Stored time index at "{index_path}".')
+    return timestamps, offsets
+
+
+def load_time_index(dataset_path: str) -> "tuple[numpy.ndarray, numpy.ndarray]":
+    """
+    Loads the time index of a dataset (see ``build_time_index``).
+    It's (re)created if it doesn't exist or is older than the dataset.
+    """
+
+    if os.path.isdir(dataset_path):
+        timestamps = EventStoreReader(dataset_path).get_closed_at_timestamps()
+        offsets = numpy.arange(len(timestamps) + 1, dtype=numpy.int64)
+        return timestamps, offsets
+
+    index_path = get_time_index_path(dataset_path)
+    if not os.path.exists(index_path) \
+            or os.path.getmtime(index_path) < os.path.getmtime(dataset_path):
+        return build_time_index(dataset_path)
+
+    with numpy.load(index_path) as index:
+        return index["timestamps"], index["offsets"]
+
+
+def get_chunk_starts(
+    dataset_paths: list[str], window_size_in_seconds: float
+) -> list[int]:
+    """
+    Returns the first timestamp of each chunk that spans (at most) the window size,
+    using the same rule as iterating through the merged datasets would: a new chunk
+    starts with the first entry that lies more than the window size after the
+    first entry of the current chunk.
+    """
+
+    all_timestamps = numpy.sort(
+        numpy.concatenate(
+            [load_time_index(dataset_path)[0] for dataset_path in dataset_paths]
+        )
+    )
+    chunk_starts = []
+    position = 0
+    while position < len(all_timestamps):
+        chunk_start = int(all_timestamps[position])
+        chunk_starts.append(chunk_start)
+        position = numpy.searchsorted(
+            all_timestamps, chunk_start + window_size_in_seconds, side="right"
+        )
+    return chunk_starts
+
+
+def create_data_ranges(
+    dataset_paths: list[str], boundaries: list[int]
+) -> list[list[DatasetRange]]:
+    """
+    Splits the datasets at the given (sorted) timestamps, and returns the ranges from
+    each boundary to the next one; the last one extends to the end of the datasets.
+    An entry belongs to the range that starts at or before its timestamp, and entries
+    before the first boundary are skipped. Each element has one range per dataset.
+    """
+
+    ranges = [[] for _ in boundaries]
+    for dataset_path in dataset_paths:
+        timestamps, offsets = load_time_index(dataset_path)
+        positions = numpy.searchsorted(timestamps, boundaries, side="left").tolist()
+        positions.append(len(timestamps))
+        for index, dataset_ranges in enumerate(ranges):
+            start = int(offsets[positions[index]])
+            end = int(offsets[positions[index + 1]])
+            dataset_ranges.append((dataset_path, start, end))
+    return ranges
+
+
+def create_data_chunks(
+    dataset_paths: list[str], window_size_in_seconds: float
+) -> list[list[DatasetRange]]:
+    """
+    Splits the datasets into chunks that span (at most) the window size
+    (see ``get_chunk_starts``). Each chunk has one range per dataset.
+    """
+    chunk_starts = get_chunk_starts(dataset_paths, window_size_in_seconds)
+    return create_data_ranges(dataset_paths, chunk_starts)
+
+
+def iterate_through_dataset_range(
+    dataset_path: str, start_offset: int, end_offset: int
+) -> Iterator[dict]:
+    """Iterates through the entries of a dataset in the range ``[start_offset, end_offset)``."""
+
+    if os.path.isdir(dataset_path):
+        yield from iterate_through_event_store(dataset_path, start_offset, end_offset)
+        return
+
+    with open(dataset_path, "rb") as dataset_file:
+        dataset_file.seek(start_offset)
+        offset = start_offset
+        while offset < end_offset:
+            line = dataset_file.readline()
+            offset += len(line)
+            entry = json.loads(line)
+            # Legacy datasets don't contain the pre-parsed timestamps.
+            exp_utils.add_timestamp_fields(entry)
+            yield entry
@@ -4,7 +4,8 @@ Implements general utility functions.
 
 # TODO: Remove this and replace all of it with `wmutils`.
 
-from datetime import datetime
+from datetime import datetime, timezone
+import heapq
 import io
 import json
 import math
@@ -24,7 +25,6 @@ from typing import (
 import random
 
 import matplotlib.pyplot as plt
-import numpy
 import regex as re
 
 
@@ -116,6 +116,43 @@ def resolve_callables_in_list(
         yield entry
 
 
+def build_projection(nested_keys: Iterator[List[str]]) -> dict:
+    """
+    Combines nested keys into a projection tree, which maps each key to
+    its own projection tree. A key that maps to ``None`` is kept entirely.
+    """
+
+    projection = {}
+    for nested_key in nested_keys:
+        current = projection
+        for key_element in nested_key[:-1]:
+            if key_element in current and current[key_element] is None:
+                break
+            current = current.setdefault(key_element, {})
+        else:
+            current[nested_key[-1]] = None
+    return projection
+
+
+def apply_projection(obj: Any, projection: "dict | None") -> Any:
+    """
+    Strips all fields that are not part of the projection (see ``build_projection``).
+    Like ``better_get_nested_many``, lists are projected element-wise.
+    """
+
+    if projection is None:
+        return obj
+    if isinstance(obj, list):
+        return [apply_projection(element, projection) for element in obj]
+    if not isinstance(obj, dict):
+        return obj
+    return {
+        key: apply_projection(obj[key], inner_projection)
+        for key, inner_projection in projection.items()
+        if key in obj
+    }
+
+
 def safe_index(list: List, entry: object) -> int:
     try:
         return list.index(entry)
@@ -162,32 +199,45 @@ T = TypeVar("T")
 
 
 def ordered_chain(
-    iterables: List[Iterator[T]], key: Callable[[T, T], Number]
+    iterables: List[Iterator[T]], key: "Callable[[T], Number] | None" = None
 ) -> Iterator[Tuple[int, T]]:
     """
     Iterates through multiple generators in a chained fashion,
     iterating through them in an ordered fashion. Assumes the
     individual generators are sorted already.
 
+    It's a k-way merge using a heap of the head elements, so the
+    key is calculated only once per element. Ties are resolved
+    in favour of the iterable with the lowest index.
+
     :param list[Generator[T]] iterables: The lists that are being chained.
     :param Callable[[T], Number] key: Method that is used for ordering
-    iterable elements.
+    iterable elements. If ``None``, the elements themselves are compared,
+    which is useful for pre-parsed (e.g., integer) timestamps.
+    :returns: Tuples of ``(iterable index, element)``.
     """
 
-    current_elements = [next(iterables[idx]) for idx in range(len(iterables))]
-    stop_iterations = 0
-
-    def __key_wrapper(entry):
-        return math.inf if entry is None else key(entry)
-
-    while stop_iterations != len(iterables):
-        current_idx = numpy.argmin([__key_wrapper(ele) for ele in current_elements])
-        yield current_idx, current_elements[current_idx]
-        try:
-            current_elements[current_idx] = next(iterables[current_idx])
-        except StopIteration:
-            stop_iterations += 1
-            current_elements[current_idx] = None
+    iterators = [iter(iterable) for iterable in iterables]
+
+    # Heap entries are (key, index, element); as the index is unique,
+    # the elements themselves are never compared.
+    heap = []
+    for idx, iterator in enumerate(iterators):
+        for element in iterator:
+            heap.append((element if key is None else key(element), idx, element))
+            break
+    heapq.heapify(heap)
+
+    while heap:
+        _, current_idx, current_element = heap[0]
+        yield current_idx, current_element
+        for element in iterators[current_idx]:
+            heapq.heapreplace(
+                heap, (element if key is None else key(element), current_idx, element)
+            )
+            break
+        else:
+            heapq.heappop(heap)
 
 
 _KT = TypeVar("_KT")
@@ -269,6 +319,57 @@ class SafeDict(dict, Generic[_KT, _VT]):
             super().__setitem__(__key, __value)
 
 
+class CounterDict(dict):
+    """
+    Dictionary of (nested) integer counters; e.g., ``counts.add(user, project, delta=1)``.
+    Unlike ``SafeDict``, reads never add entries, and counters are removed when
+    they reach zero (as are nested dictionaries when they become empty), so it
+    only stores the non-zero counts. Nested dictionaries are plain ``dict`` objects
+    that should be treated as read-only.
+    """
+
+    def add(self, *keys: Any, delta: int = 1):
+        """Adds ``delta`` to the counter of the (nested) keys."""
+        parents = []
+        mapping = self
+        for key in keys[:-1]:
+            child = mapping.get(key)
+            if child is None:
+                child = mapping[key] = {}
+            parents.append((mapping, key))
+            mapping = child
+
+        count = mapping.get(keys[-1], 0) + delta
+        if count != 0:
+            mapping[keys[-1]] = count
+            return
+
+        # Removes the counter and the nested dictionaries that became empty.
+        mapping.pop(keys[-1], None)
+        for parent, key in reversed(parents):
+            if parent[key]:
+                break
+            del parent[key]
+
+    def get_count(self, *keys: Any, default: int = 0) -> int:
+        """Returns the counter of the (nested) keys, or the default if there is none."""
+        mapping = self
+        for key in keys[:-1]:
+            mapping = mapping.get(key)
+            if mapping is None:
+                return default
+        return mapping.get(keys[-1], default)
+
+    def get_counts(self, *keys: Any) -> dict:
+        """Returns the (read-only) nested dictionary of the keys, which is empty if there is none."""
+        mapping = self
+        for key in keys:
+            mapping = mapping.get(key)
+            if mapping is None:
+                return {}
+        return mapping
+
+
 def safe_save_fig(output_path):
     """Helper method to safe figures in a potentially non-existent directory."""
     dir_name = os.path.dirname(output_path)
@@ -452,6 +553,43 @@ def iterate_through_files_in_nested_folders(
             yield f"{folder}/{file}"
 
 
+def parse_iso_timestamp(timestamp: str) -> int:
+    """
+    Parses an ISO-8601 UTC timestamp (e.g., ``2020-01-12T13:37:00Z``, the format
+    used by GitHub) into seconds since epoch. It's several times quicker than
+    ``datetime.strptime``. Other ISO-8601 variants fall back on ``datetime.fromisoformat``;
+    timestamps without a timezone are considered to be UTC.
+    """
+
+    if len(timestamp) == 20 and timestamp[19] == "Z":
+        year = int(timestamp[0:4])
+        month = int(timestamp[5:7])
+        day = int(timestamp[8:10])
+        # Days since epoch using the "days from civil" algorithm,
+        # which considers years to start in March.
+        if month <= 2:
+            year -= 1
+            month += 9
+        else:
+            month -= 3
+        era = year // 400
+        year_of_era = year - era * 400
+        day_of_year = (153 * month + 2) // 5 + day - 1
+        day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+        days = era * 146097 + day_of_era - 719468
+        return (
+            days * 86400
+            + int(timestamp[11:13]) * 3600
+            + int(timestamp[14:16]) * 60
+            + int(timestamp[17:19])
+        )
+
+    dt_timestamp = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    if dt_timestamp.tzinfo is None:
+        dt_timestamp = dt_timestamp.replace(tzinfo=timezone.utc)
+    return int(dt_timestamp.timestamp())
+
+
 def lies_outside_timewindow(
     timestamp: str, start: datetime, end: datetime, time_format: str
 ) -> bool:
@@ -0,0 +1,9 @@
+"""
+Some modules load the GitHub tokens when they're imported (e.g., ``retrieve_pull_requests``),
+which the tests don't use, so placeholders are set unless they're configured already.
+"""
+
+import os
+
+for token_index in range(1, 4):
+    os.environ.setdefault(f"GITHUB_TOKEN_{token_index}", "unused")
@@ -0,0 +1,34 @@
+"""
+Tests that ``data_sorter`` creates the time index of datasets sorted by closing date.
+"""
+
+from functools import partial
+import json
+from os import path
+
+from python_proj.data_preprocessing.data_sorter import sort_data
+from python_proj.utils.time_index import get_time_index_path, load_time_index
+
+
+def test_sort_data_creates_time_index(tmp_path):
+    entries = [
+        {"id": 2, "closed_at": "2020-01-02T10:00:00Z"},
+        {"id": 1, "closed_at": "2020-01-01T10:00:00Z"},
+        {"id": 3, "closed_at": "2020-01-02T09:00:00Z"},
+    ]
+    with open(tmp_path / "owner--repo.json", "w") as entries_file:
+        json.dump(entries, entries_file)
+    filter_path = tmp_path / "filter.txt"
+    filter_path.write_text("owner/repo\n")
+    input_data_path = partial(str(tmp_path / "{owner}--{repo}.json").format)
+    output_path = str(tmp_path / "sorted.json")
+
+    sort_data(str(filter_path), input_data_path, ["closed_at"],
+              output_path, str(tmp_path / "{bucket}.dat"), -1)
+
+    assert path.exists(get_time_index_path(output_path))
+    timestamps, offsets = load_time_index(output_path)
+    assert len(timestamps) == 3
+    assert offsets[-1] == path.getsize(output_path)
+    with open(output_path, "r") as output_file:
+        assert [json.loads(line)["id"] for line in output_file] == [1, 3, 2]
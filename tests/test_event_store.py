@@ -0,0 +1,46 @@
+"""
+Tests that entries written to an event store are read back unchanged.
+"""
+
+from python_proj.utils.event_store import EventStoreWriter, iterate_through_event_store
+
+
+def test_event_store_keeps_timestamps_of_any_length(tmp_path):
+    entries = [
+        {
+            "id": 1,
+            "number": 10,
+            "closed_at": "2020-01-01T10:00:00Z",
+            "__ts_closed_at": 1577872800,
+            "__ts_created_at": 1577786400,
+            "__source_path": "owner/repo",
+            "user_data": {"id": 5, "login": "submitter"},
+            "merged": True,
+            "comments_data": [{"user_data": {"id": 6}}, {"user_data": {"id": 5, "login": "submitter"}}],
+        },
+        {
+            "id": 2,
+            "closed_at": "2020-01-01T10:00:00.123+00:00",
+            "__ts_closed_at": 1577872800,
+            "__source_path": "owner/other-repo",
+            "title": "Fixes #1",
+        },
+    ]
+    store_path = str(tmp_path / "dataset.evs")
+    with EventStoreWriter(store_path) as writer:
+        for entry in entries:
+            writer.write(entry)
+
+    stored_entries = list(iterate_through_event_store(store_path))
+
+    assert [entry["closed_at"] for entry in stored_entries] == [
+        "2020-01-01T10:00:00Z",
+        "2020-01-01T10:00:00.123+00:00",
+    ]
+    assert stored_entries[0]["__ts_created_at"] == 1577786400
+    assert "__ts_created_at" not in stored_entries[1]
+    assert [comment["user_data"] for comment in stored_entries[0]["comments_data"]] == [
+        {"id": 6},
+        {"id": 5, "login": "submitter"},
+    ]
+    assert stored_entries[1]["title"] == "Fixes #1"
@@ -0,0 +1,47 @@
+"""
+Tests that the intra-project and ecosystem second-order degree centrality
+attribute each connecting edge to the project it was created in.
+"""
+
+from python_proj.data_preprocessing.sliding_window_features.collaboration_experience.intra_eco_centrality import (
+    build_intra_eco_centrality_features,
+)
+from python_proj.utils.exp_utils import (
+    PROJECT_ID_KEY,
+    SOURCE_PATH_KEY,
+    TS_CLOSED_AT_KEY,
+)
+
+
+def create_pull_request(submitter_id: int, integrator_id: int, project_id: int, timestamp: int) -> dict:
+    return {
+        "user_data": {"id": submitter_id},
+        "merged": True,
+        "merged_by_data": {"id": integrator_id},
+        "comments": 0,
+        "comments_data": [],
+        PROJECT_ID_KEY: project_id,
+        SOURCE_PATH_KEY: f"project-{project_id}",
+        TS_CLOSED_AT_KEY: timestamp,
+    }
+
+
+def test_edges_closed_in_the_same_second_keep_their_projects():
+    pr_graph, _, [centrality] = build_intra_eco_centrality_features()
+    entries = [
+        # The integrator's experience edge.
+        create_pull_request(submitter_id=2, integrator_id=5, project_id=1, timestamp=100),
+        # Two connecting edges between the same users, closed in the same second.
+        create_pull_request(submitter_id=4, integrator_id=2, project_id=1, timestamp=200),
+        create_pull_request(submitter_id=4, integrator_id=2, project_id=2, timestamp=200),
+    ]
+    for entry in entries:
+        for feature in pr_graph:
+            feature.add_entry(entry)
+
+    new_entry = create_pull_request(submitter_id=4, integrator_id=3, project_id=1, timestamp=300)
+    outputs = dict(zip(centrality.get_name(), centrality.get_feature(new_entry)))
+
+    edge_name = "PRIntegratorToSubmitterV2.PRIntegratorToSubmitterV2-In"
+    assert outputs[f"IntraProjectSecondOrderInDegreeCentrality({edge_name})"] == 1
+    assert outputs[f"EcosystemSecondOrderInDegreeCentrality({edge_name})"] == 1
@@ -0,0 +1,27 @@
+"""
+Tests that run keys change with every input of a run.
+"""
+
+import os
+
+from python_proj.utils.run_manifest import get_run_key
+
+
+def test_run_key_changes_with_auxiliary_inputs(tmp_path):
+    dataset_path = tmp_path / "sorted.json"
+    dataset_path.write_text("{}\n")
+    bot_list_path = tmp_path / "bots.csv"
+    input_paths = [str(dataset_path), str(bot_list_path)]
+
+    # Inputs that don't exist (yet) are part of the key as well.
+    missing_key = get_run_key(input_paths, {})
+
+    bot_list_path.write_text("login\n")
+    os.utime(bot_list_path, ns=(0, 0))
+    original_key = get_run_key(input_paths, {})
+    assert original_key != missing_key
+    assert get_run_key(input_paths, {}) == original_key
+
+    bot_list_path.write_text("login\nsome-bot\n")
+    os.utime(bot_list_path, ns=(0, 0))
+    assert get_run_key(input_paths, {}) != original_key
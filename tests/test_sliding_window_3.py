@@ -0,0 +1,22 @@
+"""
+Tests the validation of the sliding window algorithm's parameters.
+"""
+
+import pytest
+
+from python_proj.data_preprocessing.sliding_window_3 import create_sliding_window_dataset
+
+
+@pytest.mark.parametrize("window_sizes_in_days", [[], [30, 30], [30, 90, 30], [0], [30, -90]])
+def test_invalid_window_sizes_are_rejected(tmp_path, window_sizes_in_days):
+    with pytest.raises(ValueError):
+        create_sliding_window_dataset(
+            str(tmp_path / "output.csv"),
+            str(tmp_path / "chunks") + "/",
+            [],
+            ["sorted"],
+            feature_factory=None,
+            window_size_in_days=window_sizes_in_days,
+            thread_count=1,
+        )
+    assert not (tmp_path / "chunks").exists()